@@ -0,0 +1,56 @@
+# Benchmark: memory and sampling time of the shared biped animation clips for 20 to 5,000 playheads, with and without animation LOD
+# Runs headless: the poses are sampled from the shared clips but not written to any node.
+
+import numpy as np
+import time
+from helpers.anim_clips import AnimPlayheads, get_clip_set
+from helpers.anim_lod import AnimLOD
+
+frame_count = 100
+dt = 1 / 60
+
+start = time.perf_counter()
+clip_set = get_clip_set('resources/biped/biped.scn')
+print('%d clips over %d bones decoded in %.1f ms, %d KB shared' % (len(clip_set.clips), len(clip_set.bones), (time.perf_counter() - start) * 1000, clip_set.nbytes // 1024))
+
+rng = np.random.default_rng(0)
+clip_ids = np.array([clip_set.clip_index(name) for name in ['idle', 'walk', 'run']])
+
+for count in [20, 500, 5000]:
+	player = AnimPlayheads(clip_set)
+	player.add_playheads(count)
+
+	player.play(np.arange(count), rng.choice(clip_ids, count))
+
+	elapsed = 0
+	for frame in range(frame_count):
+		switching = np.flatnonzero(rng.random(count) < 0.01)  # a few actors start another clip every frame and cross-fade to it
+		player.play(switching, rng.choice(clip_ids, len(switching)))
+		player.update(dt)
+
+		start = time.perf_counter()
+		for pose in player.sample():
+			pass
+		elapsed += time.perf_counter() - start
+
+	print('%5d playheads: %7d bytes of playhead state, sampling %7.3f ms per frame' % (count, player.nbytes, elapsed / frame_count * 1000))
+
+# the same 5,000 playheads spread over a 100m square in front of the camera, distant ones sampled at a lower rate
+count = 5000
+player = AnimPlayheads(clip_set)
+player.add_playheads(count)
+player.play(np.arange(count), rng.choice(clip_ids, count))
+
+pos = rng.uniform((-50, 0, 0), (50, 0, 100), (count, 3)).astype(np.float32)
+lod = AnimLOD((0, 10, -10), (20, 40, 70), (1, 2, 4, 8))
+
+elapsed = 0
+for frame in range(frame_count):
+	start = time.perf_counter()
+	due, dts = lod.schedule(pos, dt)
+	player.update(dts, due)
+	for pose in player.sample(due):
+		pass
+	elapsed += time.perf_counter() - start
+
+print('%5d playheads with animation LOD: %s per bucket, %s sampled per frame, %7.3f ms per frame' % (count, lod.stats['instances'].tolist(), lod.stats['updated'].tolist(), elapsed / frame_count * 1000))
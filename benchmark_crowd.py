@@ -0,0 +1,88 @@
+# Benchmark: biped actors advanced one Python state machine at a time versus by the NumPy crowd engine
+# Runs headless: the actors are nodes without model nor animation, only their state changes and motion are measured.
+
+import harfang as hg
+import numpy as np
+import time
+from helpers.crowd import Crowd
+
+frame_count = 300
+dt = hg.time_from_sec_f(1 / 60)
+
+
+class BipedActor:
+	"""The actor of scene_instances.py, without its animations"""
+
+	def __init__(self, scene, pos, heading):
+		self.node = hg.CreateObject(scene, hg.TransformationMat4(pos, hg.Vec3(0, heading, 0)), hg.ModelRef(), [])
+
+		self.delay = 0
+		self.state = None
+
+	def update(self, dt):
+		self.delay = self.delay - dt
+
+		if self.delay <= 0:
+			states = ['idle', 'walk', 'run']
+			self.state = states[hg.Rand(len(states))]
+			self.delay = self.delay + hg.time_from_sec_f(hg.FRRand(2, 6))
+
+		dt_sec_f = hg.time_to_sec_f(dt)
+
+		transform = self.node.GetTransform()
+		pos, rot = transform.GetPosRot()
+
+		if self.state == 'walk':
+			pos = pos - hg.GetZ(transform.GetWorld()) * hg.Mtr(1.15) * dt_sec_f
+			rot.y = rot.y + hg.Deg(50) * dt_sec_f
+		elif self.state == 'run':
+			pos = pos - hg.GetZ(transform.GetWorld()) * hg.Mtr(4.5) * dt_sec_f
+			rot.y = rot.y - hg.Deg(70) * dt_sec_f
+
+		pos = hg.Clamp(pos, hg.Vec3(-10, 0, -10), hg.Vec3(10, 0, 10))
+
+		transform.SetPosRot(pos, rot)
+
+
+def run_actors(count, pos, heading):
+	scene = hg.Scene()
+	actors = [BipedActor(scene, hg.Vec3(x, y, z), h) for (x, y, z), h in zip(pos.tolist(), heading.tolist())]
+
+	elapsed = 0
+	for frame in range(frame_count):
+		start = time.perf_counter()
+		for actor in actors:
+			actor.update(dt)
+		elapsed += time.perf_counter() - start
+
+		scene.Update(dt)
+
+	return elapsed / frame_count * 1000
+
+
+def run_crowd(count, pos, heading):
+	scene = hg.Scene()
+	crowd = Crowd(scene, (-10, 0, -10), (10, 0, 10), 0, animations=False)
+	crowd.add([hg.CreateObject(scene, hg.Mat4.Identity, hg.ModelRef(), []) for i in range(count)], pos, heading)
+
+	elapsed = 0
+	for frame in range(frame_count):
+		start = time.perf_counter()
+		crowd.update(hg.time_to_sec_f(dt))
+		elapsed += time.perf_counter() - start
+
+		scene.Update(dt)
+
+	return elapsed / frame_count * 1000
+
+
+rng = np.random.default_rng(0)
+
+for count in [20, 500, 5000]:
+	pos = rng.uniform((-10, 0, -10), (10, 0, 10), (count, 3)).astype(np.float32)
+	heading = rng.uniform(0, 2 * np.pi, count).astype(np.float32)
+
+	actors_ms = run_actors(count, pos, heading)
+	crowd_ms = run_crowd(count, pos, heading)
+
+	print('%5d actors: %8.3f ms per frame with one state machine per actor, %8.3f ms with the crowd engine (x%.1f)' % (count, actors_ms, crowd_ms, actors_ms / crowd_ms))
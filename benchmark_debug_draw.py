@@ -0,0 +1,66 @@
+# Benchmark: one hg.Vertices and hg.DrawLines per line versus the batched debug draw
+# Each primitive is a cross of 3 lines, the time covers building and submitting the lines of one frame.
+# The batched flush still feeds hg.Vertices one vertex at a time (6 per cross), its share of the batched time is printed separately.
+
+import harfang as hg
+import numpy as np
+import time
+from helpers.debug_draw import DebugDraw
+
+hg.InputInit()
+hg.WindowSystemInit()
+
+res_x, res_y = 1280, 720
+win = hg.RenderInit('Debug draw benchmark', res_x, res_y, hg.RF_None)
+
+hg.AddAssetsFolder('resources_compiled')
+
+vtx_line_layout = hg.VertexLayoutPosFloatColorUInt8()
+shader_for_line = hg.LoadProgramFromAssets('shaders/pos_rgb')
+
+
+def draw_line(pos_a, pos_b, line_color, vid, vtx_line_layout, line_shader):
+	vtx = hg.Vertices(vtx_line_layout, 2)
+	vtx.Begin(0).SetPos(pos_a).SetColor0(line_color).End()
+	vtx.Begin(1).SetPos(pos_b).SetColor0(line_color).End()
+	hg.DrawLines(vid, vtx, line_shader)
+
+
+def per_line(positions, size):
+	for x, y, z in positions.tolist():
+		pos = hg.Vec3(x, y, z)
+		draw_line(pos + hg.Vec3(size, 0, 0), pos - hg.Vec3(size, 0, 0), hg.Color.Red, 0, vtx_line_layout, shader_for_line)
+		draw_line(pos + hg.Vec3(0, size, 0), pos - hg.Vec3(0, size, 0), hg.Color.Green, 0, vtx_line_layout, shader_for_line)
+		draw_line(pos + hg.Vec3(0, 0, size), pos - hg.Vec3(0, 0, size), hg.Color.Blue, 0, vtx_line_layout, shader_for_line)
+
+
+debug_draw = DebugDraw(vtx_line_layout, shader_for_line)
+
+
+def batched(positions, size):
+	debug_draw.crosses(positions, size)
+	debug_draw.flush(0)
+
+
+def measure(fn, positions, frame_count=3):
+	elapsed = 0
+	for frame in range(frame_count):
+		hg.SetViewPerspective(0, 0, 0, res_x, res_y, hg.TranslationMat4(hg.Vec3(0, 0, -3)))
+		start = time.perf_counter()
+		fn(positions, 0.01)
+		elapsed += time.perf_counter() - start
+		hg.Frame()
+		hg.UpdateWindow(win)
+	return elapsed / frame_count * 1000
+
+
+for count in [1_000, 10_000, 100_000]:
+	positions = np.random.default_rng(0).uniform(-1, 1, (count, 3)).astype(np.float32)
+
+	per_line_ms = measure(per_line, positions)
+	batched_ms = measure(batched, positions)
+
+	print('%7d crosses: per-line %9.2f ms (%d draw calls), batched %9.2f ms (%d draw calls, flush %9.2f ms), speedup x%.1f' % (count, per_line_ms, count * 3, batched_ms, debug_draw.stats['draw_calls'], debug_draw.stats['flush_ms'], per_line_ms / batched_ms))
+
+hg.RenderShutdown()
+hg.DestroyWindow(win)
@@ -0,0 +1,95 @@
+# Benchmark: starfield frame time, per-vertex hg.Vec3 path versus NumPy vertex stream
+
+import harfang as hg
+import time
+from helpers.vertex_stream import VertexStream, Starfield, create_pos_rgb_layout
+
+hg.InputInit()
+hg.WindowSystemInit()
+
+width, height = 1280, 720
+window = hg.RenderInit('Harfang - Starfield benchmark', width, height, hg.RF_None)  # no VSync, measure raw frame time
+
+vtx_layout = create_pos_rgb_layout()
+shader = hg.LoadProgramFromFile('resources_compiled/shaders/pos_rgb')
+
+starfield_size = 10
+frame_count = 60
+
+
+def run_per_vertex(star_count):
+	vtx = hg.Vertices(vtx_layout, star_count * 2)
+	stars = [hg.RandomVec3(-starfield_size, starfield_size) for i in range(star_count)]
+
+	def frame(dt_f):
+		vtx.Clear()
+		for i, star in enumerate(stars):
+			star.z -= 2 * dt_f
+			if star.z < starfield_size:
+				star.z += starfield_size
+
+			vtx.Begin(2 * i).SetPos(star * hg.Vec3(1 / star.z, 1 / star.z, 0)).SetColor0(hg.Color.Black).End()
+			vtx.Begin(2 * i + 1).SetPos(star * hg.Vec3(1.04 / star.z, 1.04 / star.z, 0)).SetColor0(hg.Color.White).End()
+
+		hg.DrawLines(0, vtx, shader)
+
+	return frame
+
+
+def run_numpy(star_count):
+	stars = Starfield(star_count, starfield_size, seed=0)
+	stream = VertexStream(vtx_layout, star_count * 2)
+
+	def frame(dt_f):
+		stars.update(dt_f)
+		stars.write_lines(stream)
+		stream.draw(0, shader)
+
+	return frame
+
+
+def measure(frame):
+	"""Average frame time in milliseconds, including the renderer frame"""
+	start = time.perf_counter()
+	for i in range(frame_count):
+		hg.SetViewClear(0, hg.CF_Color | hg.CF_Depth, hg.Color.Black, 1, 0)
+		hg.SetViewRect(0, 0, 0, width, height)
+
+		frame(1 / 60)
+
+		hg.Frame()
+		hg.UpdateWindow(window)
+	return (time.perf_counter() - start) / frame_count * 1000
+
+
+def ceiling(frame_budget_ms=1000 / 60):
+	"""Largest star count (to about 5%) the NumPy path draws within the frame budget"""
+	low, high = 0, 1_000
+	while measure(run_numpy(high)) <= frame_budget_ms:  # double until over budget
+		low, high = high, high * 2
+		if not hg.IsWindowOpen(window):
+			return low
+
+	while high - low > max(low // 20, 100):
+		mid = (low + high) // 2
+		if measure(run_numpy(mid)) <= frame_budget_ms:
+			low = mid
+		else:
+			high = mid
+	return low
+
+
+for star_count in [1_000, 10_000, 100_000, 1_000_000]:
+	per_vertex_ms = measure(run_per_vertex(star_count))
+	numpy_ms = measure(run_numpy(star_count))
+
+	print('%8d stars: per-vertex %9.2f ms, NumPy %9.2f ms, speedup x%.1f' % (star_count, per_vertex_ms, numpy_ms, per_vertex_ms / numpy_ms))
+
+	if not hg.IsWindowOpen(window):
+		break
+
+if hg.IsWindowOpen(window):
+	print('NumPy path holds 60 Hz up to %d stars' % ceiling())
+
+hg.RenderShutdown()
+hg.DestroyWindow(window)
@@ -0,0 +1,85 @@
+# Benchmark: submit time against visible fraction, with and without culling the scene nodes from a loose octree
+# The camera field of view is narrowed to reduce the visible fraction, everything else is fixed so that the runs are reproducible.
+
+import harfang as hg
+import numpy as np
+import time
+from math import isqrt
+from helpers.spatial_index import LooseOctree, NodeVisibility, camera_frustum_planes
+
+hg.InputInit()
+hg.WindowSystemInit()
+
+res_x, res_y = 1280, 720
+win = hg.RenderInit('Frustum culling benchmark', res_x, res_y, hg.RF_None)
+
+pipeline = hg.CreateForwardPipeline()
+res = hg.PipelineResources()
+
+vtx_layout = hg.VertexLayoutPosFloatNormUInt8()
+sphere_radius = 0.1
+sphere_ref = res.AddModel('sphere', hg.CreateSphereModel(vtx_layout, sphere_radius, 8, 16))
+
+shader = hg.LoadPipelineProgramRefFromFile('resources_compiled/core/shader/default.hps', res, hg.GetForwardPipelineInfo())
+sphere_mat = hg.CreateMaterial(shader, 'uDiffuseColor', hg.Vec4(1, 0, 0), 'uSpecularColor', hg.Vec4(1, 0.8, 0))
+
+node_count = 100_000
+frame_count = 20
+
+# spheres on a square grid, seen from above its center
+scene = hg.Scene()
+col_count = isqrt(node_count)
+side = col_count * 0.25
+
+cam = hg.CreateCamera(scene, hg.TransformationMat4(hg.Vec3(side / 2, side, side / 2), hg.Deg3(90, 0, 0)), 0.01, side * 2)
+scene.SetCurrentCamera(cam)
+hg.CreateLinearLight(scene, hg.TransformationMat4(hg.Vec3(0, 0, 0), hg.Deg3(45, 30, 0)), hg.Color.White, hg.Color.White, 0)
+
+nodes = []
+centers = np.empty((node_count, 3), dtype=np.float32)
+for i in range(node_count):
+	centers[i] = (i % col_count) * 0.25, 0.1, (i // col_count) * 0.25
+	nodes.append(hg.CreateObject(scene, hg.TranslationMat4(hg.Vec3(*centers[i].tolist())), sphere_ref, [sphere_mat]))
+
+octree = LooseOctree(centers.min(axis=0) - 1, centers.max(axis=0) + 1, centers, sphere_radius)
+visibility = NodeVisibility(nodes)
+
+
+def measure(cull):
+	"""Average cull and submit time in milliseconds, and the visible fraction"""
+	cull_time, submit_time = 0, 0
+
+	for frame in range(frame_count + 2):
+		scene.Update(0)
+
+		start = time.perf_counter()
+		mask = octree.query_frustum(camera_frustum_planes(cam, res_x, res_y))
+		if cull:
+			visibility.apply(mask)
+		middle = time.perf_counter()
+		hg.SubmitSceneToPipeline(0, scene, hg.IntRect(0, 0, res_x, res_y), True, pipeline, res)
+		hg.Frame()
+		end = time.perf_counter()
+
+		if frame >= 2:  # the first frames include the resources upload and the first node state changes
+			cull_time += middle - start
+			submit_time += end - middle
+
+		hg.UpdateWindow(win)
+
+	return cull_time / frame_count * 1000, submit_time / frame_count * 1000, mask.mean()
+
+
+print('%d nodes, %d frames per measure' % (node_count, frame_count))
+
+for fov in [120, 60, 30, 15, 7.5, 3.75]:
+	cam.GetCamera().SetFov(hg.Deg(fov))
+
+	visibility.apply(np.ones(node_count, dtype=bool))
+	_, all_submit_ms, visible = measure(False)
+	cull_ms, culled_submit_ms, _ = measure(True)
+
+	print('fov %6.2f, %6.2f%% visible: no culling %8.2f ms, culled %8.2f ms (+ %6.2f ms octree query)' % (fov, visible * 100, all_submit_ms, culled_submit_ms, cull_ms))
+
+hg.RenderShutdown()
+hg.DestroyWindow(win)
@@ -0,0 +1,99 @@
+# Benchmark: one scene node per sphere versus one draw call per sphere versus instance batches
+# Frame time of SubmitSceneToPipeline + Frame, without VSync. The transforms are static, see benchmark_scene_many_nodes.py for their update cost.
+# The scene nodes are shaded by the forward pipeline (default.hps, pipeline lights), the instances by the fixed light of the mdl_instanced shader.
+# The speedup of instancing is measured against one DrawModel per sphere with the mdl shader, which has the same lighting model as mdl_instanced.
+
+import harfang as hg
+import time
+from math import isqrt
+from helpers.instance_batch import InstanceBatch, create_instance_layout, create_instanced_model, sphere_geometry
+
+hg.InputInit()
+hg.WindowSystemInit()
+
+res_x, res_y = 1280, 720
+win = hg.RenderInit('Instanced rendering benchmark', res_x, res_y, hg.RF_None)
+
+pipeline = hg.CreateForwardPipeline()
+res = hg.PipelineResources()
+
+vtx_layout = hg.VertexLayoutPosFloatNormUInt8()
+sphere_ref = res.AddModel('sphere', hg.CreateSphereModel(vtx_layout, 0.1, 8, 16))
+
+shader = hg.LoadPipelineProgramRefFromFile('resources_compiled/core/shader/default.hps', res, hg.GetForwardPipelineInfo())
+sphere_mat = hg.CreateMaterial(shader, 'uDiffuseColor', hg.Vec4(1, 0, 0), 'uSpecularColor', hg.Vec4(1, 0.8, 0))
+
+instanced_mdl = create_instanced_model(create_instance_layout(), *sphere_geometry(0.1, 8, 16))
+instanced_prg = hg.LoadProgramFromFile('resources_compiled/shaders/mdl_instanced')
+
+per_draw_mdl = hg.CreateSphereModel(vtx_layout, 0.1, 8, 16)
+per_draw_prg = hg.LoadProgramFromFile('resources_compiled/shaders/mdl')
+max_draw_calls = 65535  # bgfx default limit of draw calls per frame, above it draws are dropped
+
+
+def create_scene(count):
+	scene = hg.Scene()
+	side = isqrt(count) * 0.25
+	cam = hg.CreateCamera(scene, hg.TransformationMat4(hg.Vec3(0, side * 0.75, -side * 0.75), hg.Deg3(45, 0, 0)), 0.01, side * 4)
+	scene.SetCurrentCamera(cam)
+	hg.CreateLinearLight(scene, hg.TransformationMat4(hg.Vec3(0, 0, 0), hg.Deg3(45, 30, 0)), hg.Color.White, hg.Color.White, 0)
+	return scene
+
+
+def grid_positions(count):
+	col_count = isqrt(count)
+	for i in range(count):
+		yield hg.Vec3((i % col_count) * 0.25, 0.1, (i // col_count) * 0.25)
+
+
+def draw_each(mtxs):
+	"""One DrawModel per sphere with the mdl shader, as a draw function for measure()"""
+	def draw(view_id):
+		for mtx in mtxs:
+			hg.DrawModel(view_id, per_draw_mdl, per_draw_prg, [], [], mtx)
+	return draw
+
+
+def measure(scene, draw, frame_count):
+	"""Average frame time in milliseconds, draw(view_id) is called with the opaque pass view of the scene"""
+	for frame in range(frame_count + 2):
+		if frame == 2:  # skip the first frames, they include the resources upload
+			start = time.perf_counter()
+
+		scene.Update(0)
+		view_id, pass_ids = hg.SubmitSceneToPipeline(0, scene, hg.IntRect(0, 0, res_x, res_y), True, pipeline, res)
+		if draw is not None:
+			draw(hg.GetSceneForwardPipelinePassViewId(pass_ids, hg.SFPP_Opaque))
+
+		hg.Frame()
+		hg.UpdateWindow(win)
+
+	return (time.perf_counter() - start) / frame_count * 1000
+
+
+for count in [10_000, 100_000, 1_000_000]:
+	frame_count = max(3, 100_000 // count * 10)
+
+	scene = create_scene(count)
+	for pos in grid_positions(count):
+		hg.CreateObject(scene, hg.TranslationMat4(pos), sphere_ref, [sphere_mat])
+	per_node_ms = measure(scene, None, frame_count)
+
+	if count <= max_draw_calls:
+		per_draw_ms = measure(create_scene(count), draw_each([hg.TranslationMat4(pos) for pos in grid_positions(count)]), frame_count)
+		per_draw = 'per-draw %9.2f ms' % per_draw_ms
+	else:
+		per_draw_ms, per_draw = None, 'per-draw %9s   ' % 'n/a'
+
+	scene = create_scene(count)
+	batch = InstanceBatch(instanced_mdl, instanced_prg, count, hg.Color.Red)
+	for i, pos in enumerate(grid_positions(count)):
+		batch.pos[i] = pos.x, pos.y, pos.z
+	instanced_ms = measure(scene, batch.submit, frame_count)
+
+	speedup = ', speedup x%.1f' % (per_draw_ms / instanced_ms) if per_draw_ms is not None else ''
+	print('%8d spheres: per-node %9.2f ms, %s, instanced %9.2f ms (%d draw calls, last frame: hg.Mat4 conversion %.2f ms, draw submission %.2f ms)%s' % (
+		count, per_node_ms, per_draw, instanced_ms, -(-count // 32), batch.stats['build_ms'], batch.stats['draw_ms'], speedup))
+
+hg.RenderShutdown()
+hg.DestroyWindow(win)
@@ -0,0 +1,38 @@
+# Benchmark: chunked iso surface polygonization, scaling from 1 to N cores
+
+import numpy as np
+import os
+import time
+from helpers.iso_parallel import ChunkedPolygonizer
+
+
+def measure(polygonizer, bounds, spheres, iso_level, run_count=3):
+	polygonizer.polygonize_spheres(bounds, spheres, iso_level)  # warm up the pool and allocate the field
+
+	start = time.perf_counter()
+	for i in range(run_count):
+		positions, normals = polygonizer.polygonize_spheres(bounds, spheres, iso_level)
+	return (time.perf_counter() - start) / run_count * 1000, len(positions) // 3
+
+
+if __name__ == '__main__':  # required by process pools on platforms that spawn their workers
+	bounds = (128, 128, 128)
+	iso_level = 0.5
+
+	rng = np.random.default_rng(0)
+	spheres = [(*rng.uniform(16, 112, 3), rng.uniform(4, 12), 1, 1) for i in range(200)]
+
+	core_counts = sorted({1, 2, 4, 8, 16, os.cpu_count() or 1})
+	core_counts = [n for n in core_counts if n <= (os.cpu_count() or 1)]
+
+	for use_processes in [False, True]:
+		print('%s pool, %dx%dx%d volume, %d spheres' % ('process' if use_processes else 'thread', *bounds, len(spheres)))
+
+		reference_ms = None
+		for worker_count in core_counts:
+			polygonizer = ChunkedPolygonizer(worker_count, 32, use_processes)
+			ms, triangle_count = measure(polygonizer, bounds, spheres, iso_level)
+			polygonizer.close()
+
+			reference_ms = reference_ms or ms
+			print('%4d workers: %9.2f ms, %d triangles, speedup x%.2f' % (worker_count, ms, triangle_count, reference_ms / ms))
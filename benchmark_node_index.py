@@ -0,0 +1,54 @@
+# Benchmark: node lookups by name, scene.GetNode() versus NodeIndex, in scenes of about 300 to 30k nodes
+# Runs headless: the nodes are empty nodes named after the nodes of the biped and engine scenes, copied with a suffix.
+
+import harfang as hg
+import time
+from helpers.node_index import NodeIndex
+from helpers.scn_reader import SceneFile
+
+lookup_count = 10_000
+churn_count = 1_000
+
+names = []
+for path in ['resources/biped/biped.scn', 'resources/car_engine/engine.scn']:
+	with SceneFile(path) as scn:
+		names.extend(scn.node_names())
+
+
+def timed(f, count):
+	"""Run f count times, return the time per call in microseconds"""
+	start = time.perf_counter()
+	for i in range(count):
+		f()
+	return (time.perf_counter() - start) / count * 1e6
+
+
+for copy_count in [1, 10, 100]:
+	scene = hg.Scene()
+	for i in range(copy_count):
+		for name in names:
+			scene.CreateNode('%s_%d' % (name, i))
+
+	start = time.perf_counter()
+	index = NodeIndex(scene)
+	build_ms = (time.perf_counter() - start) * 1000
+
+	last = '%s_%d' % (names[-1], copy_count - 1)  # the worst case of a linear scan
+	get_node_us = timed(lambda: scene.GetNode(last), lookup_count)
+	index_get_us = timed(lambda: index.get(last), lookup_count)
+	prefix_us = timed(lambda: index.prefix('Bip001 L'), 100)
+	glob_us = timed(lambda: index.glob('Bip001 ? Hand_*'), 100)
+
+	# incremental maintenance: create and index nodes, then remove them from the index and destroy them
+	start = time.perf_counter()
+	created = []
+	for i in range(churn_count):
+		node = scene.CreateNode('spawned_%d' % i)
+		index.add(node)
+		created.append(node)
+	for node in created:
+		index.remove(node)
+		scene.DestroyNode(node)
+	churn_us = (time.perf_counter() - start) / churn_count * 1e6
+
+	print('%6d nodes: index built in %6.1f ms, GetNode %8.2f us, index.get %5.2f us, prefix %7.1f us, glob %7.1f us, add+remove %5.1f us' % (len(index), build_ms, get_node_us, index_get_us, prefix_us, glob_us, churn_us))
@@ -0,0 +1,77 @@
+# Benchmark: many independent physics worlds simulated over a pool of processes, from 1 worker to all the cores
+# Runs headless: the nodes have no model. Each world is seeded from its index, the transforms it records must be the
+# same whatever the number of workers.
+
+import os
+import time
+
+import harfang as hg
+import numpy as np
+from helpers.physics_batch import PhysicsBatch
+
+world_count = 64
+step_count = 600  # 10 seconds at 60Hz
+record_every = 10
+
+
+def drop_cubes(scene, rng):
+	"""physics_manual_setup.py with 16 cubes dropped from random heights and orientations"""
+	hg.CreatePhysicCube(scene, hg.Vec3(100, 0.02, 100), hg.TranslationMat4(hg.Vec3(0, -0.005, 0)), hg.ModelRef(), [], 0)
+
+	nodes = []
+	for (x, y, z), (rx, ry, rz) in zip(rng.uniform((-3, 2, -3), (3, 8, 3), (16, 3)).tolist(), rng.uniform(-np.pi, np.pi, (16, 3)).tolist()):
+		nodes.append(hg.CreatePhysicCube(scene, hg.Vec3(1, 1, 1), hg.TransformationMat4(hg.Vec3(x, y, z), hg.Vec3(rx, ry, rz)), hg.ModelRef(), [], 1))
+
+	return nodes, None
+
+
+def hover_cube(scene, rng):
+	"""physics_impulse.py with a random stiffness, the cube is kept 1 meter above the ground by impulses"""
+	hg.CreatePhysicCube(scene, hg.Vec3(100, 0.02, 100), hg.TranslationMat4(hg.Vec3(0, -0.005, 0)), hg.ModelRef(), [], 0)
+	cube_node = hg.CreatePhysicCube(scene, hg.Vec3(1, 1, 1), hg.TranslationMat4(hg.Vec3(0, 1.5, 0)), hg.ModelRef(), [], 2)
+
+	stiffness = float(rng.uniform(5, 20))
+
+	def update(physics, step_index):
+		physics.SyncTransformsToScene(scene)
+		world_pos = cube_node.GetTransform().GetPos()
+		dist_to_ground = world_pos.y - 0.5
+
+		if dist_to_ground < 1.0:
+			k = -(dist_to_ground - 1.0)
+			cur_velocity = physics.NodeGetLinearVelocity(cube_node)
+			tgt_velocity = hg.Vec3(0, 1, 0) * k * stiffness
+			physics.NodeAddImpulse(cube_node, tgt_velocity - cur_velocity, world_pos)
+
+		physics.NodeWake(cube_node)
+
+	return [cube_node], update
+
+
+def run(setup, worker_count):
+	"""Return the results in world order and the run time in seconds"""
+	batch = PhysicsBatch(worker_count)
+
+	start = time.perf_counter()
+	results = sorted(batch.run(setup, world_count, 0, step_count, record_every=record_every), key=lambda r: r.index)
+	elapsed = time.perf_counter() - start
+
+	batch.close()
+	return results, elapsed
+
+
+if __name__ == '__main__':  # required by process pools on platforms that spawn their workers
+	worker_counts = sorted(set([1, 2, 4, os.cpu_count() or 1]))
+	print('%d worlds, %d steps each, %d cores' % (world_count, step_count, os.cpu_count() or 1))
+
+	for setup in [drop_cubes, hover_cube]:
+		reference, reference_time = None, None
+
+		for worker_count in worker_counts:
+			results, elapsed = run(setup, worker_count)
+
+			if reference is None:
+				reference, reference_time = results, elapsed
+			reproducible = all(np.array_equal(a.pos, b.pos) and np.array_equal(a.rot, b.rot) for a, b in zip(reference, results))
+
+			print('%-10s %2d workers: %6.2f s, %6.1f worlds/s, speedup %5.2f, %s' % (setup.__name__, worker_count, elapsed, world_count / elapsed, reference_time / elapsed, 'same transforms' if reproducible else 'DIFFERENT TRANSFORMS'))
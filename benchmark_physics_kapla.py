@@ -0,0 +1,109 @@
+# Benchmark: physics scaling with the number of Kapla towers, from a few hundred to about 20k bodies
+# Runs headless and deterministic: no window nor pipeline, the nodes have no model, the physics is stepped at a fixed
+# 60Hz rate and the projectiles are fired on a script. A 12 level tower holds 468 kaplas.
+
+import argparse
+import csv
+import json
+import time
+from math import cos, sin, sqrt
+
+import harfang as hg
+from helpers.kapla import add_kapla_tower
+
+parser = argparse.ArgumentParser(description='Step the Kapla towers scene headless and record the physics step times')
+parser.add_argument('--towers', type=int, nargs='+', default=[1, 4, 16, 43], help='tower counts, one run per count')
+parser.add_argument('--levels', type=int, default=12, help='levels per tower')
+parser.add_argument('--steps', type=int, default=600, help='physics steps per run')
+parser.add_argument('--fire-every', type=int, default=30, help='steps between two projectiles fired at each tower')
+parser.add_argument('--sample-every', type=int, default=10, help='steps between two sleeping body counts, not included in the step times')
+parser.add_argument('--csv', help='write the per-step records to this CSV file')
+parser.add_argument('--json', help='write the runs to this JSON file')
+args = parser.parse_args()
+
+step = hg.time_from_sec_f(1 / 60)
+tower_spacing = 30
+sleeping_speed = 0.8  # Bullet default linear sleeping threshold, slower bodies are counted as sleeping
+
+
+def tower_positions(count):
+	"""Towers on a square grid centered on the origin"""
+	side = int(sqrt(count - 1)) + 1
+	return [((i % side - (side - 1) / 2) * tower_spacing, (i // side - (side - 1) / 2) * tower_spacing) for i in range(count)]
+
+
+def fire(scene, physics, shot, x, z):
+	"""Fire a projectile at the tower standing at x, z. The shooting position only depends on the shot index"""
+	a = shot * 2.39996  # golden angle, successive shots come from well spread directions
+	pos = hg.Vec3(x + cos(a) * 14, 3 + shot % 5 * 2, z + sin(a) * 14)
+
+	node = hg.CreatePhysicSphere(scene, 0.5, hg.TranslationMat4(pos), hg.ModelRef(), [], 0.5)
+	physics.NodeCreatePhysicsFromAssets(node)
+	physics.NodeAddImpulse(node, hg.Normalize(hg.Vec3(x, pos.y, z) - pos) * 25.0, pos)
+	return node
+
+
+def run(tower_count):
+	"""Return the per-step records of a run as (step, step_ms, body_count, sleeping_ratio) tuples, the ratio is None between samples"""
+	scene = hg.Scene()
+
+	positions = tower_positions(tower_count)
+	ground_size = (int(sqrt(tower_count - 1)) + 1) * tower_spacing + 40
+	hg.CreatePhysicCube(scene, hg.Vec3(ground_size, 1, ground_size), hg.TranslationMat4(hg.Vec3(0, -0.55, 0)), hg.ModelRef(), [], 0)
+
+	bodies = []
+	for x, z in positions:
+		bodies.extend(add_kapla_tower(scene, hg.ModelRef(), [], 0.5, 2, 2, 6, args.levels, x, 0, z))
+
+	physics = hg.SceneBullet3Physics()
+	physics.SceneCreatePhysicsFromAssets(scene)
+
+	records = []
+
+	for i in range(args.steps):
+		if i % args.fire_every == 0:
+			for x, z in positions:
+				bodies.append(fire(scene, physics, i // args.fire_every, x, z))
+
+		start = time.perf_counter()
+		physics.StepSimulation(step, step, 1)
+		step_ms = (time.perf_counter() - start) * 1000
+
+		sleeping_ratio = None
+		if i % args.sample_every == 0:
+			sleeping_ratio = sum(1 for node in bodies if hg.Len(physics.NodeGetLinearVelocity(node)) < sleeping_speed) / len(bodies)
+
+		records.append((i, step_ms, len(bodies), sleeping_ratio))
+
+	return records
+
+
+runs = []
+
+for tower_count in args.towers:
+	records = run(tower_count)
+	step_times = sorted(r[1] for r in records)
+
+	summary = {
+		'towers': tower_count,
+		'bodies': records[-1][2],
+		'mean_ms': sum(step_times) / len(step_times),
+		'median_ms': step_times[len(step_times) // 2],
+		'p95_ms': step_times[int(len(step_times) * 0.95)],
+		'max_ms': step_times[-1],
+	}
+	runs.append((summary, records))
+
+	print('%3d towers, %6d bodies: step %7.3f ms mean, %7.3f ms median, %7.3f ms p95, %7.3f ms max' % (tower_count, summary['bodies'], summary['mean_ms'], summary['median_ms'], summary['p95_ms'], summary['max_ms']))
+
+if args.csv:
+	with open(args.csv, 'w', newline='') as file:
+		writer = csv.writer(file)
+		writer.writerow(['towers', 'step', 'step_ms', 'bodies', 'sleeping_ratio'])
+		for summary, records in runs:
+			for i, step_ms, body_count, sleeping_ratio in records:
+				writer.writerow([summary['towers'], i, '%.4f' % step_ms, body_count, '' if sleeping_ratio is None else '%.4f' % sleeping_ratio])
+
+if args.json:
+	with open(args.json, 'w') as file:
+		json.dump([dict(summary, records=[{'step': i, 'step_ms': step_ms, 'bodies': body_count, 'sleeping_ratio': sleeping_ratio} for i, step_ms, body_count, sleeping_ratio in records]) for summary, records in runs], file, indent=1)
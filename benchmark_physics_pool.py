@@ -0,0 +1,79 @@
+# Benchmark: churn of 10k physic objects, created and destroyed versus recycled from a pool
+# Runs headless: the nodes have no model, only their rigid body and collision shape.
+
+import harfang as hg
+import time
+from collections import deque
+from helpers.physics_pool import PhysicsPool
+
+churn_count = 10_000  # objects spawned and despawned over the run
+batch_size = 100  # objects spawned and despawned per frame
+live_count = 1_000  # objects alive once the churn started
+
+
+def create_world():
+	scene = hg.Scene()
+	hg.CreatePhysicCube(scene, hg.Vec3(100, 1, 100), hg.TranslationMat4(hg.Vec3(0, -0.5, 0)), hg.ModelRef(), [], 0)
+
+	physics = hg.SceneBullet3Physics()
+	physics.SceneCreatePhysicsFromAssets(scene)
+	return scene, physics, hg.SceneClocks()
+
+
+def spawn_pos(i):
+	return hg.TranslationMat4(hg.Vec3((i % 40) - 20, 2 + (i // 40) % 10, (i // 400) % 40 - 20))
+
+
+def run(setup):
+	"""Return the total spawn and despawn times and the longest despawn pause, in milliseconds. The setup time is not measured"""
+	scene, physics, clocks = create_world()
+	spawn, despawn = setup(scene, physics)
+
+	alive = deque()
+	spawn_time, despawn_time, max_pause = 0, 0, 0
+
+	for frame in range(churn_count // batch_size + live_count // batch_size):
+		start = time.perf_counter()
+		for i in range(batch_size):
+			alive.append(spawn(spawn_pos(frame * batch_size + i)))
+		middle = time.perf_counter()
+		if len(alive) > live_count:
+			despawn([alive.popleft() for i in range(batch_size)])
+		end = time.perf_counter()
+
+		spawn_time += middle - start
+		despawn_time += end - middle
+		max_pause = max(max_pause, end - middle)
+
+		hg.SceneUpdateSystems(scene, clocks, hg.time_from_sec_f(1 / 60), physics, hg.time_from_sec_f(1 / 60), 1)
+
+	return spawn_time * 1000, despawn_time * 1000, max_pause * 1000
+
+
+def setup_create_destroy(scene, physics):
+	"""Create and destroy the nodes, as physics_pool_of_objects.py used to"""
+	def spawn(world):
+		node = hg.CreatePhysicCube(scene, hg.Vec3.One, world, hg.ModelRef(), [], 1)
+		physics.NodeCreatePhysicsFromAssets(node)
+		return node
+
+	def despawn(nodes):
+		for node in nodes:
+			scene.DestroyNode(node)
+		hg.SceneGarbageCollectSystems(scene, physics)
+
+	return spawn, despawn
+
+
+def setup_pool(scene, physics):
+	"""Recycle the nodes from a pool created up front"""
+	pool = PhysicsPool(scene, physics, lambda world: hg.CreatePhysicCube(scene, hg.Vec3.One, world, hg.ModelRef(), [], 1), live_count + batch_size)
+	return pool.spawn, pool.release
+
+
+print('%d objects churned, %d per frame, %d alive' % (churn_count, batch_size, live_count))
+
+for name, setup in [('create/destroy', setup_create_destroy), ('pool', setup_pool)]:
+	spawn_ms, despawn_ms, pause_ms = run(setup)
+	spawned = churn_count + live_count
+	print('%-15s spawn %8.0f objects/s, despawn %8.0f objects/s, longest despawn pause %6.2f ms' % (name, spawned / spawn_ms * 1000, churn_count / despawn_ms * 1000, pause_ms))
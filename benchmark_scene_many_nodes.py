@@ -0,0 +1,60 @@
+# Benchmark: per-node transform loop versus NumPy bulk update
+# Runs headless, no window or render pipeline is created.
+
+import harfang as hg
+import time
+from math import cos, sin, isqrt
+from helpers.transform_batch import TransformBatch, wave_heights
+
+
+def create_grid(scene, node_count):
+	"""Create a square grid of transform-only nodes, return the rows of transforms and the row size"""
+	col_count = isqrt(node_count)
+	row_count = node_count // col_count
+
+	rows = []
+	for z in range(row_count):
+		row = []
+		for x in range(col_count):
+			node = scene.CreateNode()
+			node.SetTransform(scene.CreateTransform(hg.Vec3(x * 0.2, 0.1, z * 0.2)))
+			row.append(node.GetTransform())
+		rows.append(row)
+	return rows, row_count, col_count
+
+
+def update_per_node(rows, angle):
+	for j, row in enumerate(rows):
+		row_y = cos(angle + j * 0.1)
+		for i, trs in enumerate(row):
+			pos = trs.GetPos()
+			pos.y = 0.1 * (row_y * sin(angle + i * 0.1) * 6 + 6.5)
+			trs.SetPos(pos)
+
+
+def measure(fn, frame_count):
+	start = time.perf_counter()
+	for frame in range(frame_count):
+		fn(frame * 0.016)
+	return (time.perf_counter() - start) / frame_count * 1000
+
+
+for node_count in [10_000, 100_000, 1_000_000]:
+	scene = hg.Scene()
+	rows, row_count, col_count = create_grid(scene, node_count)
+	batch = TransformBatch(trs for row in rows for trs in row)
+
+	frame_count = max(1, 100_000 // node_count) * 3
+
+	def update_math_only(angle):
+		wave_heights(angle, row_count, col_count, batch.pos[:, 1])
+
+	def update_bulk(angle):
+		wave_heights(angle, row_count, col_count, batch.pos[:, 1])
+		batch.push()
+
+	per_node_ms = measure(lambda angle: update_per_node(rows, angle), frame_count)
+	math_ms = measure(update_math_only, frame_count)
+	bulk_ms = measure(update_bulk, frame_count)
+
+	print('%8d nodes: per-node %9.2f ms, bulk %9.2f ms (NumPy math %7.2f ms), speedup x%.1f' % (len(batch), per_node_ms, bulk_ms, math_ms, per_node_ms / bulk_ms))
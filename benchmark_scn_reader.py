@@ -0,0 +1,74 @@
+# Benchmark: lazy .scn reader and binary scene cache versus json.load, cold load time and peak memory
+# Runs without HARFANG, on the source scenes in resources/
+
+import json
+import time
+import tracemalloc
+from helpers.scn_reader import SceneFile
+from helpers.scn_cache import open_scene_cache
+
+
+def load_json(path):
+	with open(path, 'r') as f:
+		return json.load(f)
+
+
+def lazy_open_and_index(path):
+	scn = SceneFile(path)
+	scn.node_names()  # node index
+	return scn
+
+
+def lazy_one_scene_anim(path):
+	scn = lazy_open_and_index(path)
+	names = scn.scene_anim_names()
+	if names:
+		scn.get_scene_anim(names[0])
+	return scn
+
+
+def cache_open_and_index(path):
+	cache = open_scene_cache(path)
+	cache.find_node('')  # node index
+	return cache
+
+
+def cache_one_scene_anim(path):
+	cache = cache_open_and_index(path)
+	scene_anims = cache.get('scene_anims')
+	if scene_anims:
+		cache.get_scene_anim(scene_anims[0]['name'])
+	return cache
+
+
+def close(result):
+	if hasattr(result, 'close'):
+		result.close()
+
+
+def measure(fn, path, run_count=5):
+	"""Return the best time in milliseconds and the peak of allocated memory in MB"""
+	best = None
+	for i in range(run_count):
+		start = time.perf_counter()
+		result = fn(path)
+		elapsed = time.perf_counter() - start
+		best = elapsed if best is None else min(best, elapsed)
+		close(result)
+
+	tracemalloc.start()
+	result = fn(path)
+	peak = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	close(result)
+
+	return best * 1000, peak / (1024 * 1024)
+
+
+for path in ['resources/biped/biped.scn', 'resources/car_engine/engine.scn']:
+	print(path)
+	open_scene_cache(path).close()  # make sure the cache is up to date before timing it
+
+	for label, fn in [('json.load', load_json), ('lazy, node index', lazy_open_and_index), ('lazy, index + 1 scene anim', lazy_one_scene_anim), ('cache, node index', cache_open_and_index), ('cache, index + 1 scene anim', cache_one_scene_anim)]:
+		ms, mb = measure(fn, path)
+		print('  %-28s %8.2f ms, peak %7.2f MB' % (label, ms, mb))
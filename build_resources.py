@@ -0,0 +1,19 @@
+# Incremental build of the tutorial resources: only the sources that changed since the last build are compiled
+
+import argparse
+import sys
+from helpers.asset_build import AssetBuilder
+
+parser = argparse.ArgumentParser(description='Compile the resources folder with assetc, incrementally')
+parser.add_argument('input', nargs='?', default='resources')
+parser.add_argument('output', nargs='?', default=None, help='defaults to <input>_compiled')
+parser.add_argument('-j', '--jobs', type=int, default=None, help='number of parallel assetc processes')
+parser.add_argument('--assetc', default='assetc', help='path to the assetc executable')
+parser.add_argument('--dry-run', action='store_true', help='list the units to compile, without compiling them')
+args, assetc_args = parser.parse_known_args()  # unknown arguments are passed to assetc (eg. -platform, -api)
+
+builder = AssetBuilder(args.input, args.output, args.jobs, args.assetc, assetc_args)
+failed = builder.build(args.dry_run)
+
+if failed:
+	sys.exit('Failed to compile: %s' % ', '.join(sorted(failed)))
@@ -0,0 +1,44 @@
+# Draw Lines, vertex positions computed with NumPy
+
+import harfang as hg
+import numpy as np
+from helpers.vertex_stream import VertexStream, create_pos_rgb_layout
+
+hg.InputInit()
+hg.WindowSystemInit()
+
+res_x, res_y = 1280, 720
+win = hg.RenderInit('Harfang - Draw Lines (NumPy)', res_x, res_y, hg.RF_VSync | hg.RF_MSAA4X)
+
+line_count = 1000
+
+shader = hg.LoadProgramFromFile('resources_compiled/shaders/pos_rgb')
+
+# vertices, all lines are white
+stream = VertexStream(create_pos_rgb_layout(), line_count * 2)
+stream.color[:] = 1
+
+lines = stream.data.reshape(line_count, 2, 6)
+i = np.arange(line_count, dtype=np.float32)
+
+# main loop
+angle = 0
+
+while not hg.ReadKeyboard().Key(hg.K_Escape) and hg.IsWindowOpen(win):
+	hg.SetViewClear(0, hg.CF_Color | hg.CF_Depth, hg.ColorI(64, 64, 64), 1, 0)
+	hg.SetViewRect(0, 0, 0, res_x, res_y)
+
+	lines[:, 0, 0] = np.sin(angle + i * 0.005)
+	lines[:, 0, 1] = np.cos(angle + i * 0.01)
+	lines[:, 1, 0] = np.sin(angle + i * -0.005)
+	lines[:, 1, 1] = np.cos(angle + i * 0.005)
+
+	stream.draw(0, shader)  # submit all lines in a single call
+
+	angle = angle + hg.time_to_sec_f(hg.TickClock())
+
+	hg.Frame()
+	hg.UpdateWindow(win)
+
+hg.RenderShutdown()
+hg.DestroyWindow(win)
@@ -0,0 +1,46 @@
+# Starfield 3D, star state stored in NumPy arrays and streamed to the lines vertex buffer
+
+import harfang as hg
+from helpers.vertex_stream import VertexStream, Starfield, create_pos_rgb_layout
+
+hg.InputInit()
+hg.WindowSystemInit()
+
+width, height = 1280, 720
+window = hg.RenderInit('Harfang - Starfield (NumPy)', width, height, hg.RF_VSync | hg.RF_MSAA4X)
+
+# vertex layout
+vtx_layout = create_pos_rgb_layout()
+
+# simple shader program
+shader = hg.LoadProgramFromFile('resources_compiled/shaders/pos_rgb')
+
+# initialize stars
+starfield_size = 10
+
+# about the most this path holds at 60 Hz, the per-vertex hg.Vertices copy costs a few microseconds per vertex.
+# benchmark_draw_lines_starfield.py prints the ceiling measured on the running machine
+max_stars = 3000
+stars = Starfield(max_stars, starfield_size)
+stream = VertexStream(vtx_layout, max_stars * 2)
+
+# main loop
+while not hg.ReadKeyboard().Key(hg.K_Escape) and hg.IsWindowOpen(window):
+	hg.SetViewClear(0, hg.CF_Color | hg.CF_Depth, hg.Color.Black, 1, 0)
+	hg.SetViewRect(0, 0, 0, width, height)
+
+	dt = hg.TickClock()
+	dt_f = hg.time_to_sec_f(dt)
+
+	# update all stars at once then write their lines to the vertex stream
+	stars.update(dt_f)
+	stars.write_lines(stream)
+
+	# draw stars as lines
+	stream.draw(0, shader)
+
+	hg.Frame()
+	hg.UpdateWindow(window)
+
+hg.RenderShutdown()
+hg.DestroyWindow(window)
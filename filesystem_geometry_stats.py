@@ -0,0 +1,17 @@
+# Geometry statistics over a resources folder, without starting the renderer
+
+import time
+from helpers.geo_reader import load_geometries, geometry_stats
+
+start = time.perf_counter()
+
+geometries = load_geometries('resources')  # .geo files are memory-mapped, their arrays are not copied
+stats = geometry_stats(geometries)
+
+elapsed_ms = (time.perf_counter() - start) * 1000
+
+for (path, geo), s in zip(geometries.items(), stats):
+	size = s['max'] - s['min']
+	print('- %s: %d vertices, %d triangles, size %.3f x %.3f x %.3f' % (path, s['vtx'], s['triangles'], size[0], size[1], size[2]))
+
+print('%d geometries, %d vertices, %d triangles in %.2f ms' % (len(geometries), stats['vtx'].sum(), stats['triangles'].sum(), elapsed_ms))
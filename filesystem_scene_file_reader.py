@@ -0,0 +1,15 @@
+# Read a scene file without loading it in the engine
+
+from helpers.scn_reader import SceneFile
+
+# the scene file is memory-mapped, sections are only decoded when accessed
+with SceneFile('resources/biped/biped.scn') as scn:
+	print('%d nodes, %d objects, %d anims' % (scn.count('nodes'), scn.count('objects'), scn.count('anims')))
+
+	pelvis = scn.find_node('Bip001 Pelvis')
+	print('Pelvis transform: %s' % scn.get_node_component(pelvis, 'transform'))
+
+	# only the tracks of the requested scene animation are decoded
+	for name in scn.scene_anim_names():
+		scene_anim = scn.get_scene_anim(name)
+		print('- %s: %d animated nodes, %.2f sec' % (name, len(scene_anim['node_anims']), (scene_anim['t_end'] - scene_anim['t_start']) / 1e9))
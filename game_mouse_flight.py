@@ -1,8 +1,8 @@
 # Mouse flight
 
 import harfang as hg
-import math
 import random
+from helpers.debug_draw import DebugDraw
 
 hg.InputInit()
 hg.WindowSystemInit()
@@ -26,22 +26,8 @@ draw2D_program = hg.LoadProgramFromAssets('shaders/pos_rgb')
 draw2D_render_state = hg.ComputeRenderState(hg.BM_Alpha, hg.DT_Less, hg.FC_Disabled)
 
 
-def draw_circle(view_id, center, radius, color):
-	segment_count = 32
-	step = 2 * math.pi / segment_count
-	p0 = hg.Vec3(center.x + radius, center.y, 0)
-	p1 = hg.Vec3(0, 0, 0)
-
-	vtx = hg.Vertices(vtx_layout, segment_count * 2 + 2)
-
-	for i in range(segment_count + 1):
-		p1.x = radius * math.cos(i * step) + center.x
-		p1.y = radius * math.sin(i * step) + center.y
-		vtx.Begin(2 * i).SetPos(p0).SetColor0(color).End()
-		vtx.Begin(2 * i + 1).SetPos(p1).SetColor0(color).End()
-		p0.x, p0.y = p1.x, p1.y
-
-	hg.DrawLines(view_id, vtx, draw2D_program, draw2D_render_state)
+# mouse cursor and other 2D lines are accumulated and drawn once per frame
+debug_draw = DebugDraw(vtx_layout, draw2D_program, draw2D_render_state)
 
 
 # gameplay settings
@@ -115,7 +101,8 @@ while not keyboard.Down(hg.K_Escape) and hg.IsWindowOpen(win):
 
 	# draw 2D GUI
 	hg.SetView2D(view_id, 0, 0, res_x, res_y, -1, 1, hg.CF_Depth, hg.Color.Black, 1, 0, True)
-	draw_circle(view_id, hg.Vec3(mouse_x, mouse_y, 0), 20, hg.Color.White)  # display mouse cursor
+	debug_draw.circle(hg.Vec3(mouse_x, mouse_y, 0), 20, hg.Color.White)  # display mouse cursor
+	debug_draw.flush(view_id)
 
 	# end of frame
 	hg.Frame()
@@ -0,0 +1,267 @@
+# Animation clips decoded once per scene file and shared by all its instances
+
+import harfang as hg
+import numpy as np
+from helpers.scn_cache import open_scene_cache
+
+_clip_sets = {}  # scene path -> ClipSet
+
+
+def _nlerp(a, b, k):
+	"""Normalized lerp between (..., 4) quaternion arrays along the shortest arc, k broadcasts over the last axis"""
+	b = np.where((np.sum(a * b, axis=-1) < 0)[..., None], -b, b)
+	q = a + (b - a) * k
+	q /= np.linalg.norm(q, axis=-1)[..., None]
+	return q
+
+
+def _resample_vec(t, v, grid):
+	return np.stack([np.interp(grid, t, v[:, c]) for c in range(v.shape[1])], axis=1)
+
+
+def _resample_quat(t, v, grid):
+	if len(t) == 1:
+		return np.repeat(v[:1], len(grid), axis=0)
+
+	i = np.clip(np.searchsorted(t, grid, side='right') - 1, 0, len(t) - 2)
+	k = np.clip((grid - t[i]) / np.maximum(t[i + 1] - t[i], 1e-9), 0, 1)
+	return _nlerp(v[i], v[i + 1], k[:, None])
+
+
+class AnimClip:
+	"""A scene animation resampled at a fixed frame rate, its (frame_count, bone_count, n) arrays are read-only and shared"""
+
+	def __init__(self, name, duration, frame_time, pos, rot, scl, pos_bones, rot_bones, scl_bones):
+		self.name = name
+		self.duration = duration  # seconds
+		self.frame_time = frame_time
+		self.frame_count = len(pos)
+
+		self.pos, self.rot, self.scl = pos, rot, scl
+		self.pos_bones, self.rot_bones, self.scl_bones = pos_bones, rot_bones, scl_bones  # indices of the bones animated by each channel
+		self.bones = np.union1d(np.union1d(pos_bones, rot_bones), scl_bones)
+
+		for array in (self.pos, self.rot, self.scl):
+			array.flags.writeable = False
+
+	@property
+	def nbytes(self):
+		return self.pos.nbytes + self.rot.nbytes + self.scl.nbytes
+
+	def sample(self, times):
+		"""Return the (len(times), bone_count, n) position, rotation and scale arrays at times, in seconds from the clip start"""
+		f = np.asarray(times, dtype=np.float32) / self.frame_time
+		i = np.clip(f.astype(np.int32), 0, self.frame_count - 1)
+		j = np.minimum(i + 1, self.frame_count - 1)
+		k = (f - i).clip(0, 1)[:, None, None]
+
+		pos = self.pos[i] + (self.pos[j] - self.pos[i]) * k
+		scl = self.scl[i] + (self.scl[j] - self.scl[i]) * k
+		return pos, _nlerp(self.rot[i], self.rot[j], k), scl
+
+
+class ClipSet:
+	"""All the scene animations of a scene file, over the union of the nodes they animate (the bones)"""
+
+	def __init__(self, path, max_fps=60):
+		self.bones = []
+		self.clips = []
+
+		with open_scene_cache(path) as cache:
+			scene_anims = [cache.get_scene_anim(scene_anim['name']) for scene_anim in cache.get('scene_anims') or []]
+
+			bone_index = {}
+			for scene_anim in scene_anims:
+				for node_name, tracks in scene_anim['node_anims']:
+					bone_index.setdefault(node_name, len(bone_index))
+			self.bones = list(bone_index)
+
+			for scene_anim in scene_anims:
+				self.clips.append(self.__decode(scene_anim, bone_index, max_fps))
+
+		self.__clip_index = {clip.name: i for i, clip in enumerate(self.clips)}
+
+	def __decode(self, scene_anim, bone_index, max_fps):
+		duration = (scene_anim['t_end'] - scene_anim['t_start']) / 1e9
+		t_start = scene_anim['t_start']
+
+		# the grid is as fine as the closest keys of the clip, so that no key is lost
+		intervals = [np.diff(t) for node_name, tracks in scene_anim['node_anims'] for type_, target, t, v in tracks if len(t) > 1]
+		intervals = np.concatenate(intervals) if intervals else np.empty(0)
+		frame_time = max(float(intervals[intervals > 0].min()) / 1e9 if np.any(intervals > 0) else duration, 1 / max_fps)
+
+		frame_count = int(np.ceil(duration / frame_time)) + 1 if duration > 0 else 1
+		grid = np.minimum(np.arange(frame_count) * frame_time, duration)
+
+		B = len(bone_index)
+		pos = np.zeros((frame_count, B, 3), dtype=np.float32)
+		rot = np.zeros((frame_count, B, 4), dtype=np.float32)
+		rot[..., 3] = 1
+		scl = np.ones((frame_count, B, 3), dtype=np.float32)
+		pos_bones, rot_bones, scl_bones = [], [], []
+
+		for node_name, tracks in scene_anim['node_anims']:
+			b = bone_index[node_name]
+
+			for type_, target, t, v in tracks:
+				if len(t) == 0:
+					continue
+				t = (np.asarray(t) - t_start) / 1e9
+
+				if type_ == 'quat' and target == 'Rotation':
+					rot[:, b] = _resample_quat(t, np.asarray(v, dtype=np.float32), grid)
+					rot_bones.append(b)
+				elif type_ == 'vec3' and target == 'Position':
+					pos[:, b] = _resample_vec(t, v, grid)
+					pos_bones.append(b)
+				elif type_ == 'vec3' and target == 'Scale':
+					scl[:, b] = _resample_vec(t, v, grid)
+					if np.abs(scl[:, b] - 1).max() > 1e-4:  # most clips never scale their bones, do not write it back
+						scl_bones.append(b)
+
+		as_indices = lambda bones: np.array(sorted(bones), dtype=np.int32)
+		return AnimClip(scene_anim['name'], duration, frame_time, pos, rot, scl, as_indices(pos_bones), as_indices(rot_bones), as_indices(scl_bones))
+
+	@property
+	def nbytes(self):
+		return sum(clip.nbytes for clip in self.clips)
+
+	def clip_index(self, name):
+		return self.__clip_index[name]
+
+
+def get_clip_set(path):
+	"""Decode the scene animations of a .scn file on first use, later calls share the same ClipSet"""
+	clip_set = _clip_sets.get(path)
+	if clip_set is None:
+		clip_set = _clip_sets[path] = ClipSet(path)
+	return clip_set
+
+
+class AnimPlayheads:
+	"""Playhead and cross-fade state of each animated instance, the clips themselves are shared.
+
+	Instances are created without their scene animations (flags without hg.LSSF_Anims) and their bone nodes are posed from the shared clips.
+	"""
+
+	def __init__(self, clip_set, blend_time=0.25):
+		self.clip_set = clip_set
+		self.blend_time = blend_time
+
+		self.bones = []  # per instance, its bone nodes in clip_set.bones order (None for missing nodes)
+
+		self.clip = np.empty(0, dtype=np.int16)  # -1 when stopped
+		self.time = np.empty(0, dtype=np.float32)
+		self.prev_clip = np.empty(0, dtype=np.int16)  # clip faded out, -1 when not blending
+		self.prev_time = np.empty(0, dtype=np.float32)
+		self.blend = np.empty(0, dtype=np.float32)  # cross-fade progress from 0 to 1
+
+		self.__durations = np.array([max(clip.duration, 1e-6) for clip in clip_set.clips], dtype=np.float32)
+
+	def __len__(self):
+		return len(self.bones)
+
+	@property
+	def nbytes(self):
+		return sum(a.nbytes for a in (self.clip, self.time, self.prev_clip, self.prev_time, self.blend))
+
+	def add(self, instance_nodes, scene):
+		"""Add instances from their instance root nodes"""
+		for node in instance_nodes:
+			view = node.GetInstanceSceneView()
+			bones = []
+			for name in self.clip_set.bones:
+				bone = view.GetNode(scene, name)
+				bones.append(bone if bone.IsValid() else None)
+			self.bones.append(bones)
+
+		self.__grow(len(instance_nodes))
+
+	def add_playheads(self, count):
+		"""Add playheads bound to no node, their poses can only be sampled"""
+		self.bones.extend([None] * len(self.clip_set.bones) for i in range(count))
+		self.__grow(count)
+
+	def __grow(self, count):
+		self.clip = np.concatenate((self.clip, np.full(count, -1, dtype=np.int16)))
+		self.time = np.concatenate((self.time, np.zeros(count, dtype=np.float32)))
+		self.prev_clip = np.concatenate((self.prev_clip, np.full(count, -1, dtype=np.int16)))
+		self.prev_time = np.concatenate((self.prev_time, np.zeros(count, dtype=np.float32)))
+		self.blend = np.concatenate((self.blend, np.ones(count, dtype=np.float32)))
+
+	def pop(self):
+		"""Remove the last added instance"""
+		self.bones.pop()
+		self.clip, self.time, self.prev_clip, self.prev_time, self.blend = self.clip[:-1], self.time[:-1], self.prev_clip[:-1], self.prev_time[:-1], self.blend[:-1]
+
+	def play(self, indices, clips):
+		"""Start looping clips (indices in the clip set) on the instances at indices, fading out what they were playing"""
+		indices = np.asarray(indices)
+		playing = self.clip[indices] >= 0
+
+		self.prev_clip[indices] = np.where(playing, self.clip[indices], -1)
+		self.prev_time[indices] = self.time[indices]
+		self.blend[indices] = np.where(playing, 0, 1)
+
+		self.clip[indices] = clips
+		self.time[indices] = 0
+
+	def update(self, dt, indices=None):
+		"""Advance the playheads by dt seconds"""
+		if indices is None:
+			indices = slice(None)
+
+		self.time[indices] = np.mod(self.time[indices] + dt, self.__durations[self.clip[indices]])
+		self.prev_time[indices] = np.mod(self.prev_time[indices] + dt, self.__durations[self.prev_clip[indices]])
+
+		blend = np.minimum(self.blend[indices] + dt / self.blend_time, 1)
+		self.blend[indices] = blend
+		self.prev_clip[indices] = np.where(blend >= 1, -1, self.prev_clip[indices])
+
+	def sample(self, indices=None):
+		"""Yield the poses of the instances at indices as (instance indices, clip, pos, rot, scl), one group per playing clip"""
+		indices = np.arange(len(self.bones)) if indices is None else np.asarray(indices)
+		clips = self.clip_set.clips
+
+		for c in np.unique(self.clip[indices]).tolist():
+			if c < 0:
+				continue
+			clip = clips[c]
+			group = indices[self.clip[indices] == c]
+
+			pos, rot, scl = clip.sample(self.time[group])
+
+			# cross-fade from the previous clip, only for the bones that both clips animate
+			blending = np.flatnonzero(self.prev_clip[group] >= 0)
+			for p in np.unique(self.prev_clip[group[blending]]).tolist():
+				sub = blending[self.prev_clip[group[blending]] == p]
+				p_pos, p_rot, p_scl = clips[p].sample(self.prev_time[group[sub]])
+				k = self.blend[group[sub]][:, None, None]
+
+				shared = np.intersect1d(clip.bones, clips[p].bones)
+				pos[np.ix_(sub, shared)] = p_pos[:, shared] + (pos[np.ix_(sub, shared)] - p_pos[:, shared]) * k
+				rot[np.ix_(sub, shared)] = _nlerp(p_rot[:, shared], rot[np.ix_(sub, shared)], k)
+				scl[np.ix_(sub, shared)] = p_scl[:, shared] + (scl[np.ix_(sub, shared)] - p_scl[:, shared]) * k
+
+			yield group, clip, pos, rot, scl
+
+	def apply(self, indices=None):
+		"""Write the pose of the instances at indices to their bone nodes"""
+		for group, clip, pos, rot, scl in self.sample(indices):
+			self.__write(group, clip, pos, rot, scl)
+
+	def __write(self, group, clip, pos, rot, scl):
+		pos_bones, rot_bones, scl_bones = clip.pos_bones.tolist(), clip.rot_bones.tolist(), clip.scl_bones.tolist()
+
+		for i, inst_pos, inst_rot, inst_scl in zip(group.tolist(), pos[:, clip.pos_bones].tolist(), rot[:, clip.rot_bones].tolist(), scl[:, clip.scl_bones].tolist()):
+			bones = self.bones[i]
+
+			for b, (x, y, z) in zip(pos_bones, inst_pos):
+				if bones[b] is not None:
+					bones[b].GetTransform().SetPos(hg.Vec3(x, y, z))
+			for b, (x, y, z, w) in zip(rot_bones, inst_rot):
+				if bones[b] is not None:
+					bones[b].GetTransform().SetRot(hg.ToEuler(hg.Quaternion(x, y, z, w)))
+			for b, (x, y, z) in zip(scl_bones, inst_scl):
+				if bones[b] is not None:
+					bones[b].GetTransform().SetScale(hg.Vec3(x, y, z))
@@ -0,0 +1,67 @@
+# Animation level of detail: distant instances update their skeleton less often
+
+import time
+from math import tan
+
+import numpy as np
+
+
+def screen_size_distances(sizes, radius, fov):
+	"""Convert screen size thresholds (fraction of the screen height covered by a sphere of radius) to camera distances"""
+	return [radius / (size * tan(fov / 2)) for size in sizes]
+
+
+class AnimLOD:
+	"""Bucket instances by distance to the camera, bucket i updates its skeletons every rates[i] frames.
+
+	The instances of a throttled bucket are spread over its frames by a phase (their index modulo the rate), so that the same number of them is updated every frame. An instance advances by all the time elapsed since its last update.
+	"""
+
+	def __init__(self, camera_pos, distances=(10, 20, 40), rates=(1, 2, 4, 8)):
+		assert len(rates) == len(distances) + 1
+
+		self.camera_pos = np.array(camera_pos, dtype=np.float32)
+		self.distances = np.array(distances, dtype=np.float32)
+		self.rates = np.array(rates, dtype=np.int32)
+
+		self.frame = 0
+		self.pending = np.empty(0, dtype=np.float32)  # time elapsed since the last update of each instance
+
+		self.stats = {
+			'instances': np.zeros(len(rates), dtype=np.int64),  # per bucket
+			'updated': np.zeros(len(rates), dtype=np.int64),  # per bucket, this frame
+			'frame_ms': 0, 'avg_ms': 0, 'max_ms': 0,  # skeleton update cost
+		}
+
+	def schedule(self, pos, dt):
+		"""Return the indices of the instances (at positions pos) to update this frame and the time to advance each of them by"""
+		count = len(pos)
+		if len(self.pending) != count:  # instances were added or removed at the end
+			self.pending = np.concatenate((self.pending[:count], np.zeros(max(count - len(self.pending), 0), dtype=np.float32)))
+
+		self.pending += dt
+
+		bucket = np.searchsorted(self.distances, np.linalg.norm(pos - self.camera_pos, axis=1))
+		rate = self.rates[bucket]
+		due = np.flatnonzero((self.frame + np.arange(count)) % rate == 0)
+
+		dts = self.pending[due]
+		self.pending[due] = 0
+		self.frame += 1
+
+		self.stats['instances'] = np.bincount(bucket, minlength=len(self.rates))
+		self.stats['updated'] = np.bincount(bucket[due], minlength=len(self.rates))
+		return due, dts
+
+	def update(self, player, pos, dt):
+		"""Advance and pose the instances of an AnimPlayheads player that are due this frame"""
+		start = time.perf_counter()
+
+		due, dts = self.schedule(pos, dt)
+		player.update(dts, due)
+		player.apply(due)
+
+		frame_ms = (time.perf_counter() - start) * 1000
+		self.stats['frame_ms'] = frame_ms
+		self.stats['avg_ms'] += (frame_ms - self.stats['avg_ms']) * 0.05
+		self.stats['max_ms'] = max(self.stats['max_ms'], frame_ms)
@@ -0,0 +1,241 @@
+# Incremental asset compilation driver, runs assetc only on the sources that changed
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+	import harfang as hg
+except ImportError:  # build machines only need assetc
+	hg = None
+
+_include_re = re.compile(rb'^\s*#\s*include\s*[<"]([^>"]+)[>"]', re.MULTILINE)
+_program_re = re.compile(r'^(.*?)(?:_vs\.sc|_fs\.sc|_cs\.sc|_varying\.def|\.hps)$')
+
+manifest_name = '.build_manifest.json'
+
+
+def list_files(folder):
+	"""Relative paths of all the files in a folder, using the same listing as filesystem_recursive_directory_listing.py"""
+	if hg is not None:
+		return sorted(entry.name.replace('\\', '/') for entry in hg.ListDirRecursive(folder, hg.DE_File))
+
+	files = []
+	for root, dirs, names in os.walk(folder):
+		for name in names:
+			files.append(os.path.relpath(os.path.join(root, name), folder).replace(os.sep, '/'))
+	return sorted(files)
+
+
+def get_unit(path):
+	"""Name of the compilation unit a source belongs to, None for the files that are only dependencies"""
+	if path.endswith('.meta') or path.endswith('.sh') or path == 'project.prj':
+		return None
+	m = _program_re.match(path)
+	if m:
+		return m.group(1) + ' (program)'  # vertex, fragment, varying and pipeline shader files compile together
+	return path
+
+
+def scan_dependencies(folder, files):
+	"""Direct dependencies of each file: shader includes, varying definitions and .meta profiles"""
+	file_set = set(files)
+	deps = {}
+
+	for path in files:
+		d = set()
+
+		if path + '.meta' in file_set:
+			d.add(path + '.meta')
+
+		if path.endswith('.sc') or path.endswith('.sh'):
+			with open(os.path.join(folder, path), 'rb') as f:
+				source = f.read()
+
+			search_dirs = [os.path.dirname(path)]
+			for include in _include_re.findall(source):
+				include = include.decode('utf-8')
+				for search_dir in search_dirs:
+					candidate = os.path.normpath(os.path.join(search_dir, include)).replace(os.sep, '/')
+					if candidate in file_set:
+						d.add(candidate)
+						break
+
+		deps[path] = d
+
+	# the files of a shader program depend on each other
+	programs = {}
+	for path in files:
+		unit = get_unit(path)
+		if unit is not None and unit.endswith(' (program)'):
+			programs.setdefault(unit, set()).add(path)
+	for paths in programs.values():
+		for path in paths:
+			deps[path] |= paths - {path}
+
+	return deps
+
+
+def _closure(path, deps):
+	seen, stack = set(), [path]
+	while stack:
+		p = stack.pop()
+		if p not in seen:
+			seen.add(p)
+			stack.extend(deps.get(p, ()))
+	return seen
+
+
+def _hash_file(path):
+	h = hashlib.sha1()
+	with open(path, 'rb') as f:
+		for chunk in iter(lambda: f.read(1 << 20), b''):
+			h.update(chunk)
+	return h.hexdigest()
+
+
+class AssetBuilder:
+	"""Keep a manifest of the source hashes in the output folder and only recompile the units whose inputs changed.
+
+	A unit is a single source, or all the files of a shader program. Its inputs are the unit files, their .meta profiles and the shader files they include (transitively).
+	"""
+
+	def __init__(self, input_folder='resources', output_folder=None, job_count=None, assetc='assetc', assetc_args=()):
+		self.input_folder = input_folder
+		self.output_folder = output_folder or input_folder.rstrip('/\\') + '_compiled'
+		self.job_count = job_count or os.cpu_count() or 1
+		self.assetc = assetc
+		self.assetc_args = list(assetc_args)
+
+		self.manifest_path = os.path.join(self.output_folder, manifest_name)
+		self.manifest = {'files': {}, 'units': {}}
+
+		if os.path.exists(self.manifest_path):
+			with open(self.manifest_path, 'r') as f:
+				self.manifest = json.load(f)
+
+	def hash_files(self, files):
+		"""Content hash of each file, reusing the manifest hash when the size and modification time did not change"""
+		known = self.manifest['files']
+		hashes, to_hash = {}, []
+
+		for path in files:
+			st = os.stat(os.path.join(self.input_folder, path))
+			entry = known.get(path)
+			if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+				hashes[path] = entry[2]
+			else:
+				to_hash.append((path, st))
+
+		with ThreadPoolExecutor(self.job_count) as executor:  # hashlib releases the GIL on large buffers
+			for (path, st), h in zip(to_hash, executor.map(lambda e: _hash_file(os.path.join(self.input_folder, e[0])), to_hash)):
+				hashes[path] = h
+				known[path] = [st.st_size, st.st_mtime_ns, h]
+
+		for path in list(known):
+			if path not in hashes:
+				del known[path]
+
+		return hashes
+
+	def get_outdated_units(self):
+		"""Return a {unit: (inputs, hash)} dict of the units that need to be compiled"""
+		files = list_files(self.input_folder)
+		hashes = self.hash_files(files)
+		deps = scan_dependencies(self.input_folder, files)
+
+		units = {}
+		for path in files:
+			unit = get_unit(path)
+			if unit is not None:
+				units.setdefault(unit, set()).update(_closure(path, deps))
+
+		outdated = {}
+		for unit, inputs in units.items():
+			h = hashlib.sha1()
+			for path in sorted(inputs):
+				h.update(path.encode('utf-8'))
+				h.update(hashes[path].encode('ascii'))
+			unit_hash = h.hexdigest()
+
+			if self.manifest['units'].get(unit) != unit_hash:
+				outdated[unit] = (inputs, unit_hash)
+
+		for unit in list(self.manifest['units']):
+			if unit not in units:
+				del self.manifest['units'][unit]  # source removed, its compiled files are left in place
+
+		return outdated
+
+	def __partition(self, outdated):
+		"""Split the units in job_count groups of similar input size"""
+		groups = [[0, []] for i in range(min(self.job_count, len(outdated)))]
+		sizes = {unit: sum(self.manifest['files'][p][0] for p in inputs) for unit, (inputs, h) in outdated.items()}
+
+		for unit in sorted(outdated, key=lambda u: -sizes[u]):
+			group = min(groups, key=lambda g: g[0])
+			group[0] += sizes[unit]
+			group[1].append(unit)
+
+		return [units for size, units in groups if units]
+
+	def __compile_group(self, units, outdated):
+		"""Stage the inputs of a group of units in a temporary folder and run assetc on it"""
+		staging = tempfile.mkdtemp(prefix='assetc_')
+		try:
+			inputs = set()
+			for unit in units:
+				inputs |= outdated[unit][0]
+
+			for path in sorted(inputs) + ['project.prj']:
+				src = os.path.join(self.input_folder, path)
+				if os.path.exists(src):
+					dst = os.path.join(staging, path)
+					os.makedirs(os.path.dirname(dst), exist_ok=True)
+					shutil.copy2(src, dst)
+
+			cmd = [self.assetc, staging, os.path.abspath(self.output_folder)] + self.assetc_args
+			result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+			return units, result.returncode, result.stdout.decode('utf-8', 'replace')
+		finally:
+			shutil.rmtree(staging, ignore_errors=True)
+
+	def build(self, dry_run=False, log=print):
+		"""Compile the outdated units over job_count parallel assetc processes, return the list of units that failed"""
+		outdated = self.get_outdated_units()
+		log('%d unit(s) to compile' % len(outdated))
+
+		if dry_run or not outdated:
+			for unit in sorted(outdated):
+				log('- %s' % unit)
+			if not outdated:
+				self.save_manifest()
+			return []
+
+		os.makedirs(self.output_folder, exist_ok=True)
+		failed = []
+
+		# the threads only wait on the assetc processes
+		with ThreadPoolExecutor(self.job_count) as executor:
+			for units, returncode, output in executor.map(lambda units: self.__compile_group(units, outdated), self.__partition(outdated)):
+				if returncode == 0:
+					for unit in units:
+						self.manifest['units'][unit] = outdated[unit][1]
+				else:
+					failed.extend(units)
+					log(output)
+
+		self.save_manifest()
+		log('%d unit(s) compiled, %d failed' % (len(outdated) - len(failed), len(failed)))
+		return failed
+
+	def save_manifest(self):
+		os.makedirs(self.output_folder, exist_ok=True)
+		with open(self.manifest_path + '.tmp', 'w') as f:
+			json.dump(self.manifest, f)
+		os.replace(self.manifest_path + '.tmp', self.manifest_path)
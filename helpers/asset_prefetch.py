@@ -0,0 +1,184 @@
+# Dependency index of the HARFANG scenes and background prefetch of the files they reference
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from helpers.scn_reader import SceneFile
+
+_environment_maps = ['brdf_map', 'irradiance_map', 'radiance_map']
+
+
+def collect_scene_dependencies(scn_path, folder='resources_compiled', deps=None):
+	"""Walk a scene and its instances, return the geometries, textures and programs they reference"""
+	if deps is None:
+		deps = {'scenes': [], 'geometries': [], 'textures': [], 'programs': []}
+
+	if scn_path in deps['scenes']:
+		return deps  # instantiated more than once
+	deps['scenes'].append(scn_path)
+
+	def add(kind, path):
+		if path and path not in deps[kind]:
+			deps[kind].append(path)
+
+	with SceneFile(os.path.join(folder, scn_path)) as scn:
+		for obj in scn.get('objects', []):
+			add('geometries', obj.get('name'))
+			for mat in obj.get('materials', []):
+				add('programs', mat.get('program'))
+				for tex in mat.get('textures', []):
+					add('textures', tex.get('path'))
+
+		env = scn.get('environment', {})
+		for key in _environment_maps:
+			add('textures', env.get(key) or env.get('probe', {}).get(key))
+
+		instances = [inst['name'] for inst in scn.get('instances', [])]
+
+	for path in instances:
+		collect_scene_dependencies(path, folder, deps)
+
+	return deps
+
+
+def _list_files(folder, deps):
+	"""Files on disk backing the dependencies, a pipeline program is compiled to several files sharing its name"""
+	files = []
+
+	for kind in ['scenes', 'geometries', 'textures']:
+		for path in deps[kind]:
+			if os.path.isfile(os.path.join(folder, path)):
+				files.append(path)
+
+	for path in deps['programs']:
+		prg_dir, prg_name = os.path.split(path)
+		stem = os.path.splitext(prg_name)[0]
+		for name in sorted(os.listdir(os.path.join(folder, prg_dir))):
+			if name.startswith(stem):
+				files.append(prg_dir + '/' + name if prg_dir else name)
+
+	return files
+
+
+def _stamp(path):
+	st = os.stat(path)
+	return [st.st_size, st.st_mtime_ns]
+
+
+def get_dependency_index(scn_path, folder='resources_compiled', cache_dir='scene_cache'):
+	"""Dependency index of a scene, cached as JSON and rebuilt when one of the scenes it walked changes"""
+	name = os.path.normpath(os.path.join(folder, scn_path)).replace(os.sep, '_').replace(':', '_')
+	index_path = os.path.join(cache_dir, name + '.deps.json')
+
+	try:
+		with open(index_path, 'r') as f:
+			index = json.load(f)
+		if all(_stamp(os.path.join(folder, path)) == stamp for path, stamp in index['stamps'].items()):
+			return index
+	except (OSError, ValueError, KeyError):
+		pass
+
+	index = collect_scene_dependencies(scn_path, folder)
+	index['files'] = _list_files(folder, index)
+	index['stamps'] = {path: _stamp(os.path.join(folder, path)) for path in index['scenes']}
+
+	os.makedirs(cache_dir, exist_ok=True)
+	with open(index_path + '.tmp', 'w') as f:
+		json.dump(index, f)
+	os.replace(index_path + '.tmp', index_path)
+
+	return index
+
+
+class AssetPrefetcher:
+	"""Read files ahead in background threads so that the blocking loads that follow hit the OS file cache"""
+
+	def __init__(self, folder='resources_compiled', thread_count=8):
+		self.folder = folder
+		self.executor = ThreadPoolExecutor(thread_count)
+		self.futures = []
+		self.stats = {'files': 0, 'bytes': 0, 'seconds': 0.0}
+		self.__start = None
+
+	def __read(self, path):
+		size = 0
+		buffer = bytearray(1 << 20)
+		try:
+			with open(os.path.join(self.folder, path), 'rb', buffering=0) as f:
+				n = f.readinto(buffer)  # file reads release the GIL
+				while n:
+					size += n
+					n = f.readinto(buffer)
+		except OSError:
+			return 0
+		return size
+
+	def prefetch(self, index):
+		"""Start reading all the files of a dependency index, largest first"""
+		if self.__start is None:
+			self.__start = time.perf_counter()
+
+		files = index['files']
+		sizes = {}
+		for path in files:
+			try:
+				sizes[path] = os.path.getsize(os.path.join(self.folder, path))
+			except OSError:
+				sizes[path] = 0
+
+		for path in sorted(files, key=lambda p: -sizes[p]):
+			self.futures.append(self.executor.submit(self.__read, path))
+
+	def done(self):
+		return all(future.done() for future in self.futures)
+
+	def wait(self):
+		"""Block until all the pending reads are complete"""
+		wait(self.futures)
+		for future in self.futures:
+			self.stats['files'] += 1
+			self.stats['bytes'] += future.result()
+		self.futures = []
+
+		if self.__start is not None:
+			self.stats['seconds'] += time.perf_counter() - self.__start
+			self.__start = None
+
+		return self.stats
+
+	def close(self):
+		self.executor.shutdown(wait=True)
+
+
+def preload_resources(index, res, pipeline_info):
+	"""Load the models and programs of a dependency index to the pipeline resources, LoadSceneFromAssets then reuses them by name.
+
+	Must be called from the rendering thread. Textures are left to the scene loader as it applies their .meta sampling flags.
+	"""
+	import harfang as hg
+
+	for path in index['programs']:
+		hg.LoadPipelineProgramRefFromAssets(path, res, pipeline_info)
+
+	for path in index['geometries']:
+		if not res.HasModel(path):
+			res.AddModel(path, hg.LoadModelFromAssets(path))
+
+
+def prefetch_scene(scn_path, folder='resources_compiled'):
+	"""Start reading the files of a scene in background threads, call before initializing the renderer.
+
+	Return a function taking (res, pipeline_info) that waits for the reads and preloads the models and programs, call it before LoadSceneFromAssets.
+	"""
+	index = get_dependency_index(scn_path, folder)
+	prefetcher = AssetPrefetcher(folder)
+	prefetcher.prefetch(index)
+
+	def wait_and_preload(res, pipeline_info):
+		stats = prefetcher.wait()
+		prefetcher.close()
+		preload_resources(index, res, pipeline_info)
+		return stats
+
+	return wait_and_preload
@@ -0,0 +1,104 @@
+# Offscreen batch capture: several texture readbacks in flight, PNG files written by a pool of threads
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import harfang as hg
+
+
+class CaptureSlot:
+	"""Offscreen framebuffer with its readback texture, busy from its capture until the readback is done"""
+
+	def __init__(self, res, width, height, msaa, index):
+		self.frame_buffer = hg.CreateFrameBuffer(width, height, hg.TF_RGBA8, hg.TF_D24, msaa, 'capture_%d' % index)
+		self.tex_color = hg.GetColorTexture(self.frame_buffer)
+		self.tex_color_ref = res.AddTexture('capture_%d' % index, self.tex_color)
+		self.tex_readback = hg.CreateTexture(width, height, 'capture_readback_%d' % index, hg.TF_ReadBack | hg.TF_BlitDestination, hg.TF_RGBA8)
+
+		self.picture = None
+		self.path = None
+		self.ready_frame = None  # frame at which the readback is done, None when the slot is free
+
+
+class BatchCapture:
+	"""Render a list of frames to a ring of offscreen framebuffers and save them as PNG files without waiting on the readbacks nor on the disk.
+
+	A slot is captured with hg.CaptureTexture() and released once its readback is done, a few frames later. Its picture is then handed over to a worker thread that writes the PNG file and the slot gets another picture from a pool, so rendering goes on while the files are written.
+	"""
+
+	def __init__(self, res, width, height, slot_count=3, worker_count=None, msaa=4, max_pictures=None):
+		self.res = res
+		self.width, self.height = width, height
+
+		self.slots = [CaptureSlot(res, width, height, msaa, i) for i in range(slot_count)]
+		self.__next_slot = 0
+
+		self.max_pictures = max_pictures or slot_count * 4  # bounds the memory used by pictures waiting to be saved
+		self.__picture_count = 0
+		self.__free_pictures = deque()  # returned by the worker threads once saved
+
+		self.__executor = ThreadPoolExecutor(worker_count or os.cpu_count() or 1)
+		self.__saves = []
+		self.__stats_lock = threading.Lock()
+
+		self.stats = {'captured': 0, 'saved': 0, 'failed': 0, 'max_in_flight': 0, 'stalls': 0}
+
+	def __get_picture(self):
+		if self.__free_pictures:
+			return self.__free_pictures.popleft()
+		if self.__picture_count < self.max_pictures:
+			self.__picture_count += 1
+			return hg.Picture(self.width, self.height, hg.PF_RGBA32)
+		return None
+
+	def acquire(self):
+		"""Return the next free slot to render to, or None when all slots wait on their readback or all pictures wait to be saved"""
+		slot = self.slots[self.__next_slot]
+
+		if slot.ready_frame is None and slot.picture is None:
+			slot.picture = self.__get_picture()
+
+		if slot.ready_frame is not None or slot.picture is None:
+			self.stats['stalls'] += 1
+			return None
+
+		self.__next_slot = (self.__next_slot + 1) % len(self.slots)
+		return slot
+
+	def capture(self, view_id, slot, path):
+		"""Queue the readback of a slot, its content is saved to path once it is done. Return the next free view id"""
+		slot.ready_frame, view_id = hg.CaptureTexture(view_id, self.res, slot.tex_color_ref, slot.tex_readback, slot.picture)
+		slot.path = path
+
+		self.stats['captured'] += 1
+		self.stats['max_in_flight'] = max(self.stats['max_in_flight'], sum(1 for s in self.slots if s.ready_frame is not None))
+		return view_id
+
+	def update(self, frame):
+		"""Hand the readbacks done at frame (as returned by hg.Frame()) over to the worker threads"""
+		for slot in self.slots:
+			if slot.ready_frame is not None and slot.ready_frame <= frame:
+				self.__saves.append(self.__executor.submit(self.__save, slot.picture, slot.path))
+				slot.picture, slot.path, slot.ready_frame = None, None, None
+
+		self.__saves = [save for save in self.__saves if not save.done()]
+
+	def __save(self, picture, path):
+		ok = hg.SavePNG(picture, path)
+		with self.__stats_lock:
+			self.stats['saved' if ok else 'failed'] += 1
+		self.__free_pictures.append(picture)
+
+	def busy(self):
+		"""True while readbacks are in flight"""
+		return any(slot.ready_frame is not None for slot in self.slots)
+
+	def pending_saves(self):
+		return len(self.__saves)
+
+	def close(self):
+		"""Wait for the files to be written, call once no readback is in flight anymore"""
+		self.__executor.shutdown()
+		self.__saves = []
@@ -0,0 +1,131 @@
+# Crowd of walking actors updated with NumPy, replacing one Python state machine per actor
+
+import harfang as hg
+import numpy as np
+
+states = ['idle', 'walk', 'run']
+speeds = np.array([0, 1.15, 4.5], dtype=np.float32)  # m/sec, actors move backward along their Z axis
+turn_rates = np.array([0, hg.Deg(50), -hg.Deg(70)], dtype=np.float32)  # rad/sec around the Y axis
+
+
+class Crowd:
+	"""Position, heading, state and state timer of every actor in arrays, all actors are advanced by a few array operations per frame.
+
+	Only the actors that moved have their transform written back, and an animation is only started when an actor switches to another state. Set animations to False for nodes without instance animations (eg. in a headless benchmark), or pass an AnimPlayheads player to animate the actors from shared clips instead of their instance animations. The skeletons of a player are updated at full rate unless an AnimLOD scheduler is given.
+	"""
+
+	def __init__(self, scene, bounds_min=(-10, 0, -10), bounds_max=(10, 0, 10), seed=None, animations=True, player=None, lod=None):
+		self.scene = scene
+		self.bounds_min = np.array(bounds_min, dtype=np.float32)
+		self.bounds_max = np.array(bounds_max, dtype=np.float32)
+		self.rng = np.random.default_rng(seed)
+		self.animations = animations
+		self.player = player
+		self.lod = lod
+		if player is not None:
+			self.state_clips = np.array([player.clip_set.clip_index(name) for name in states], dtype=np.int16)
+
+		self.nodes = []
+		self.anims = []  # per actor, its instance animation for each state
+		self.playing = []  # per actor, the scene reference of its playing animation
+
+		self.pos = np.empty((0, 3), dtype=np.float32)
+		self.heading = np.empty(0, dtype=np.float32)
+		self.state = np.empty(0, dtype=np.int8)  # index in states, -1 until the first update
+		self.timer = np.empty(0, dtype=np.float32)  # seconds before the next state change
+
+		self.stats = {'moved': 0, 'state_changes': 0, 'anim_switches': 0}
+
+	def __len__(self):
+		return len(self.nodes)
+
+	def add(self, nodes, pos, heading):
+		"""Add actors from their instance nodes, positions (N, 3) and headings in radians (N)"""
+		nodes = list(nodes)
+		pos = np.asarray(pos, dtype=np.float32).reshape(-1, 3)
+		heading = np.asarray(heading, dtype=np.float32).reshape(-1)
+
+		self.nodes.extend(nodes)
+		if self.player is not None:
+			self.player.add(nodes, self.scene)
+		elif self.animations:
+			self.anims.extend([node.GetInstanceSceneAnim(name) for name in states] for node in nodes)
+		self.playing.extend([None] * len(nodes))
+
+		self.pos = np.concatenate((self.pos, pos))
+		self.heading = np.concatenate((self.heading, heading))
+		self.state = np.concatenate((self.state, np.full(len(nodes), -1, dtype=np.int8)))
+		self.timer = np.concatenate((self.timer, np.zeros(len(nodes), dtype=np.float32)))
+
+		self.__write(np.arange(len(self.nodes) - len(nodes), len(self.nodes)))
+
+	def pop(self):
+		"""Remove the last added actor, return its node"""
+		if self.playing[-1] is not None:
+			self.scene.StopAnim(self.playing[-1])
+
+		node = self.nodes.pop()
+		if self.player is not None:
+			self.player.pop()
+		elif self.animations:
+			self.anims.pop()
+		self.playing.pop()
+
+		self.pos, self.heading, self.state, self.timer = self.pos[:-1], self.heading[:-1], self.state[:-1], self.timer[:-1]
+		return node
+
+	def update(self, dt):
+		"""Advance all actors by dt seconds"""
+		# state changes, every 2 to 6 seconds
+		self.timer -= dt
+		expired = np.flatnonzero(self.timer <= 0)
+
+		if len(expired):
+			new_state = self.rng.integers(0, len(states), len(expired)).astype(np.int8)
+			self.timer[expired] += self.rng.uniform(2, 6, len(expired)).astype(np.float32)
+
+			changed = expired[new_state != self.state[expired]]
+			self.state[expired] = new_state
+			self.stats['state_changes'] += len(expired)
+
+			if self.player is not None:
+				self.player.play(changed, self.state_clips[self.state[changed]])
+				self.stats['anim_switches'] += len(changed)
+			elif self.animations:
+				self.__switch_anims(changed)
+
+		if self.lod is not None:
+			self.lod.update(self.player, self.pos, dt)
+		elif self.player is not None:
+			self.player.update(dt)
+			self.player.apply()
+
+		# motion, along the Z axis of the heading before it turns
+		moving = np.flatnonzero(self.state > 0)
+		state = self.state[moving]
+		heading = self.heading[moving]
+
+		step = speeds[state] * dt
+		pos = self.pos[moving]
+		pos[:, 0] -= np.sin(heading) * step
+		pos[:, 2] -= np.cos(heading) * step
+		np.clip(pos, self.bounds_min, self.bounds_max, out=pos)  # confine actors to the playground
+
+		self.pos[moving] = pos
+		self.heading[moving] = heading + turn_rates[state] * dt
+
+		self.__write(moving)
+		self.stats['moved'] = len(moving)
+
+	def __switch_anims(self, indices):
+		for i, state in zip(indices.tolist(), self.state[indices].tolist()):
+			if self.playing[i] is not None:
+				self.scene.StopAnim(self.playing[i])
+			self.playing[i] = self.scene.PlayAnim(self.anims[i][state], hg.ALM_Loop)
+
+		self.stats['anim_switches'] += len(indices)
+
+	def __write(self, indices):
+		nodes = self.nodes
+		for i, (x, y, z), heading in zip(indices.tolist(), self.pos[indices].tolist(), self.heading[indices].tolist()):
+			nodes[i].GetTransform().SetPosRot(hg.Vec3(x, y, z), hg.Vec3(0, heading, 0))
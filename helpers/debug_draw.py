@@ -0,0 +1,122 @@
+# Debug drawing: lines, crosses, boxes and circles accumulated in a single vertex buffer and drawn once per view
+
+import harfang as hg
+import numpy as np
+import time
+from helpers.vertex_stream import VertexStream
+
+# box corners as (x, y, z) picks between min (0) and max (1), and the 12 edges joining them
+_box_corners = np.array([[(i >> 0) & 1, (i >> 1) & 1, (i >> 2) & 1] for i in range(8)], dtype=np.float32)
+_box_edges = np.array([[0, 1], [2, 3], [4, 5], [6, 7], [0, 2], [1, 3], [4, 6], [5, 7], [0, 4], [1, 5], [2, 6], [3, 7]])
+
+_axis_colors = np.array([[1, 0, 0, 1], [0, 1, 0, 1], [0, 0, 1, 1]], dtype=np.float32)  # red, green, blue
+
+
+def _as_array(v, width):
+	"""Convert hg.Vec3, hg.Color, sequences and arrays to a (N, width) float32 array"""
+	if hasattr(v, 'x'):
+		v = (v.x, v.y, v.z)
+	elif hasattr(v, 'r'):
+		v = (v.r, v.g, v.b, v.a)
+	return np.asarray(v, dtype=np.float32).reshape(-1, width)
+
+
+class DebugDraw:
+	"""Lines accumulated in a growable [x, y, z, r, g, b, a] vertex stream, flushed to a view with as few hg.DrawLines calls as possible.
+
+	The stream keeps its capacity from one frame to the next, works with any layout holding a position and a color.
+	"""
+
+	max_vtx_per_draw = 65536  # stay well under the bgfx transient vertex buffer size
+
+	def __init__(self, vtx_layout, prg, render_state=None, capacity=4096):
+		self.vtx_layout = vtx_layout
+		self.prg = prg
+		self.render_state = render_state
+
+		self.stream = VertexStream(vtx_layout, min(capacity, self.max_vtx_per_draw), color_width=4)
+		self.stream.count = 0
+		self.stream.reserve(capacity)
+
+		self.stats = {'vertices': 0, 'draw_calls': 0, 'flush_ms': 0}  # last flush
+
+	def __alloc(self, vtx_count):
+		"""Return the (vtx_count, 7) slice of the stream to fill next"""
+		stream = self.stream
+		end = stream.count + vtx_count
+		stream.reserve(end)
+
+		slice = stream.data[stream.count:end]
+		stream.count = end
+		return slice
+
+	def lines(self, starts, ends, colors):
+		"""Add N lines from (N, 3) start and end positions, colors is a single color or a (N, 4) array"""
+		starts, ends = _as_array(starts, 3), _as_array(ends, 3)
+		vtx = self.__alloc(2 * len(starts)).reshape(-1, 2, 7)
+		vtx[:, 0, 0:3] = starts
+		vtx[:, 1, 0:3] = ends
+		vtx[:, :, 3:7] = _as_array(colors, 4)[:, None]
+
+	def line(self, a, b, color):
+		self.lines(a, b, color)
+
+	def crosses(self, positions, size, axes=None):
+		"""Add a red, green and blue cross at each of the (N, 3) positions, along the world axes or the rows of a (3, 3) axes array"""
+		positions = _as_array(positions, 3)
+		axes = np.eye(3, dtype=np.float32) if axes is None else np.asarray(axes, dtype=np.float32)[:3]
+
+		vtx = self.__alloc(6 * len(positions)).reshape(-1, 3, 2, 7)
+		offsets = axes * size
+		vtx[:, :, 0, 0:3] = positions[:, None] + offsets
+		vtx[:, :, 1, 0:3] = positions[:, None] - offsets
+		vtx[:, :, :, 3:7] = _axis_colors[:, None]
+
+	def cross(self, pos, world, size):
+		"""Add a cross along the axes of a hg.Mat4, world can be None for the world axes"""
+		axes = None if world is None else [_as_array(hg.GetX(world), 3)[0], _as_array(hg.GetY(world), 3)[0], _as_array(hg.GetZ(world), 3)[0]]
+		self.crosses(pos, size, axes)
+
+	def boxes(self, mins, maxs, colors):
+		"""Add the 12 edges of N axis aligned boxes"""
+		mins, maxs = _as_array(mins, 3), _as_array(maxs, 3)
+		corners = mins[:, None] + (maxs - mins)[:, None] * _box_corners  # (N, 8, 3)
+
+		vtx = self.__alloc(24 * len(mins)).reshape(-1, 12, 2, 7)
+		vtx[:, :, :, 0:3] = corners[:, _box_edges]
+		vtx[:, :, :, 3:7] = _as_array(colors, 4)[:, None, None]
+
+	def box(self, mn, mx, color):
+		self.boxes(mn, mx, color)
+
+	def circles(self, centers, radii, colors, segment_count=32, axis_x=(1, 0, 0), axis_y=(0, 1, 0)):
+		"""Add N circles in the plane of axis_x and axis_y, made of segment_count lines each"""
+		centers = _as_array(centers, 3)
+		radii = np.broadcast_to(np.asarray(radii, dtype=np.float32), len(centers))
+
+		angles = np.linspace(0, 2 * np.pi, segment_count + 1, dtype=np.float32)
+		ring = np.outer(np.cos(angles), axis_x) + np.outer(np.sin(angles), axis_y)  # (segment_count + 1, 3)
+		points = centers[:, None] + radii[:, None, None] * ring  # (N, segment_count + 1, 3)
+
+		vtx = self.__alloc(2 * segment_count * len(centers)).reshape(-1, segment_count, 2, 7)
+		vtx[:, :, 0, 0:3] = points[:, :-1]
+		vtx[:, :, 1, 0:3] = points[:, 1:]
+		vtx[:, :, :, 3:7] = _as_array(colors, 4)[:, None, None]
+
+	def circle(self, center, radius, color, segment_count=32):
+		self.circles(center, radius, color, segment_count)
+
+	def flush(self, view_id):
+		"""Draw everything added since the last flush to a view and empty the stream, its capacity is kept"""
+		start_time = time.perf_counter()
+		stream = self.stream
+		draw_calls = 0
+
+		for start in range(0, stream.count, self.max_vtx_per_draw):
+			stream.draw(view_id, self.prg, self.render_state, start, min(start + self.max_vtx_per_draw, stream.count))
+			draw_calls += 1
+
+		self.stats['vertices'] = stream.count
+		self.stats['draw_calls'] = draw_calls
+		self.stats['flush_ms'] = (time.perf_counter() - start_time) * 1000
+		stream.count = 0
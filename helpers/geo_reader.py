@@ -0,0 +1,132 @@
+# Zero-copy reader for HARFANG geometry files (.geo)
+
+import mmap
+import numpy as np
+import os
+import struct
+
+# layout, as found in the files written by assetc:
+#   'HGFF' magic, one byte (0x20), uint32 version
+#   then a list of arrays, each stored as a uint32 element count followed by the packed elements
+#   version 0 files stop after the 8 UV channels, version 1 and up add the skin and bind pose arrays
+_magic = b'HGFF'
+
+polygon_dtype = np.dtype([('vtx_count', np.uint8), ('material', np.uint8)])
+skin_dtype = np.dtype([('index', '<u2', 4), ('weight', np.uint8, 4)])
+
+_arrays = [
+	('vtx', np.dtype('<f4'), 3),
+	('pol', polygon_dtype, None),
+	('binding', np.dtype('<u4'), None),
+	('normal', np.dtype('<f4'), 3),
+	('color', np.dtype('<f4'), 4),
+	('tangent', np.dtype('<f4'), 6),  # tangent and binormal
+] + [('uv%d' % i, np.dtype('<f4'), 2) for i in range(8)]
+
+_skinned_arrays = [
+	('skin', skin_dtype, None),
+	('bind_pose', np.dtype('<f4'), 12),  # 3x4 matrices
+]
+
+
+class Geometry:
+	"""Arrays of a .geo file, as NumPy views on the file mapping.
+
+	vtx holds the unique positions, polygons index them through binding, per-corner attributes (normal, tangent, uvs) follow the binding order.
+	"""
+
+	def __init__(self, path):
+		self.path = path
+
+		with open(path, 'rb') as f:
+			self.__data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+		if self.__data[:4] != _magic:
+			self.__data.close()
+			raise ValueError('%s is not a HARFANG geometry file' % path)
+
+		self.version = struct.unpack_from('<I', self.__data, 5)[0]
+		self.arrays = {}
+
+		offset = 9
+		for name, dtype, comp_count in _arrays + (_skinned_arrays if self.version >= 1 else []):
+			count = struct.unpack_from('<I', self.__data, offset)[0]
+			offset += 4
+
+			shape = (count, comp_count) if comp_count else (count,)
+			view = np.frombuffer(self.__data, dtype=dtype, count=count * (comp_count or 1), offset=offset).reshape(shape)
+			offset += view.nbytes
+
+			self.arrays[name] = view
+
+	def __getattr__(self, name):
+		try:
+			return self.__dict__['arrays'][name]
+		except KeyError:
+			raise AttributeError(name)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	def close(self):
+		self.arrays = {}
+		try:
+			self.__data.close()
+		except BufferError:
+			pass  # views are still used by the caller, the mapping is released along with the last of them
+
+	def triangle_count(self):
+		"""Number of triangles once the polygons are triangulated as fans"""
+		return int(np.sum(self.pol['vtx_count'].astype(np.int64) - 2)) if len(self.pol) else 0
+
+	def bounds(self):
+		"""Min and max corners of the vertex positions, None if the geometry is empty"""
+		if len(self.vtx) == 0:
+			return None
+		return self.vtx.min(axis=0), self.vtx.max(axis=0)
+
+	def triangles(self):
+		"""Triangulate the polygons as fans, return a (triangle count, 3) array of indices into vtx (this one is a copy)"""
+		vtx_count = self.pol['vtx_count'].astype(np.int64)
+		first = np.zeros(len(vtx_count), dtype=np.int64)
+		np.cumsum(vtx_count[:-1], out=first[1:])
+
+		tri_per_pol = np.maximum(vtx_count - 2, 0)
+		pol = np.repeat(np.arange(len(vtx_count)), tri_per_pol)
+		k = np.arange(len(pol)) - np.repeat(np.cumsum(tri_per_pol) - tri_per_pol, tri_per_pol)  # triangle index in its polygon
+
+		corners = np.stack([first[pol], first[pol] + k + 1, first[pol] + k + 2], axis=1)
+		return self.binding[corners]
+
+	def material_count(self):
+		return int(self.pol['material'].max()) + 1 if len(self.pol) else 0
+
+
+def load_geometries(folder, recursive=True):
+	"""Map all the .geo files of a folder, return a {relative path: Geometry} dict"""
+	geometries = {}
+
+	for root, dirs, files in os.walk(folder):
+		if not recursive:
+			dirs.clear()
+		for name in sorted(files):
+			if name.endswith('.geo'):
+				path = os.path.join(root, name)
+				geometries[os.path.relpath(path, folder).replace(os.sep, '/')] = Geometry(path)
+
+	return geometries
+
+
+def geometry_stats(geometries):
+	"""Per-file vertex, triangle and bounds summary, as a structured array"""
+	stats = np.zeros(len(geometries), dtype=[('vtx', np.int64), ('triangles', np.int64), ('min', np.float32, 3), ('max', np.float32, 3)])
+	for i, geo in enumerate(geometries.values()):
+		stats[i]['vtx'] = len(geo.vtx)
+		stats[i]['triangles'] = geo.triangle_count()
+		b = geo.bounds()
+		if b is not None:
+			stats[i]['min'], stats[i]['max'] = b
+	return stats
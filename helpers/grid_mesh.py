@@ -0,0 +1,93 @@
+# Grid mesh generation with NumPy
+
+import harfang as hg
+import numpy as np
+from functools import lru_cache
+
+
+def compute_grid_vertex_position(origin_pos, quad_size, range_x, range_z, center_on_origin, time):
+	"""Return a ((range_x + 1) * (range_z + 1), 3) float32 array, in the same order as model_builder.py"""
+	if center_on_origin:
+		offset_x, offset_z = range_x * quad_size / 2, range_z * quad_size / 2
+	else:
+		offset_x, offset_z = 0, 0
+
+	xs = origin_pos.x + np.arange(range_x + 1, dtype=np.float32) * quad_size - offset_x
+	zs = origin_pos.z + np.arange(range_z + 1, dtype=np.float32) * quad_size - offset_z
+
+	positions = np.empty((range_z + 1, range_x + 1, 3), dtype=np.float32)
+	positions[:, :, 0] = xs[np.newaxis, :]
+	positions[:, :, 2] = zs[:, np.newaxis]
+	positions[:, :, 1] = np.multiply.outer(np.sin(zs), np.sin(xs)) * np.sin(time)  # use time to add some movement
+
+	return positions.reshape(-1, 3)
+
+
+@lru_cache(maxsize=8)
+def compute_triangles_for_grid_vertex(range_x, range_z):
+	"""Return a (2 * range_x * range_z, 3) int32 array, the topology only depends on the grid size so it is cached"""
+	iz, ix = np.meshgrid(np.arange(range_z, dtype=np.int32), np.arange(range_x, dtype=np.int32), indexing='ij')
+
+	a = (iz * (range_x + 1) + ix).ravel()  # bottom left
+	b = a + (range_x + 1)  # top left
+	c = b + 1  # top right
+	d = a + 1  # bottom right
+
+	triangles = np.empty((len(a), 2, 3), dtype=np.int32)
+	triangles[:, 0] = np.stack([d, c, b], axis=1)
+	triangles[:, 1] = np.stack([b, a, d], axis=1)
+
+	triangles = triangles.reshape(-1, 3)
+	triangles.flags.writeable = False  # shared between calls
+	return triangles
+
+
+def compute_vertex_normals(triangles, positions):
+	"""Area-weighted vertex normals, vertices without a valid face get an up vector"""
+	p0, p1, p2 = positions[triangles[:, 0]], positions[triangles[:, 1]], positions[triangles[:, 2]]
+	face_normals = np.cross(p0 - p1, p2 - p1)  # zero length for degenerate triangles, so they do not contribute
+
+	vtx_count = len(positions)
+	corners = triangles.ravel()
+
+	normals = np.empty((vtx_count, 3), dtype=np.float32)
+	for axis in range(3):
+		normals[:, axis] = np.bincount(corners, weights=np.repeat(face_normals[:, axis], 3), minlength=vtx_count)
+
+	lengths = np.linalg.norm(normals, axis=1)
+	valid = lengths > 0
+
+	normals[valid] /= lengths[valid, np.newaxis]
+	normals[~valid] = (0, 1, 0)
+
+	return normals
+
+
+def make_model(vtx_layout, positions, normals, triangles):
+	"""Send the arrays to a ModelBuilder and return the resulting model"""
+	mdl_builder = hg.ModelBuilder()
+
+	# the model builder merges identical vertices, so remap the triangles to the indices it returns
+	vertex = hg.Vertex()
+	vertex_ids = np.empty(len(positions), dtype=np.int32)
+
+	for i, (px, py, pz, nx, ny, nz) in enumerate(np.hstack([positions, normals]).tolist()):
+		vertex.pos = hg.Vec3(px, py, pz)
+		vertex.normal = hg.Vec3(nx, ny, nz)
+		vertex_ids[i] = mdl_builder.AddVertex(vertex)
+
+	for i0, i1, i2 in vertex_ids[triangles].tolist():
+		mdl_builder.AddTriangle(i0, i1, i2)
+
+	mdl_builder.EndList(0)
+
+	return mdl_builder.MakeModel(vtx_layout)
+
+
+def create_grid_model(vtx_layout, origin_pos, quad_size, range_x, range_z, center_on_origin, time):
+	"""Same parameters as create_grid_model_with_model_builder() in model_builder.py"""
+	positions = compute_grid_vertex_position(origin_pos, quad_size, range_x, range_z, center_on_origin, time)
+	triangles = compute_triangles_for_grid_vertex(range_x, range_z)
+	normals = compute_vertex_normals(triangles, positions)
+
+	return make_model(vtx_layout, positions, normals, triangles)
@@ -0,0 +1,128 @@
+# Instanced drawing of many copies of the same model, instance transforms are stored in a NumPy array
+
+import harfang as hg
+import numpy as np
+import time
+
+max_instances_per_draw = 32  # size of the u_model array declared by bgfx_shader.sh
+
+
+def create_instance_layout():
+	"""Position, normal and the instance index in the first texture coordinate"""
+	vtx_layout = hg.VertexLayout()
+	vtx_layout.Begin()
+	vtx_layout.Add(hg.A_Position, 3, hg.AT_Float)
+	vtx_layout.Add(hg.A_Normal, 3, hg.AT_Uint8, True, True)
+	vtx_layout.Add(hg.A_TexCoord0, 2, hg.AT_Float)
+	vtx_layout.End()
+	return vtx_layout
+
+
+def sphere_geometry(radius, subdiv_x, subdiv_y):
+	"""Positions, normals and triangles of a UV sphere, same parameters as hg.CreateSphereModel()"""
+	theta = np.linspace(0, np.pi, subdiv_x + 1, dtype=np.float32)  # pole to pole
+	phi = np.linspace(0, 2 * np.pi, subdiv_y + 1, dtype=np.float32)
+
+	normals = np.empty((subdiv_x + 1, subdiv_y + 1, 3), dtype=np.float32)
+	normals[..., 0] = np.outer(np.sin(theta), np.cos(phi))
+	normals[..., 1] = np.cos(theta)[:, None]
+	normals[..., 2] = np.outer(np.sin(theta), np.sin(phi))
+	normals = normals.reshape(-1, 3)
+
+	i, j = np.meshgrid(np.arange(subdiv_x), np.arange(subdiv_y), indexing='ij')
+	i = i.ravel()
+	v0 = i * (subdiv_y + 1) + j.ravel()
+	v1, v2, v3 = v0 + 1, v0 + subdiv_y + 1, v0 + subdiv_y + 2
+
+	# skip the degenerate triangles touching the poles
+	triangles = np.concatenate([np.stack([v0, v2, v1], axis=1)[i > 0], np.stack([v1, v2, v3], axis=1)[i < subdiv_x - 1]])
+
+	return normals * radius, normals, triangles
+
+
+def create_instanced_model(vtx_layout, positions, normals, triangles, copy_count=max_instances_per_draw):
+	"""Model holding copy_count copies of a mesh, each copy tagged with its index in the instance matrix array"""
+	mdl_builder = hg.ModelBuilder()
+	vertex = hg.Vertex()
+	vertex_ids = np.empty(len(positions), dtype=np.int32)
+
+	vertices = np.hstack([positions, normals]).tolist()
+	triangles = triangles.tolist()
+
+	for k in range(copy_count):
+		vertex.uv0 = hg.Vec2(k, 0)
+		for i, (px, py, pz, nx, ny, nz) in enumerate(vertices):
+			vertex.pos = hg.Vec3(px, py, pz)
+			vertex.normal = hg.Vec3(nx, ny, nz)
+			vertex_ids[i] = mdl_builder.AddVertex(vertex)
+
+		for i0, i1, i2 in triangles:
+			mdl_builder.AddTriangle(int(vertex_ids[i0]), int(vertex_ids[i1]), int(vertex_ids[i2]))
+
+	mdl_builder.EndList(0)
+
+	return mdl_builder.MakeModel(vtx_layout)
+
+
+class InstanceBatch:
+	"""Draw count instances of a model built by create_instanced_model(), max_instances_per_draw instances per draw call.
+
+	matrices is a (count, 4, 3) float32 array holding the X, Y, Z axes and the position of each instance, the same layout as hg.Mat4.
+	The instances are lit by the fixed light of the mdl_instanced shader (the same as the mdl shader), not by the lights and shadows of the pipeline.
+	"""
+
+	def __init__(self, mdl, prg, count, color=hg.Color.White):
+		self.mdl = mdl
+		self.prg = prg
+		self.values = [hg.MakeUniformSetValue('uColor', hg.Vec4(color.r, color.g, color.b, color.a))]
+
+		self.matrices = np.zeros((count, 4, 3), dtype=np.float32)
+		self.matrices[:, :3] = np.eye(3, dtype=np.float32)
+
+		self.stats = {'build_ms': 0, 'draw_ms': 0}  # last submit, hg.Mat4 conversion and draw calls
+
+	def __len__(self):
+		return len(self.matrices)
+
+	@property
+	def pos(self):
+		"""(count, 3) view of the instance positions"""
+		return self.matrices[:, 3]
+
+	@classmethod
+	def from_nodes(cls, nodes, mdl, prg, color=hg.Color.White):
+		"""Take over the drawing of scene nodes sharing the same model and material, the nodes are disabled.
+
+		The node world matrices are read, so call it after the scene was updated.
+		"""
+		batch = cls(mdl, prg, len(nodes), color)
+
+		for i, node in enumerate(nodes):
+			world = node.GetTransform().GetWorld()
+			for axis, v in enumerate([hg.GetX(world), hg.GetY(world), hg.GetZ(world), hg.GetT(world)]):
+				batch.matrices[i, axis] = v.x, v.y, v.z
+			node.Disable()
+
+		return batch
+
+	def submit(self, view_id, render_state=None):
+		"""Draw all instances to a view, call after SubmitSceneToPipeline() with its opaque pass view to draw alongside the scene"""
+		start = time.perf_counter()
+
+		count = len(self.matrices)
+		pad = -count % max_instances_per_draw
+
+		# unused copies of the last draw get a null matrix so that they collapse to a point
+		rows = self.matrices.reshape(count, 12).tolist() + [[0] * 12] * pad
+		mtxs = [hg.Mat4(*row) for row in rows]
+
+		build_end = time.perf_counter()
+
+		for i in range(0, len(mtxs), max_instances_per_draw):
+			if render_state is None:
+				hg.DrawModel(view_id, self.mdl, self.prg, self.values, [], mtxs[i:i + max_instances_per_draw])
+			else:
+				hg.DrawModel(view_id, self.mdl, self.prg, self.values, [], mtxs[i:i + max_instances_per_draw], render_state)
+
+		self.stats['build_ms'] = (build_end - start) * 1000
+		self.stats['draw_ms'] = (time.perf_counter() - build_end) * 1000
@@ -0,0 +1,247 @@
+# Persistent iso surface field with incremental polygonization
+
+import numpy as np
+from helpers.grid_mesh import make_model
+
+# cube corners as (dx, dy, dz) sample offsets
+cube_corners = [(0, 0, 0), (1, 0, 0), (0, 1, 0), (1, 1, 0), (0, 0, 1), (1, 0, 1), (0, 1, 1), (1, 1, 1)]
+
+# each cube is split in 6 tetrahedra sharing the (0, 0, 0)-(1, 1, 1) diagonal, the split is the same in all cubes so no crack appears between them
+cube_tetrahedra = [(0, 1, 3, 7), (0, 1, 5, 7), (0, 2, 3, 7), (0, 2, 6, 7), (0, 4, 5, 7), (0, 4, 6, 7)]
+
+
+def _tetrahedron_triangles(code):
+	"""Triangles crossing a tetrahedron for an inside corners bit code, as triplets of (corner, corner) edges"""
+	inside = [i for i in range(4) if code & (1 << i)]
+	outside = [i for i in range(4) if not code & (1 << i)]
+
+	if len(inside) in (1, 3):
+		a, others = (inside[0], outside) if len(inside) == 1 else (outside[0], inside)
+		return [((a, others[0]), (a, others[1]), (a, others[2]))]
+	if len(inside) == 2:
+		(a, b), (c, d) = inside, outside
+		return [((a, c), (a, d), (b, d)), ((a, c), (b, d), (b, c))]
+	return []
+
+
+tetrahedron_triangles = [_tetrahedron_triangles(code) for code in range(16)]
+
+
+def polygonize(field, gradient, iso_level, origin=(0, 0, 0)):
+	"""Marching tetrahedra over a (X + 1, Y + 1, Z + 1) block of samples.
+
+	Return the (3 * triangle count, 3) positions (in sample units, offset by origin) and outward normals of a triangle soup.
+	"""
+	cx, cy, cz = (n - 1 for n in field.shape)
+	if cx < 1 or cy < 1 or cz < 1:
+		return np.empty((0, 3), np.float32), np.empty((0, 3), np.float32)
+
+	corner_values = [field[dx:dx + cx, dy:dy + cy, dz:dz + cz] for dx, dy, dz in cube_corners]
+
+	# only keep the cubes crossed by the surface
+	inside_count = sum((v >= iso_level).astype(np.uint8) for v in corner_values)
+	active = np.nonzero((inside_count > 0) & (inside_count < 8))
+
+	if len(active[0]) == 0:
+		return np.empty((0, 3), np.float32), np.empty((0, 3), np.float32)
+
+	cube_pos = np.stack(active, axis=1).astype(np.float32)
+	values = np.stack([v[active] for v in corner_values], axis=1)
+	grads = np.stack([gradient[:, dx:dx + cx, dy:dy + cy, dz:dz + cz][(slice(None),) + active].T for dx, dy, dz in cube_corners], axis=1)
+	offsets = np.array(cube_corners, dtype=np.float32)
+
+	positions, normals = [], []
+
+	for tetra in cube_tetrahedra:
+		code = sum((values[:, corner] >= iso_level).astype(np.uint8) << i for i, corner in enumerate(tetra))
+
+		for c in range(1, 15):
+			cubes = np.nonzero(code == c)[0]
+			if len(cubes) == 0:
+				continue
+
+			for triangle in tetrahedron_triangles[c]:
+				for a, b in triangle:
+					a, b = sorted((tetra[a], tetra[b]))  # interpolate edges in a fixed direction so shared vertices are bit identical
+
+					va, vb = values[cubes, a], values[cubes, b]
+					t = ((iso_level - va) / (vb - va))[:, np.newaxis]
+
+					positions.append(cube_pos[cubes] + offsets[a] + t * (offsets[b] - offsets[a]))
+					normals.append(grads[cubes, a] + t * (grads[cubes, b] - grads[cubes, a]))
+
+	# interleave the per-edge arrays back into (triangle, vertex) order
+	positions = _interleave(positions)
+	normals = -_interleave(normals)  # the field decreases outward
+
+	# orient triangles so that Cross(p0 - p1, p2 - p1) points outward
+	p0, p1, p2 = positions[0::3], positions[1::3], positions[2::3]
+	face_normals = np.cross(p0 - p1, p2 - p1)
+	flip = np.einsum('ij,ij->i', face_normals, normals[0::3] + normals[1::3] + normals[2::3]) < 0
+
+	for array in (positions, normals):
+		tri = array.reshape(-1, 3, 3)
+		tri[flip] = tri[flip][:, ::-1]
+
+	lengths = np.linalg.norm(normals, axis=1)
+	valid = lengths > 0
+	normals[valid] /= lengths[valid, np.newaxis]
+	normals[~valid] = (0, 1, 0)
+
+	positions += np.asarray(origin, dtype=np.float32)
+
+	return positions.astype(np.float32), normals.astype(np.float32)
+
+
+def _interleave(edge_arrays):
+	"""Edges are emitted as groups of 3 arrays (one per triangle vertex), merge them into a (3 * n, 3) array"""
+	groups = []
+	for i in range(0, len(edge_arrays), 3):
+		groups.append(np.stack(edge_arrays[i:i + 3], axis=1).reshape(-1, 3))
+	return np.concatenate(groups)
+
+
+def accumulate_spheres(field, lo, hi, spheres):
+	"""Recompute the [lo, hi) sample box of field from a list of (x, y, z, radius, value, exponent) metaballs"""
+	box = tuple(slice(l, h) for l, h in zip(lo, hi))
+	field[box] = 0
+
+	for x, y, z, radius, value, exponent in spheres:
+		if radius <= 0:
+			continue
+
+		center = (x, y, z)
+		s_lo = [max(l, int(np.floor(c - radius))) for l, c in zip(lo, center)]
+		s_hi = [min(h, int(np.ceil(c + radius)) + 1) for h, c in zip(hi, center)]
+		if any(l >= h for l, h in zip(s_lo, s_hi)):
+			continue
+
+		dx, dy, dz = (np.arange(l, h, dtype=np.float32) - c for l, h, c in zip(s_lo, s_hi, center))
+		d = np.sqrt(dx[:, None, None] ** 2 + dy[None, :, None] ** 2 + dz[None, None, :] ** 2)
+
+		k = np.maximum(1 - d / radius, 0)  # falloff: value * (1 - d / radius) ^ exponent inside the sphere radius
+		if exponent != 1:
+			k **= exponent
+
+		field[tuple(slice(l, h) for l, h in zip(s_lo, s_hi))] += value * k
+
+
+def sample_gradient(field, lo, hi):
+	"""Central differences gradient of the [lo, hi) sample box, with one sample of padding read around it"""
+	p_lo = [max(l - 1, 0) for l in lo]
+	p_hi = [min(h + 1, n) for h, n in zip(hi, field.shape)]
+
+	block = field[tuple(slice(l, h) for l, h in zip(p_lo, p_hi))]
+	gradient = np.stack([np.gradient(block, axis=axis) if block.shape[axis] > 1 else np.zeros_like(block) for axis in range(3)])
+
+	return gradient[(slice(None),) + tuple(slice(l - pl, h - pl) for l, h, pl in zip(lo, hi, p_lo))]
+
+
+class IsoField:
+	"""Scalar field of metaballs, only the bricks touched by moving spheres are evaluated and polygonized again"""
+
+	def __init__(self, bounds, iso_level, brick_size=16):
+		self.bounds = tuple(int(n) for n in bounds)  # sample count on the x, y (up) and z axes
+		self.iso_level = iso_level
+		self.brick_size = brick_size
+
+		self.field = np.zeros(self.bounds, dtype=np.float32)
+		self.brick_count = tuple((n + brick_size - 1) // brick_size for n in self.bounds)
+
+		self.__spheres = []
+		self.__dirty_fields = set()
+		self.__dirty_cubes = set()
+		self.__geometry = {}  # brick index -> (positions, normals)
+		self.__merged = None
+
+		self.stats = {'field_bricks': 0, 'polygonized_bricks': 0}
+
+	def __mark_dirty(self, sphere):
+		x, y, z, radius = sphere[:4]
+		lo = [max(int(np.floor(c - radius)), 0) for c in (x, y, z)]
+		hi = [min(int(np.ceil(c + radius)), n - 1) for c, n in zip((x, y, z), self.bounds)]
+		if any(l > h for l, h in zip(lo, hi)):
+			return
+
+		B = self.brick_size
+		for i in range(lo[0] // B, hi[0] // B + 1):
+			for j in range(lo[1] // B, hi[1] // B + 1):
+				for k in range(lo[2] // B, hi[2] // B + 1):
+					self.__dirty_fields.add((i, j, k))
+
+		# cubes use the samples on both of their sides, the cubes just before the box are affected too
+		for i in range(max(lo[0] - 1, 0) // B, hi[0] // B + 1):
+			for j in range(max(lo[1] - 1, 0) // B, hi[1] // B + 1):
+				for k in range(max(lo[2] - 1, 0) // B, hi[2] // B + 1):
+					self.__dirty_cubes.add((i, j, k))
+
+	def __all_bricks(self):
+		return {(i, j, k) for i in range(self.brick_count[0]) for j in range(self.brick_count[1]) for k in range(self.brick_count[2])}
+
+	def set_spheres(self, spheres):
+		"""Set the metaball list, as (x, y, z, radius, value, exponent) tuples in sample units"""
+		spheres = [tuple(float(v) for v in s) for s in spheres]
+
+		for i in range(max(len(spheres), len(self.__spheres))):
+			old = self.__spheres[i] if i < len(self.__spheres) else None
+			new = spheres[i] if i < len(spheres) else None
+
+			if old != new:
+				if old is not None:
+					self.__mark_dirty(old)
+				if new is not None:
+					self.__mark_dirty(new)
+
+		self.__spheres = spheres
+
+	def set_iso_level(self, iso_level):
+		if iso_level != self.iso_level:
+			self.iso_level = iso_level
+			self.__dirty_cubes = self.__all_bricks()
+
+	def __brick_box(self, brick, extra):
+		B = self.brick_size
+		lo = [b * B for b in brick]
+		hi = [min((b + 1) * B + extra, n) for b, n in zip(brick, self.bounds)]
+		return lo, hi
+
+	def update(self):
+		"""Bring the field and the geometry up to date, return True if the geometry changed"""
+		if not self.__dirty_fields and not self.__dirty_cubes:
+			return False
+
+		for brick in self.__dirty_fields:
+			lo, hi = self.__brick_box(brick, 0)
+			accumulate_spheres(self.field, lo, hi, self.__spheres)
+
+		for brick in self.__dirty_cubes:
+			lo, hi = self.__brick_box(brick, 1)  # a brick of B cubes reads B + 1 samples
+			block = self.field[tuple(slice(l, h) for l, h in zip(lo, hi))]
+
+			if block.size == 0 or block.max() < self.iso_level or block.min() >= self.iso_level:
+				self.__geometry.pop(brick, None)
+				continue
+
+			self.__geometry[brick] = polygonize(block, sample_gradient(self.field, lo, hi), self.iso_level, lo)
+
+		self.stats = {'field_bricks': len(self.__dirty_fields), 'polygonized_bricks': len(self.__dirty_cubes)}
+
+		self.__dirty_fields.clear()
+		self.__dirty_cubes.clear()
+		self.__merged = None
+		return True
+
+	def get_geometry(self):
+		"""Return the positions and normals of the whole surface, as a triangle soup"""
+		if self.__merged is None:
+			if self.__geometry:
+				bricks = [self.__geometry[k] for k in sorted(self.__geometry)]
+				self.__merged = np.concatenate([p for p, n in bricks]), np.concatenate([n for p, n in bricks])
+			else:
+				self.__merged = np.empty((0, 3), np.float32), np.empty((0, 3), np.float32)
+		return self.__merged
+
+	def make_model(self, vtx_layout, scale=(1, 1, 1)):
+		positions, normals = self.get_geometry()
+		triangles = np.arange(len(positions), dtype=np.int32).reshape(-1, 3)
+		return make_model(vtx_layout, positions * np.asarray(scale, dtype=np.float32), normals, triangles)
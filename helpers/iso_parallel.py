@@ -0,0 +1,118 @@
+# Chunked iso surface polygonization over a pool of workers
+
+import numpy as np
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from helpers.iso_field import accumulate_spheres, polygonize, sample_gradient
+
+_attached = {}  # shared memory blocks opened by this worker process, by name
+
+
+def _get_field(shm_name, shape):
+	shm = _attached.get(shm_name)
+	if shm is None:
+		for name in list(_attached):  # the owner reallocated the field, release the previous block
+			_attached.pop(name).close()
+
+		shm = _attached[shm_name] = shared_memory.SharedMemory(name=shm_name)
+	return np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+
+
+def _accumulate_chunk(field, lo, hi, spheres):
+	if isinstance(field, tuple):
+		field = _get_field(*field)
+	accumulate_spheres(field, lo, hi, spheres)
+
+
+def _polygonize_chunk(field, lo, hi, iso_level):
+	if isinstance(field, tuple):
+		field = _get_field(*field)
+
+	block = field[tuple(slice(l, h) for l, h in zip(lo, hi))]
+	if block.size == 0 or block.max() < iso_level or block.min() >= iso_level:
+		return None
+	return polygonize(block, sample_gradient(field, lo, hi), iso_level, lo)
+
+
+class ChunkedPolygonizer:
+	"""Fill a metaball field and polygonize it in chunks spread over a process or thread pool.
+
+	With processes the field lives in a shared memory block, workers only receive its name and their chunk box.
+	"""
+
+	def __init__(self, worker_count=None, chunk_size=32, use_processes=False):
+		self.worker_count = worker_count or os.cpu_count() or 1
+		self.chunk_size = chunk_size
+		self.use_processes = use_processes
+
+		self.__executor = None
+		self.__shm = None
+		self.__field = None
+
+	def __get_executor(self):
+		if self.__executor is None:
+			if self.use_processes:
+				self.__executor = ProcessPoolExecutor(self.worker_count)
+			else:
+				self.__executor = ThreadPoolExecutor(self.worker_count)
+		return self.__executor
+
+	def __get_field(self, bounds):
+		bounds = tuple(int(n) for n in bounds)
+		if self.__field is None or self.__field.shape != bounds:
+			self.__release_field()
+
+			if self.use_processes:
+				self.__shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(bounds)) * 4, 1))
+				self.__field = np.ndarray(bounds, dtype=np.float32, buffer=self.__shm.buf)
+			else:
+				self.__field = np.empty(bounds, dtype=np.float32)
+
+		# what the workers receive: the array itself for threads, a (name, shape) handle for processes
+		return (self.__shm.name, bounds) if self.use_processes else self.__field
+
+	def __release_field(self):
+		self.__field = None
+		if self.__shm is not None:
+			self.__shm.close()
+			self.__shm.unlink()
+			self.__shm = None
+
+	def chunks(self, bounds):
+		C = self.chunk_size
+		for x in range(0, bounds[0], C):
+			for y in range(0, bounds[1], C):
+				for z in range(0, bounds[2], C):
+					yield (x, y, z), (min(x + C, bounds[0]), min(y + C, bounds[1]), min(z + C, bounds[2]))
+
+	def polygonize_spheres(self, bounds, spheres, iso_level):
+		"""Return the positions and normals of the surface as a triangle soup, see IsoField.set_spheres() for the spheres format"""
+		field = self.__get_field(bounds)
+		executor = self.__get_executor()
+		spheres = [tuple(float(v) for v in s) for s in spheres]
+
+		chunks = list(self.chunks(self.__field.shape))
+
+		# pass 1: each chunk writes its own samples, no two chunks overlap
+		for future in [executor.submit(_accumulate_chunk, field, lo, hi, spheres) for lo, hi in chunks]:
+			future.result()
+
+		# pass 2: a chunk of C cubes reads C + 1 samples (plus the gradient padding), so it can only start once the whole field is ready
+		futures = []
+		for lo, hi in chunks:
+			hi = tuple(min(h + 1, n) for h, n in zip(hi, self.__field.shape))
+			futures.append(executor.submit(_polygonize_chunk, field, lo, hi, iso_level))
+
+		results = [r for r in (f.result() for f in futures) if r is not None]
+
+		# stitch, vertices on chunk borders are bit identical on both sides and get merged by the model builder
+		if not results:
+			return np.empty((0, 3), np.float32), np.empty((0, 3), np.float32)
+		return np.concatenate([p for p, n in results]), np.concatenate([n for p, n in results])
+
+	def close(self):
+		if self.__executor is not None:
+			self.__executor.shutdown()
+			self.__executor = None
+		self.__release_field()
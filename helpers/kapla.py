@@ -0,0 +1,35 @@
+# Kapla tower layout, shared by physics_kapla.py and its headless benchmark
+
+import harfang as hg
+from math import pi, cos, sin, asin
+
+
+def kapla_tower_matrices(width, height, length, radius, level_count, x, y, z):
+	"""Return the world matrices of the kaplas of a tower, level by level"""
+	level_y = y + height / 2
+	matrices = []
+
+	def fill_ring(r, ring_y, size, r_adjust, y_off):
+		step = asin((size * 1.01) / 2 / (r - r_adjust)) * 2
+		cube_count = (2 * pi) // step
+		error = 2 * pi - step * cube_count
+		step += error / cube_count  # distribute error
+
+		a = 0
+		while a < (2 * pi - error):
+			matrices.append(hg.TransformationMat4(hg.Vec3(cos(a) * r + x, ring_y, sin(a) * r + z), hg.Vec3(0, -a + y_off, 0)))
+			a += step
+
+	for i in range(level_count // 2):
+		fill_ring(radius - length / 2, level_y, width, length / 2, pi / 2)
+		level_y += height
+		fill_ring(radius - length + width / 2, level_y, length, width / 2, 0)
+		fill_ring(radius - width / 2, level_y, length, width / 2, 0)
+		level_y += height
+
+	return matrices
+
+
+def add_kapla_tower(scn, kapla_ref, materials, width, height, length, radius, level_count, x, y, z):
+	"""Create a Kapla tower of physic cubes, return a list of created nodes"""
+	return [hg.CreatePhysicCube(scn, hg.Vec3(width, height, length), world, kapla_ref, materials, 0.1) for world in kapla_tower_matrices(width, height, length, radius, level_count, x, y, z)]
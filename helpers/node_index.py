@@ -0,0 +1,140 @@
+# Node lookup by name or path, replacing the linear scans of scene.GetNode()
+
+import fnmatch
+import re
+from bisect import bisect_left, insort
+
+path_separator = ':'  # as in scene.GetNodeEx('instance_node:child_node')
+
+
+class NodeIndex:
+	"""Scene nodes indexed by name and by path, kept sorted by path for prefix and glob queries.
+
+	The path of a node created by an instance is the path of the instance node and its own name, joined by ':'. The index is built once from the scene, then updated with add() and remove() as nodes are created and destroyed.
+	"""
+
+	def __init__(self, scene):
+		self.scene = scene
+
+		self.by_path = {}  # path -> node
+		self.by_name = {}  # name -> list of paths
+		self.paths = []  # sorted
+		self.path_of = {}  # node uid -> path
+
+		self.rebuild()
+
+	def __len__(self):
+		return len(self.by_path)
+
+	def __contains__(self, path):
+		return path in self.by_path
+
+	def rebuild(self):
+		self.by_path.clear()
+		self.by_name.clear()
+		self.paths.clear()
+		self.path_of.clear()
+
+		# the nodes created by an instance are indexed below their instance node, not at the root
+		nodes = self.scene.GetAllNodes()
+		nodes = [nodes.at(i) for i in range(nodes.size())]
+		instantiated = set()
+		for node in nodes:
+			if node.HasInstance():
+				instantiated.update(self.__instance_uids(node))
+
+		new_paths = []
+		for node in nodes:
+			if node.GetUid() not in instantiated:
+				self.__index(node, None, new_paths)
+		self.paths = sorted(new_paths)
+
+	def __instance_uids(self, node):
+		view_nodes = node.GetInstanceSceneView().GetNodes(self.scene)
+		uids = []
+		for i in range(view_nodes.size()):
+			child = view_nodes.at(i)
+			uids.append(child.GetUid())
+			if child.HasInstance():
+				uids.extend(self.__instance_uids(child))
+		return uids
+
+	def __index(self, node, parent_path, new_paths):
+		name = node.GetName()
+		path = name if parent_path is None else parent_path + path_separator + name
+
+		if path in self.by_path:  # same name at the same level, scene.GetNode() would return the first one
+			return
+
+		self.by_path[path] = node
+		self.by_name.setdefault(name, []).append(path)
+		self.path_of[node.GetUid()] = path
+		new_paths.append(path)
+
+		if node.HasInstance():
+			view_nodes = node.GetInstanceSceneView().GetNodes(self.scene)
+			for i in range(view_nodes.size()):
+				self.__index(view_nodes.at(i), path, new_paths)
+
+	def add(self, node, parent_path=None):
+		"""Index a new node and, if it is an instance, the nodes it instantiates. parent_path is the path of the instance node that created it, if any"""
+		new_paths = []
+		self.__index(node, parent_path, new_paths)
+
+		if len(new_paths) > len(self.paths) // 16:
+			self.paths = sorted(self.paths + new_paths)
+		else:
+			for path in new_paths:
+				insort(self.paths, path)
+
+	def remove(self, node):
+		"""Remove a node and the nodes it instantiates from the index, call before destroying it"""
+		path = self.path_of.pop(node.GetUid(), None)
+		if path is None:
+			return
+
+		# the nodes of an instance are the paths right after the instance path in sorted order
+		for sub_path, sub_node in self.prefix(path + path_separator):
+			self.__remove_path(sub_path, sub_node)
+		self.__remove_path(path, node)
+
+	def __remove_path(self, path, node):
+		del self.by_path[path]
+		del self.paths[bisect_left(self.paths, path)]
+		self.path_of.pop(node.GetUid(), None)
+
+		name = path.rsplit(path_separator, 1)[-1]
+		paths = self.by_name[name]
+		paths.remove(path)
+		if not paths:
+			del self.by_name[name]
+
+	def get(self, path):
+		"""Return the node at a path (eg. 'engine_master' or 'biped_0:Bip001 Head'), or None"""
+		return self.by_path.get(path)
+
+	def find(self, name):
+		"""Return all the nodes with this name, at any level of instantiation"""
+		return [self.by_path[path] for path in self.by_name.get(name, [])]
+
+	def prefix(self, prefix):
+		"""Return the (path, node) of all the paths starting with prefix, in path order"""
+		start = bisect_left(self.paths, prefix)
+		end = bisect_left(self.paths, prefix + '\U0010ffff')
+		return [(path, self.by_path[path]) for path in self.paths[start:end]]
+
+	def glob(self, pattern):
+		"""Return the (path, node) of all the paths matching a shell-style pattern (eg. 'biped_*:Bip001 ? Hand'), in path order"""
+		# only the paths starting with the literal part of the pattern are tested
+		literal = len(pattern)
+		for c in '*?[':
+			i = pattern.find(c)
+			if i != -1:
+				literal = min(literal, i)
+
+		if literal == len(pattern):
+			node = self.by_path.get(pattern)
+			return [] if node is None else [(pattern, node)]
+
+		regex = re.compile(fnmatch.translate(pattern))
+		return [(path, node) for path, node in self.prefix(pattern[:literal]) if regex.match(path)]
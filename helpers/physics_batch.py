@@ -0,0 +1,76 @@
+# Independent physics worlds simulated in parallel over a pool of processes
+
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import harfang as hg
+import numpy as np
+
+WorldResult = namedtuple('WorldResult', ['index', 'seed', 'pos', 'rot'])  # pos and rot are (frame_count, node_count, 3) float32 arrays, rot in euler angles
+
+
+def world_seeds(seed, world_count):
+	"""Derive the seeds of world_count worlds from a single seed, a world only depends on its own seed"""
+	return [int(s) for s in np.random.SeedSequence(seed).generate_state(world_count, np.uint64)]
+
+
+def simulate_world(setup, index, seed, step_count, step=hg.time_from_sec_f(1 / 60), record_every=1):
+	"""Build a scene with setup(scene, rng), step its physics step_count times and return the transforms recorded every record_every steps.
+
+	setup returns the list of nodes to record and an update(physics, step_index) function called before each step, or None.
+	"""
+	rng = np.random.default_rng(seed)
+
+	scene = hg.Scene()
+	nodes, update = setup(scene, rng)
+
+	physics = hg.SceneBullet3Physics()
+	physics.SceneCreatePhysicsFromAssets(scene)
+
+	frame_count = step_count // record_every
+	pos = np.empty((frame_count, len(nodes), 3), dtype=np.float32)
+	rot = np.empty((frame_count, len(nodes), 3), dtype=np.float32)
+
+	for i in range(step_count):
+		if update is not None:
+			update(physics, i)
+		physics.StepSimulation(step, step, 1)
+
+		if (i + 1) % record_every == 0:
+			physics.SyncTransformsToScene(scene)
+
+			frame = (i + 1) // record_every - 1
+			for j, node in enumerate(nodes):
+				trs = node.GetTransform()
+				p, r = trs.GetPos(), trs.GetRot()
+				pos[frame, j] = p.x, p.y, p.z
+				rot[frame, j] = r.x, r.y, r.z
+
+	return WorldResult(index, seed, pos, rot)
+
+
+class PhysicsBatch:
+	"""Run many independent scene/physics worlds, one world per task of a process pool.
+
+	Each world owns its scene, its SceneBullet3Physics and a random generator seeded from its own seed, so its result does not depend on the worker it ran on nor on the number of workers. setup must be a module level function so that the workers can unpickle it.
+	"""
+
+	def __init__(self, worker_count=None):
+		self.worker_count = worker_count or os.cpu_count() or 1
+		self.__executor = None
+
+	def run(self, setup, world_count, seed=0, step_count=600, step=hg.time_from_sec_f(1 / 60), record_every=1, ordered=False):
+		"""Yield a WorldResult per world, as soon as it is done or in world order when ordered is True"""
+		if self.__executor is None:
+			self.__executor = ProcessPoolExecutor(self.worker_count)
+
+		futures = [self.__executor.submit(simulate_world, setup, i, s, step_count, step, record_every) for i, s in enumerate(world_seeds(seed, world_count))]
+
+		for future in (futures if ordered else as_completed(futures)):
+			yield future.result()
+
+	def close(self):
+		if self.__executor is not None:
+			self.__executor.shutdown()
+			self.__executor = None
@@ -0,0 +1,76 @@
+# Forces and impulses applied to many rigid bodies from NumPy arrays
+
+import harfang as hg
+import numpy as np
+
+
+class RigidBodyBatch:
+	"""Positions and velocities of many physic nodes held in (N, 3) float32 arrays.
+
+	The physics API works on one node at a time, the batch does a single pass over the nodes per operation and converts whole arrays to Python floats at once. Positions are read from the node transforms, which hold the state of the last physics step after hg.SceneUpdateSystems().
+	"""
+
+	def __init__(self, physics, nodes):
+		self.physics = physics
+		self.nodes = list(nodes)
+
+		self.pos = np.zeros((len(self.nodes), 3), dtype=np.float32)
+		self.vel = np.zeros((len(self.nodes), 3), dtype=np.float32)
+
+	def __len__(self):
+		return len(self.nodes)
+
+	def read(self, velocities=True):
+		"""Refresh the position and linear velocity arrays"""
+		get_velocity = self.physics.NodeGetLinearVelocity
+
+		for i, node in enumerate(self.nodes):
+			p = node.GetTransform().GetPos()
+			self.pos[i] = p.x, p.y, p.z
+
+			if velocities:
+				v = get_velocity(node)
+				self.vel[i] = v.x, v.y, v.z
+
+	def __apply(self, method, vectors, points, indices):
+		if indices is None:
+			indices = np.arange(len(self.nodes))
+		if points is None:
+			points = self.pos[indices]
+
+		nodes = self.nodes
+		for i, (x, y, z), (px, py, pz) in zip(indices.tolist(), np.asarray(vectors).reshape(-1, 3).tolist(), np.asarray(points).reshape(-1, 3).tolist()):
+			method(nodes[i], hg.Vec3(x, y, z), hg.Vec3(px, py, pz))
+
+	def add_forces(self, forces, points=None, indices=None):
+		"""Apply a world space force to each node (or to the nodes at indices), at points or at the node positions"""
+		self.__apply(self.physics.NodeAddForce, forces, points, indices)
+
+	def add_impulses(self, impulses, points=None, indices=None):
+		"""Apply a world space impulse to each node (or to the nodes at indices), at points or at the node positions"""
+		self.__apply(self.physics.NodeAddImpulse, impulses, points, indices)
+
+	def wake(self, indices=None):
+		nodes = self.nodes if indices is None else [self.nodes[i] for i in indices.tolist()]
+		for node in nodes:
+			self.physics.NodeWake(node)
+
+
+def hover_forces(pos, height, half_size, strength=80):
+	"""Vectorized force controller of physics_impulse.py: push up the bodies closer than height to the ground, return (indices, forces)"""
+	k = height - (pos[:, 1] - half_size)
+	indices = np.flatnonzero(k > 0)
+
+	forces = np.zeros((len(indices), 3), dtype=np.float32)
+	forces[:, 1] = k[indices] * strength
+	return indices, forces
+
+
+def hover_impulses(pos, vel, height, half_size, stiffness=10):
+	"""Vectorized impulse controller of physics_impulse.py: change the velocity of the bodies closer than height to the ground so that they rise back to it, return (indices, impulses)"""
+	k = height - (pos[:, 1] - half_size)
+	indices = np.flatnonzero(k > 0)
+
+	tgt_velocity = np.zeros((len(indices), 3), dtype=np.float32)
+	tgt_velocity[:, 1] = k[indices] * stiffness
+	return indices, tgt_velocity - vel[indices]  # an impulse is an instantaneous change in velocity
@@ -0,0 +1,60 @@
+# Pool of pre-created physic nodes, recycled instead of being created and destroyed
+
+import harfang as hg
+
+
+class PhysicsPool:
+	"""Disabled physic nodes of a single kind, ready to be spawned.
+
+	A released node keeps its transform, object and collision components, only its rigid body is removed from the physics world. Spawning recycles the last released node (free list used as a stack) and only creates a node when the pool is empty.
+	"""
+
+	def __init__(self, scene, physics, create_node, capacity=0):
+		self.scene = scene
+		self.physics = physics
+		self.create_node = create_node  # create_node(world) -> node, eg. a hg.CreatePhysicCube() call
+
+		self.free = []
+		self.active_count = 0
+		self.stats = {'created': 0, 'spawned': 0, 'released': 0}
+
+		self.reserve(capacity)
+
+	def __len__(self):
+		return self.active_count
+
+	def reserve(self, count):
+		"""Create nodes until count of them are free, call at load time to avoid any creation while playing"""
+		while len(self.free) < count:
+			node = self.create_node(hg.Mat4.Identity)
+			node.Disable()
+			self.free.append(node)
+			self.stats['created'] += 1
+
+	def spawn(self, world):
+		"""Enable a free node at a world matrix and give it a rigid body, return the node"""
+		if self.free:
+			node = self.free.pop()
+			node.GetTransform().SetWorld(world)
+		else:
+			node = self.create_node(world)
+			self.stats['created'] += 1
+
+		node.Enable()
+		self.physics.NodeCreatePhysicsFromAssets(node)
+
+		self.active_count += 1
+		self.stats['spawned'] += 1
+		return node
+
+	def release(self, nodes):
+		"""Remove the rigid body of spawned nodes, disable them and put them back in the pool"""
+		for node in nodes:
+			self.physics.NodeDestroyPhysics(node)
+			node.Disable()
+			self.free.append(node)
+
+		self.physics.GarbageCollect(self.scene)  # once for the whole batch
+
+		self.active_count -= len(nodes)
+		self.stats['released'] += len(nodes)
@@ -0,0 +1,133 @@
+# Fixed-step physics scheduler with render interpolation
+
+import time
+
+import harfang as hg
+import numpy as np
+
+
+class PhysicsScheduler:
+	"""Step a SceneBullet3Physics world at a fixed rate, independently of the frame rate.
+
+	Real time is accumulated and consumed in fixed steps, until the accumulator is empty, max_steps steps were run or the step budget (in milliseconds) is spent. Simulation time that could not be consumed is dropped instead of being carried over, so a slow frame slows the simulation down instead of making the next frames even slower. Tracked nodes are drawn between the two last physics states.
+
+	Kinematic bodies are not synchronized from the scene, move them with physics.NodeTeleport().
+	"""
+
+	def __init__(self, scene, physics, step=None, max_steps=8, budget_ms=8):
+		self.scene = scene
+		self.physics = physics
+		self.step = hg.time_from_sec_f(1 / 60) if step is None else step
+		self.max_steps = max_steps
+		self.budget = budget_ms / 1000
+
+		self.accumulator = 0
+		self.alpha = 0
+
+		self.nodes = []
+		self.prev_pos = np.empty((0, 3), dtype=np.float32)
+		self.prev_rot = np.empty((0, 4), dtype=np.float32)  # quaternions as x, y, z, w
+		self.cur_pos = np.empty((0, 3), dtype=np.float32)
+		self.cur_rot = np.empty((0, 4), dtype=np.float32)
+
+		self.stats = {'frames': 0, 'steps': 0, 'skipped_steps': 0, 'frame_steps': 0, 'max_frame_steps': 0, 'step_ms': 0, 'max_step_ms': 0}
+
+		all_nodes = scene.GetAllNodes()
+		self.add_nodes([all_nodes.at(i) for i in range(all_nodes.size())])
+
+	def add_nodes(self, nodes):
+		"""Interpolate the transform of the dynamic rigid bodies in nodes, call after physics.NodeCreatePhysicsFromAssets()"""
+		nodes = [node for node in nodes if node.HasRigidBody() and node.GetRigidBody().GetType() == hg.RBT_Dynamic]
+		if not nodes:
+			return
+
+		pos, rot = self.__read_states(nodes)
+
+		self.nodes.extend(nodes)
+		self.prev_pos, self.cur_pos = np.concatenate((self.prev_pos, pos)), np.concatenate((self.cur_pos, pos))
+		self.prev_rot, self.cur_rot = np.concatenate((self.prev_rot, rot)), np.concatenate((self.cur_rot, rot))
+
+	def remove_nodes(self, nodes):
+		"""Stop interpolating nodes, call before destroying them"""
+		removed = set(node.GetUid() for node in nodes)
+		keep = np.array([node.GetUid() not in removed for node in self.nodes], dtype=bool)
+
+		self.nodes = [node for node, k in zip(self.nodes, keep) if k]
+		self.prev_pos, self.cur_pos = self.prev_pos[keep], self.cur_pos[keep]
+		self.prev_rot, self.cur_rot = self.prev_rot[keep], self.cur_rot[keep]
+
+	def update(self, dt):
+		"""Run the physics steps due for a frame lasting dt and write interpolated transforms to the tracked nodes"""
+		self.accumulator += dt
+
+		step_count = 0
+		prev_step = 0  # number of steps run before the state held by prev_pos and prev_rot
+		start = time.perf_counter()
+
+		while self.accumulator >= self.step and step_count < self.max_steps and time.perf_counter() - start < self.budget:
+			# the state before the last step of the frame is the start of the interpolation, it is read when that step is expected to be the last
+			if step_count > 0 and (self.accumulator < self.step * 2 or step_count == self.max_steps - 1):
+				self.physics.SyncTransformsToScene(self.scene)
+				self.prev_pos, self.prev_rot = self.__read_states(self.nodes)
+				prev_step = step_count
+			elif step_count == 0:
+				self.prev_pos, self.prev_rot = self.cur_pos, self.cur_rot
+
+			step_start = time.perf_counter()
+			self.physics.StepSimulation(self.step, self.step, 1)
+			step_ms = (time.perf_counter() - step_start) * 1000
+
+			self.stats['step_ms'] += step_ms
+			self.stats['max_step_ms'] = max(self.stats['max_step_ms'], step_ms)
+
+			self.accumulator -= self.step
+			step_count += 1
+
+		# out of steps or out of budget, drop what is left instead of catching up on the next frames
+		if self.accumulator >= self.step:
+			self.stats['skipped_steps'] += self.accumulator // self.step
+			self.accumulator %= self.step
+
+		if step_count > 0:
+			self.physics.SyncTransformsToScene(self.scene)
+			self.cur_pos, self.cur_rot = self.__read_states(self.nodes)
+
+		if step_count == 0 or prev_step == step_count - 1:
+			self.alpha = self.accumulator / self.step
+		else:
+			# the budget stopped the loop before the step expected to be the last, prev is several steps behind: show the last state as is
+			self.prev_pos, self.prev_rot = self.cur_pos, self.cur_rot
+			self.alpha = 0
+
+		self.__write_states()
+
+		self.stats['frames'] += 1
+		self.stats['steps'] += step_count
+		self.stats['frame_steps'] = step_count
+		self.stats['max_frame_steps'] = max(self.stats['max_frame_steps'], step_count)
+
+	def __read_states(self, nodes):
+		pos = np.empty((len(nodes), 3), dtype=np.float32)
+		rot = np.empty((len(nodes), 4), dtype=np.float32)
+
+		for i, node in enumerate(nodes):
+			trs = node.GetTransform()
+			p, q = trs.GetPos(), hg.QuaternionFromEuler(trs.GetRot())
+			pos[i] = p.x, p.y, p.z
+			rot[i] = q.x, q.y, q.z, q.w
+
+		return pos, rot
+
+	def __write_states(self):
+		k = np.float32(self.alpha)
+		pos = self.prev_pos + (self.cur_pos - self.prev_pos) * k
+
+		# normalized lerp along the shortest arc, close enough to a slerp between two consecutive steps
+		prev_rot = np.where((np.sum(self.prev_rot * self.cur_rot, axis=1) < 0)[:, None], -self.prev_rot, self.prev_rot)
+		rot = prev_rot + (self.cur_rot - prev_rot) * k
+		rot /= np.linalg.norm(rot, axis=1)[:, None]
+
+		for node, (px, py, pz), (qx, qy, qz, qw) in zip(self.nodes, pos.tolist(), rot.tolist()):
+			trs = node.GetTransform()
+			trs.SetPos(hg.Vec3(px, py, pz))
+			trs.SetRot(hg.ToEuler(hg.Quaternion(qx, qy, qz, qw)))
@@ -0,0 +1,284 @@
+# Batched mouse picking: screen points to rays, ray casts against boxes and triangles, marquee and lasso selection
+
+import numpy as np
+from helpers.spatial_index import LooseOctree, ray_box_pairs, world_axes
+
+_no_hit = np.inf
+
+
+def screen_rays(cam_world, fov, resolution, points):
+	"""World space rays through (N, 2) screen points, the origin of the screen is its bottom left corner.
+
+	cam_world is the (4, 3) array of the camera axes and position and fov its vertical field of view. Return the ray origin (3,) and the (N, 3) unit directions.
+	"""
+	cam_world = np.asarray(cam_world, dtype=np.float64)
+	axes = cam_world[:3] / np.linalg.norm(cam_world[:3], axis=1, keepdims=True)
+
+	tan_v = np.tan(fov / 2)
+	tan_h = tan_v * resolution[0] / resolution[1]
+
+	points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+	dirs = np.empty((len(points), 3))
+	dirs[:, 0] = (points[:, 0] / resolution[0] * 2 - 1) * tan_h
+	dirs[:, 1] = (points[:, 1] / resolution[1] * 2 - 1) * tan_v
+	dirs[:, 2] = 1
+
+	dirs = dirs @ axes
+	return cam_world[3], dirs / np.linalg.norm(dirs, axis=1, keepdims=True)
+
+
+def project_to_screen(cam_world, fov, resolution, positions):
+	"""Screen position of (N, 3) world positions, the depth is returned as a third column and is negative behind the camera"""
+	cam_world = np.asarray(cam_world, dtype=np.float64)
+	axes = cam_world[:3] / np.linalg.norm(cam_world[:3], axis=1, keepdims=True)
+
+	tan_v = np.tan(fov / 2)
+	tan_h = tan_v * resolution[0] / resolution[1]
+
+	p = (np.asarray(positions, dtype=np.float64) - cam_world[3]) @ axes.T
+	z = np.where(np.abs(p[:, 2]) < 1e-9, 1e-9, p[:, 2])
+
+	screen = np.empty_like(p)
+	screen[:, 0] = (p[:, 0] / (z * tan_h) + 1) / 2 * resolution[0]
+	screen[:, 1] = (p[:, 1] / (z * tan_v) + 1) / 2 * resolution[1]
+	screen[:, 2] = p[:, 2]
+	return screen
+
+
+def ray_aabb(origins, dirs, box_min, box_max):
+	"""Slab test of R rays against N boxes, return the (R, N) entry distances, inf where the ray misses the box"""
+	origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+	dirs = np.asarray(dirs, dtype=np.float64).reshape(-1, 3)
+	origins = np.broadcast_to(origins, dirs.shape)
+
+	# a tiny direction instead of zero keeps the slab distances finite for the rays parallel to a slab
+	inv_dirs = 1 / np.where(np.abs(dirs) < 1e-30, 1e-30, dirs)
+
+	t_near = np.zeros((len(dirs), len(box_min)))
+	t_far = np.full((len(dirs), len(box_min)), _no_hit)
+
+	for axis in range(3):
+		o, inv = origins[:, axis, None], inv_dirs[:, axis, None]
+		t0 = (box_min[:, axis] - o) * inv
+		t1 = (box_max[:, axis] - o) * inv
+		np.maximum(t_near, np.minimum(t0, t1), out=t_near)
+		np.minimum(t_far, np.maximum(t0, t1), out=t_far)
+
+	t_near[t_near > t_far] = _no_hit
+	return t_near
+
+
+def ray_triangles(origin, dir, v0, v1, v2):
+	"""Möller-Trumbore test of rays against (T, 3) triangle vertex arrays, return the hit distances, inf where a ray misses.
+
+	One ray (origin and dir of shape (3,)) gives (T,) distances, R rays ((R, 3) arrays) give (R, T) distances.
+	"""
+	origin = np.asarray(origin, dtype=np.float64)[..., None, :]
+	dir = np.asarray(dir, dtype=np.float64)[..., None, :]
+
+	e1, e2 = v1 - v0, v2 - v0
+	p = np.cross(dir, e2)
+	det = (e1 * p).sum(axis=-1)
+
+	with np.errstate(divide='ignore', invalid='ignore'):
+		inv_det = 1 / det
+		s = origin - v0
+		u = (s * p).sum(axis=-1) * inv_det
+		q = np.cross(s, e1)
+		v = (q * dir).sum(axis=-1) * inv_det
+		t = (q * e2).sum(axis=-1) * inv_det
+
+	hit = (np.abs(det) > 1e-12) & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0)
+	return np.where(hit, t, _no_hit)
+
+
+def transform_aabbs(local_min, local_max, worlds):
+	"""World bounding boxes of (N, 3) local boxes transformed by (N, 4, 3) world matrices"""
+	center = (local_min + local_max) / 2
+	extent = (local_max - local_min) / 2
+
+	world_center = np.einsum('ni,nij->nj', center, worlds[:, :3]) + worlds[:, 3]
+	world_extent = np.einsum('ni,nij->nj', extent, np.abs(worlds[:, :3]))
+	return world_center - world_extent, world_center + world_extent
+
+
+def point_in_polygon(points, polygon):
+	"""Even-odd test of (N, 2) points against a (V, 2) polygon, return a (N,) mask"""
+	a, b = polygon.tolist(), np.roll(polygon, -1, axis=0).tolist()
+
+	# points sorted by y, so that each edge only tests the contiguous run of points within its y span
+	order = np.argsort(points[:, 1])
+	x, y = points[order, 0], points[order, 1]
+	ay, by = polygon[:, 1], np.roll(polygon[:, 1], -1)
+	lo = np.searchsorted(y, np.minimum(ay, by), side='left').tolist()
+	hi = np.searchsorted(y, np.maximum(ay, by), side='left').tolist()
+
+	inside = np.zeros(len(points), dtype=bool)
+	for (ax, ay), (bx, by), l, h in zip(a, b, lo, hi):
+		if h > l:  # horizontal edges have an empty span
+			inside[l:h] ^= x[l:h] < ax + (y[l:h] - ay) * ((bx - ax) / (by - ay))
+
+	mask = np.empty(len(points), dtype=bool)
+	mask[order] = inside
+	return mask
+
+
+class Picker:
+	"""Ray picking and screen selection over N objects given by their world bounding boxes.
+
+	Objects can also be given a triangle mesh, rays hitting their box are then refined against their triangles. From octree_min_count objects the rays and the screen selections first query a loose octree over the box bounding spheres and only test the boxes it returns, below it testing all the boxes is faster.
+	"""
+
+	def __init__(self, box_min, box_max, octree_min_count=2000):
+		self.box_min = np.array(box_min, dtype=np.float64).reshape(-1, 3)
+		self.box_max = np.array(box_max, dtype=np.float64).reshape(-1, 3)
+		self.meshes = {}  # object index -> (v0, v1, v2) world space triangle vertices
+
+		self.octree_min_count = octree_min_count
+		self.octree = None
+
+	def __len__(self):
+		return len(self.box_min)
+
+	def __bounding_spheres(self, indices=slice(None)):
+		return (self.box_min[indices] + self.box_max[indices]) / 2, np.linalg.norm(self.box_max[indices] - self.box_min[indices], axis=1) / 2
+
+	def set_boxes(self, box_min, box_max, indices=None):
+		"""Update the bounding boxes of all or some of the objects"""
+		if indices is None:
+			indices = np.arange(len(self.box_min))
+		self.box_min[indices], self.box_max[indices] = box_min, box_max
+
+		if self.octree is not None:
+			self.octree.update(indices, *self.__bounding_spheres(indices))
+
+	def set_mesh(self, index, positions, triangles, world=None):
+		"""Set the triangles of an object from its (V, 3) positions and (T, 3) indices, world is an optional (4, 3) matrix"""
+		positions = np.asarray(positions, dtype=np.float64)
+		if world is not None:
+			positions = positions @ world[:3] + world[3]
+		self.meshes[index] = positions[triangles[:, 0]], positions[triangles[:, 1]], positions[triangles[:, 2]]
+
+	def __get_octree(self):
+		if len(self.box_min) < self.octree_min_count:
+			return None
+
+		if self.octree is None:
+			center, radius = self.__bounding_spheres()
+			margin = radius.max(initial=0)
+			self.octree = LooseOctree(self.box_min.min(axis=0) - margin, self.box_max.max(axis=0) + margin, center, radius, depth=6, leaf_size=32)  # shallower than the culling default, a level walked costs more than the boxes it saves
+
+		return self.octree
+
+	def __get_candidates(self, planes):
+		octree = self.__get_octree()
+		return None if octree is None else np.flatnonzero(octree.query_frustum(planes))
+
+	def pick(self, origins, dirs):
+		"""Closest object hit by each ray, return the (R,) object indices (-1 for no hit) and hit distances"""
+		dirs = np.asarray(dirs, dtype=np.float64).reshape(-1, 3)
+		origins = np.broadcast_to(np.asarray(origins, dtype=np.float64).reshape(-1, 3), dirs.shape)
+
+		# (ray, object) pairs whose box is hit, all the boxes are only tested below octree_min_count objects
+		octree = self.__get_octree()
+		if octree is None:
+			t = ray_aabb(origins, dirs, self.box_min, self.box_max)
+			rays, objects = np.nonzero(np.isfinite(t))
+			t = t[rays, objects]
+		else:
+			rays, objects = octree.query_rays(origins, dirs)
+			t = ray_box_pairs(origins[rays], dirs[rays], self.box_min[objects], self.box_max[objects])
+			hit = np.isfinite(t)
+			rays, objects, t = rays[hit], objects[hit], t[hit]
+
+		# refine against the triangles, one batch of rays per object
+		if self.meshes:
+			for i in np.unique(objects).tolist():
+				mesh = self.meshes.get(i)
+				if mesh is not None:
+					pairs = np.flatnonzero(objects == i)
+					t[pairs] = ray_triangles(origins[rays[pairs]], dirs[rays[pairs]], *mesh).min(axis=1, initial=_no_hit)
+
+		index = np.full(len(dirs), -1)
+		dist = np.full(len(dirs), _no_hit)
+
+		# closest pair of each ray: sort by ray then distance, keep the first pair of each ray
+		order = np.lexsort((t, rays))
+		rays, objects, t = rays[order], objects[order], t[order]
+		first = np.flatnonzero(np.r_[True, rays[1:] != rays[:-1]]) if len(rays) else np.empty(0, dtype=np.int64)
+		first = first[np.isfinite(t[first])]
+
+		index[rays[first]] = objects[first]
+		dist[rays[first]] = t[first]
+		return index, dist
+
+	def __rect_planes(self, cam_world, fov, resolution, rect, znear, zfar):
+		"""Inward (6, 4) planes of the frustum of a (x0, y0, x1, y1) screen rectangle, None if it is empty"""
+		x0, x1 = sorted(rect[0::2])
+		y0, y1 = sorted(rect[1::2])
+		if x1 - x0 < 1 or y1 - y0 < 1:
+			return None
+
+		origin, corners = screen_rays(cam_world, fov, resolution, [(x0, y0), (x1, y0), (x1, y1), (x0, y1)])
+		forward = np.asarray(cam_world, dtype=np.float64)[2]
+		forward = forward / np.linalg.norm(forward)
+
+		# side planes through the camera position and two consecutive corner rays, counter-clockwise corners give inward normals
+		n = np.cross(corners, np.roll(corners, -1, axis=0))
+		n = np.vstack([n / np.linalg.norm(n, axis=1, keepdims=True), forward, -forward])
+		d = -n @ origin
+		d[4] -= znear
+		d[5] += zfar
+
+		return np.hstack([n, d[:, None]])
+
+	def select_rect(self, cam_world, fov, resolution, rect, znear=0.01, zfar=1000):
+		"""Indices of the objects whose box intersects the frustum of a (x0, y0, x1, y1) screen rectangle"""
+		planes = self.__rect_planes(cam_world, fov, resolution, rect, znear, zfar)
+		if planes is None:
+			return np.empty(0, dtype=np.int64)
+		n, d = planes[:, :3], planes[:, 3]
+
+		candidates = self.__get_candidates(planes)
+		box_min, box_max = (self.box_min, self.box_max) if candidates is None else (self.box_min[candidates], self.box_max[candidates])
+
+		dist = (box_min + box_max) @ (n.T / 2) + d
+		inside = np.all(dist >= -((box_max - box_min) @ (np.abs(n).T / 2)), axis=1)
+		return np.flatnonzero(inside) if candidates is None else candidates[inside]
+
+	def select_lasso(self, cam_world, fov, resolution, polygon, znear=0.01, zfar=1000):
+		"""Indices of the objects whose box center projects inside a (V, 2) screen polygon, in front of the camera"""
+		polygon = np.asarray(polygon, dtype=np.float64)
+		if len(polygon) < 3:
+			return np.empty(0, dtype=np.int64)
+
+		# above octree_min_count objects, the octree query over the frustum of the lasso bounding rectangle discards most objects
+		planes = self.__rect_planes(cam_world, fov, resolution, (*polygon.min(axis=0), *polygon.max(axis=0)), znear, zfar)
+		if planes is None:
+			return np.empty(0, dtype=np.int64)
+
+		candidates = self.__get_candidates(planes)
+		if candidates is None:
+			candidates = np.arange(len(self.box_min))
+
+		screen = project_to_screen(cam_world, fov, resolution, (self.box_min[candidates] + self.box_max[candidates]) / 2)
+		front = np.flatnonzero(screen[:, 2] > 0)
+		inside = point_in_polygon(screen[front, :2], polygon)
+		return candidates[front[inside]]
+
+
+def node_world_aabbs(nodes, res):
+	"""World bounding boxes of object nodes, from their model bounds"""
+	import harfang as hg
+
+	local_min, local_max = np.zeros((len(nodes), 3)), np.zeros((len(nodes), 3))
+	worlds = np.zeros((len(nodes), 4, 3))
+
+	for i, node in enumerate(nodes):
+		ok, minmax = node.GetObject().GetMinMax(res)
+		if ok:
+			local_min[i] = minmax.mn.x, minmax.mn.y, minmax.mn.z
+			local_max[i] = minmax.mx.x, minmax.mx.y, minmax.mx.z
+		worlds[i] = world_axes(node.GetTransform().GetWorld())
+
+	return transform_aabbs(local_min, local_max, worlds)
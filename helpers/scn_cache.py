@@ -0,0 +1,326 @@
+# Binary cache for HARFANG JSON scenes (.scn)
+
+import hashlib
+import json
+import mmap
+import numpy as np
+import os
+import struct
+
+# file layout:
+#   header (see _header), the JSON directory of the file, then 16 bytes aligned blocks
+#   arrays are mapped as NumPy views, the sections that are not converted to arrays are kept as separate JSON blocks
+_magic = b'HGSC'
+_version = 1
+_header = struct.Struct('<4sIQQ32sQ')  # magic, version, source mtime (ns), source size, source sha256, directory size
+
+invalid_index = 0xffffffff
+
+# animation track types holding numbers, with their component count
+track_types = {'bool': 1, 'int': 1, 'float': 1, 'vec2': 2, 'vec3': 3, 'vec4': 4, 'quat': 4, 'color': 4}
+track_type_names = list(track_types)
+
+# node_info columns
+node_columns = ['idx', 'name', 'transform', 'camera', 'object', 'light', 'rigid_body', 'instance']
+
+
+class _StringTable:
+	def __init__(self):
+		self.ids = {}
+		self.strings = []
+
+	def add(self, s):
+		i = self.ids.get(s)
+		if i is None:
+			i = self.ids[s] = len(self.strings)
+			self.strings.append(s)
+		return i
+
+	def to_arrays(self):
+		data = [s.encode('utf-8') for s in self.strings]
+		offsets = np.zeros(len(data) + 1, dtype=np.uint32)
+		np.cumsum([len(d) for d in data], out=offsets[1:])
+		return offsets, np.frombuffer(b''.join(data), dtype=np.uint8)
+
+
+def _index(v):
+	return invalid_index if v is None else v
+
+
+def _convert(scene):
+	"""Convert a decoded scene to a dict of arrays and a dict of JSON sections"""
+	strings = _StringTable()
+	arrays, sections = {}, {}
+
+	nodes = scene.get('nodes') or []
+	node_info = np.full((len(nodes), len(node_columns)), invalid_index, dtype=np.uint32)
+	for i, node in enumerate(nodes):
+		node_info[i, 0] = node['idx']
+		node_info[i, 1] = strings.add(node['name'])
+		node_info[i, 2:7] = node['components'][:5]
+		node_info[i, 7] = _index(node.get('instance'))
+	arrays['node_info'] = node_info
+	arrays['node_disabled'] = np.array([node.get('disabled', False) for node in nodes], dtype=np.uint8)
+
+	transforms = scene.get('transforms') or []
+	arrays['transform_trs'] = np.array([trs['pos'] + trs['rot'] + trs['scl'] for trs in transforms], dtype=np.float32).reshape(-1, 9)
+	arrays['transform_parent'] = np.array([_index(trs['parent']) for trs in transforms], dtype=np.uint32)
+
+	# animations: one row per animation and per track, all the keys of all the tracks in contiguous arrays
+	anim_info, track_info, anim_extra = [], [], {}
+	key_t, key_v, key_bias, key_tension = [], [], [], []
+
+	for row, entry in enumerate(scene.get('anims') or []):
+		anim = entry['anim']
+		anim_info.append((entry['idx'], anim.get('t_start', 0), anim.get('t_end', 0)))
+
+		extra = {}
+		for name, value in anim.items():
+			if name in ('t_start', 't_end'):
+				continue
+			if name not in track_types:
+				extra[name] = value
+				continue
+
+			comp_count = track_types[name]
+			for track in value:
+				keys = track['keys']
+				track_info.append((row, track_type_names.index(name), strings.add(track['target']), len(key_t), len(keys), comp_count))
+
+				for key in keys:
+					key_t.append(key['t'])
+					key_v.extend(key['v'] if comp_count > 1 else [key['v']])
+					key_bias.append(key.get('bias', 0))
+					key_tension.append(key.get('tension', 0))
+
+		if extra:
+			anim_extra[str(entry['idx'])] = extra
+
+	arrays['anim_info'] = np.array(anim_info, dtype=np.int64).reshape(-1, 3)
+	arrays['track_info'] = np.array(track_info, dtype=np.uint32).reshape(-1, 6)
+	arrays['key_t'] = np.array(key_t, dtype=np.int64)
+	arrays['key_v'] = np.array(key_v, dtype=np.float32)
+	arrays['key_bias'] = np.array(key_bias, dtype=np.float32)
+	arrays['key_tension'] = np.array(key_tension, dtype=np.float32)
+
+	for name, value in scene.items():
+		if name not in ('nodes', 'transforms', 'anims'):
+			sections[name] = value
+	sections['anim_extra'] = anim_extra
+
+	arrays['string_offsets'], arrays['string_data'] = strings.to_arrays()
+
+	return arrays, sections
+
+
+def _align(n):
+	return (n + 15) & ~15
+
+
+def write_scene_cache(scn_path, cache_path, source=None):
+	"""Convert a .scn file to a cache file, source is the file content if it was already read"""
+	if source is None:
+		with open(scn_path, 'rb') as f:
+			source = f.read()
+	st = os.stat(scn_path)
+
+	arrays, sections = _convert(json.loads(source))
+
+	blocks = [(name, array.tobytes()) for name, array in arrays.items()]
+	blocks += [(name, json.dumps(value).encode('utf-8')) for name, value in sections.items()]
+
+	# the directory size depends on the offsets it contains, lay the blocks out after a directory of bounded size
+	directory = {'arrays': {}, 'json': {}}
+	for pass_ in range(2):
+		offset = _align(_header.size + len(json.dumps(directory).encode('utf-8')) + 64)
+		directory = {'arrays': {}, 'json': {}}
+		for name, data in blocks:
+			if name in arrays:
+				directory['arrays'][name] = [offset, arrays[name].dtype.str, list(arrays[name].shape)]
+			else:
+				directory['json'][name] = [offset, len(data)]
+			offset = _align(offset + len(data))
+
+	directory_data = json.dumps(directory).encode('utf-8')
+
+	os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+	tmp_path = cache_path + '.tmp'
+
+	with open(tmp_path, 'wb') as f:
+		f.write(_header.pack(_magic, _version, st.st_mtime_ns, st.st_size, hashlib.sha256(source).digest(), len(directory_data)))
+		f.write(directory_data)
+
+		for name, data in blocks:
+			offset = directory['arrays'][name][0] if name in arrays else directory['json'][name][0]
+			f.write(b'\0' * (offset - f.tell()))
+			f.write(data)
+
+	os.replace(tmp_path, cache_path)  # never leave a partially written cache behind
+
+
+class SceneCache:
+	"""Memory-mapped cache file, arrays are NumPy views on the mapping and JSON sections are decoded on access"""
+
+	def __init__(self, cache_path):
+		self.path = cache_path
+
+		with open(cache_path, 'rb') as f:
+			self.__data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+		magic, version, self.source_mtime_ns, self.source_size, self.source_hash, directory_size = _header.unpack_from(self.__data, 0)
+		if magic != _magic or version != _version:
+			self.__data.close()
+			raise ValueError('%s is not a version %d scene cache' % (cache_path, _version))
+
+		directory = json.loads(self.__data[_header.size:_header.size + directory_size])
+		self.__arrays = directory['arrays']
+		self.__json = directory['json']
+
+		self.__views = {}
+		self.__decoded = {}
+		self.__node_index = None
+		self.__anim_index = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	def close(self):
+		self.__views.clear()
+		try:
+			self.__data.close()
+		except BufferError:
+			pass  # views are still used by the caller, the mapping is released along with the last of them
+
+	def array(self, name):
+		view = self.__views.get(name)
+		if view is None:
+			offset, dtype, shape = self.__arrays[name]
+			view = np.frombuffer(self.__data, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+			self.__views[name] = view
+		return view
+
+	def get(self, name, default=None):
+		"""Decode one of the sections stored as JSON"""
+		if name not in self.__decoded:
+			if name not in self.__json:
+				return default
+			offset, size = self.__json[name]
+			self.__decoded[name] = json.loads(self.__data[offset:offset + size])
+		return self.__decoded[name]
+
+	def string(self, i):
+		offsets = self.array('string_offsets')
+		return bytes(self.array('string_data')[offsets[i]:offsets[i + 1]]).decode('utf-8')
+
+	# nodes
+	def node_count(self):
+		return len(self.array('node_info'))
+
+	def node_name(self, row):
+		return self.string(self.array('node_info')[row, 1])
+
+	def find_nodes(self, name):
+		"""Return the rows of all the nodes with this name"""
+		if self.__node_index is None:
+			self.__node_index = {}
+			for row, name_id in enumerate(self.array('node_info')[:, 1].tolist()):
+				self.__node_index.setdefault(self.string(name_id), []).append(row)
+		return self.__node_index.get(name, [])
+
+	def find_node(self, name):
+		rows = self.find_nodes(name)
+		return rows[0] if rows else None
+
+	def get_node_component(self, row, component):
+		"""Index of a node component in its section, None if the node has none"""
+		idx = int(self.array('node_info')[row, node_columns.index(component)])
+		return None if idx == invalid_index else idx
+
+	def get_node_trs(self, row):
+		"""Position, rotation (degrees) and scale of a node transform, as (3,) views"""
+		idx = self.get_node_component(row, 'transform')
+		if idx is None:
+			return None
+		trs = self.array('transform_trs')[idx]
+		return trs[0:3], trs[3:6], trs[6:9]
+
+	# animations
+	def get_anim_tracks(self, anim_idx):
+		"""Return the (type, target, t, v) tracks of an animation, t and v are views of its keys"""
+		if self.__anim_index is None:
+			self.__anim_index = {idx: row for row, idx in enumerate(self.array('anim_info')[:, 0].tolist())}
+
+		row = self.__anim_index[anim_idx]
+		track_info = self.array('track_info')
+		key_t, key_v = self.array('key_t'), self.array('key_v')
+
+		tracks = []
+		for anim_row, type_, target, key_offset, key_count, comp_count in track_info[track_info[:, 0] == row].tolist():
+			v_offset = self.__key_value_offset(key_offset)
+			tracks.append((track_type_names[type_], self.string(target), key_t[key_offset:key_offset + key_count], key_v[v_offset:v_offset + key_count * comp_count].reshape(key_count, comp_count)))
+		return tracks
+
+	def __key_value_offset(self, key_offset):
+		# values of a track start after the values of all the keys of the previous tracks
+		if 'key_v_offsets' not in self.__views:
+			track_info = self.array('track_info')
+			offsets = np.zeros(len(self.array('key_t')) + 1, dtype=np.int64)
+			for first, count, comp_count in track_info[:, 3:6].tolist():
+				offsets[first + 1:first + count + 1] = comp_count
+			self.__views['key_v_offsets'] = np.cumsum(offsets)
+		return int(self.__views['key_v_offsets'][key_offset])
+
+	def get_scene_anim(self, name):
+		"""Return a scene animation with its node animations as (node name, tracks) tuples, or None"""
+		for scene_anim in self.get('scene_anims') or []:
+			if scene_anim['name'] == name:
+				node_idx = {idx: row for row, idx in enumerate(self.array('node_info')[:, 0].tolist())}
+				node_anims = [(self.node_name(node_idx[na['node']]), self.get_anim_tracks(na['anim'])) for na in scene_anim['node_anims']]
+				return dict(scene_anim, node_anims=node_anims)
+		return None
+
+
+def get_cache_path(scn_path, cache_dir='scene_cache'):
+	name = os.path.normpath(scn_path).replace(os.sep, '_').replace(':', '_')
+	return os.path.join(cache_dir, name + '.hgsc')
+
+
+def open_scene_cache(scn_path, cache_dir='scene_cache'):
+	"""Open the cache of a .scn file, create or rebuild it if the source changed.
+
+	The modification time and size are checked first, the content hash is only computed when they differ.
+	"""
+	cache_path = get_cache_path(scn_path, cache_dir)
+	st = os.stat(scn_path)
+
+	cache = None
+	if os.path.exists(cache_path):
+		try:
+			cache = SceneCache(cache_path)
+		except (ValueError, struct.error):
+			cache = None
+
+	if cache is not None:
+		if cache.source_mtime_ns == st.st_mtime_ns and cache.source_size == st.st_size:
+			return cache
+
+		with open(scn_path, 'rb') as f:
+			source = f.read()
+
+		if cache.source_size == len(source) and cache.source_hash == hashlib.sha256(source).digest():
+			# touched but not modified, only refresh the recorded modification time
+			cache.close()
+			with open(cache_path, 'r+b') as f:
+				f.seek(8)
+				f.write(struct.pack('<Q', st.st_mtime_ns))
+			return SceneCache(cache_path)
+
+		cache.close()
+	else:
+		source = None
+
+	write_scene_cache(scn_path, cache_path, source)
+	return SceneCache(cache_path)
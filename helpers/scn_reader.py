@@ -0,0 +1,187 @@
+# Lazy reader for HARFANG JSON scenes (.scn)
+
+import json
+import mmap
+import re
+
+# HARFANG writes scenes as tab-indented JSON: top-level keys start with '\n\t"' and the elements of top-level arrays with '\n\t\t{'
+_section_re = re.compile(rb'\n\t"([^"\\]+)": ')
+_element_start = b'\n\t\t{'
+_element_end = b'\n\t\t}'
+
+invalid_component = 0xffffffff
+node_components = ['transform', 'camera', 'object', 'light', 'rigid_body']
+component_sections = {'transform': 'transforms', 'camera': 'cameras', 'object': 'objects', 'light': 'lights'}
+
+
+class SceneFile:
+	"""Memory-mapped .scn file, sections and array elements are only decoded when they are accessed"""
+
+	def __init__(self, path):
+		self.path = path
+
+		with open(path, 'rb') as f:
+			try:
+				self.__data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+			except ValueError:  # empty file
+				self.__data = b'{}'
+
+		self.__decoded = {}  # section name -> decoded value
+		self.__spans = {}  # section name -> (start, end) of its value
+		self.__elements = {}  # section name -> list of (start, end) element spans
+		self.__element_cache = {}  # (section name, element index) -> decoded element
+
+		if self.__data[:3] == b'{\n\t':
+			self.__index_sections()
+		else:
+			self.__decoded = json.loads(self.__data[:])  # not written by HARFANG, no layout to rely on
+
+		self.__node_index = None
+		self.__object_index = None
+		self.__anim_index = None
+		self.__scene_anim_index = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	def close(self):
+		if isinstance(self.__data, mmap.mmap):
+			self.__data.close()
+
+	def __index_sections(self):
+		data = self.__data
+		matches = list(_section_re.finditer(data))
+		file_end = data.rfind(b'\n}')
+
+		for i, m in enumerate(matches):
+			end = matches[i + 1].start() if i + 1 < len(matches) else file_end
+			if data[end - 1:end] == b',':
+				end -= 1
+			self.__spans[m.group(1).decode()] = m.end(), end
+
+	def keys(self):
+		return list(self.__spans) if self.__spans else list(self.__decoded)
+
+	def get(self, key, default=None):
+		"""Decode a whole section"""
+		if key not in self.__decoded:
+			span = self.__spans.get(key)
+			if span is None:
+				return default
+			self.__decoded[key] = json.loads(self.__data[span[0]:span[1]])
+		return self.__decoded[key]
+
+	def __get_element_spans(self, key):
+		spans = self.__elements.get(key)
+		if spans is None:
+			spans = []
+			span = self.__spans.get(key)
+
+			if span is not None and self.__data[span[0]:span[0] + 1] == b'[':
+				data, pos, end = self.__data, span[0], span[1]
+				while True:
+					start = data.find(_element_start, pos, end)
+					if start < 0:
+						break
+					pos = data.find(_element_end, start, end) + len(_element_end)
+					spans.append((start + 3, pos))  # skip '\n\t\t'
+
+			self.__elements[key] = spans
+		return spans
+
+	def count(self, key):
+		if key in self.__decoded or key not in self.__spans:
+			return len(self.get(key) or [])
+		return len(self.__get_element_spans(key))
+
+	def get_element(self, key, i):
+		"""Decode a single element of an array section"""
+		if key in self.__decoded or key not in self.__spans:
+			return (self.get(key) or [])[i]
+
+		element = self.__element_cache.get((key, i))
+		if element is None:
+			start, end = self.__get_element_spans(key)[i]
+			element = self.__element_cache[key, i] = json.loads(self.__data[start:end])
+		return element
+
+	# nodes
+	def __get_node_index(self):
+		if self.__node_index is None:
+			self.__node_index = {}
+			for node in self.get('nodes') or []:
+				self.__node_index.setdefault(node['name'], []).append(node)
+		return self.__node_index
+
+	def node_names(self):
+		return list(self.__get_node_index())
+
+	def find_nodes(self, name):
+		"""Return all the nodes with this name (names are not unique, eg. several instances of the same scene)"""
+		return self.__get_node_index().get(name, [])
+
+	def find_node(self, name):
+		nodes = self.find_nodes(name)
+		return nodes[0] if nodes else None
+
+	def get_node_component(self, node, component):
+		"""Decode one of the 'transform', 'camera', 'object' or 'light' components of a node, None if it has none"""
+		idx = node['components'][node_components.index(component)]
+		if idx == invalid_component:
+			return None
+		return self.get_element(component_sections[component], idx)
+
+	# objects
+	def find_object(self, name):
+		"""Objects are named after their geometry, eg. 'car_engine/1002_01.geo'"""
+		if self.__object_index is None:
+			self.__object_index = {}
+			for i in range(self.count('objects')):
+				obj = self.get_element('objects', i)
+				self.__object_index.setdefault(obj['name'], obj)
+		return self.__object_index.get(name)
+
+	# animations
+	def __get_anim_index(self):
+		"""Map anim idx to element index, reading only the 'idx' field at the end of each element"""
+		if self.__anim_index is None:
+			self.__anim_index = {}
+
+			if 'anims' in self.__decoded or 'anims' not in self.__spans:
+				for i, anim in enumerate(self.get('anims') or []):
+					self.__anim_index[anim['idx']] = i
+			else:
+				for i, (start, end) in enumerate(self.__get_element_spans('anims')):
+					pos = self.__data.rfind(b'"idx": ', start, end) + 7
+					self.__anim_index[int(self.__data[pos:end - 1].strip().rstrip(b','))] = i
+		return self.__anim_index
+
+	def get_anim(self, idx):
+		"""Decode a single animation from its idx, as referenced by the scene animations"""
+		return self.get_element('anims', self.__get_anim_index()[idx])['anim']
+
+	def scene_anim_names(self):
+		if self.__scene_anim_index is None:
+			self.__scene_anim_index = {scene_anim['name']: scene_anim for scene_anim in self.get('scene_anims') or []}
+		return list(self.__scene_anim_index)
+
+	def get_scene_anim(self, name):
+		"""Return a scene animation with the tracks of its node animations decoded, or None.
+
+		Only the animations used by this scene animation are decoded, they are cached for later calls.
+		"""
+		self.scene_anim_names()
+		scene_anim = self.__scene_anim_index.get(name)
+		if scene_anim is None:
+			return None
+
+		nodes = self.get('nodes') or []
+		node_anims = [{'node': nodes[node_anim['node']]['name'], 'anim': self.get_anim(node_anim['anim'])} for node_anim in scene_anim['node_anims']]
+
+		scene_anim = dict(scene_anim, node_anims=node_anims)
+		if scene_anim['anim'] is not None and scene_anim['anim'] != invalid_component:
+			scene_anim['anim'] = self.get_anim(scene_anim['anim'])
+		return scene_anim
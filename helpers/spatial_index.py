@@ -0,0 +1,327 @@
+# Loose octree over bounding spheres, with batched frustum, ray and sphere queries
+
+import numpy as np
+
+def frustum_planes(world, fov, znear, zfar, aspect_ratio):
+	"""Inward facing planes of a perspective camera as a (6, 4) array, a point p is inside a plane when dot(n, p) + d >= 0.
+
+	world is the (4, 3) array of the camera X, Y, Z axes and position, fov is the vertical field of view in radians and aspect_ratio is width / height.
+	"""
+	tan_v = np.tan(fov / 2)
+	tan_h = tan_v * aspect_ratio
+
+	# camera space, looking down +Z
+	planes = np.array([
+		[1, 0, tan_h, 0],  # left
+		[-1, 0, tan_h, 0],  # right
+		[0, 1, tan_v, 0],  # bottom
+		[0, -1, tan_v, 0],  # top
+		[0, 0, 1, -znear],  # near
+		[0, 0, -1, zfar],  # far
+	], dtype=np.float64)
+	planes[:, :3] /= np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+	world = np.asarray(world, dtype=np.float64)
+	axes = world[:3] / np.linalg.norm(world[:3], axis=1, keepdims=True)  # remove the camera scale
+
+	n = planes[:, :3] @ axes
+	d = planes[:, 3] - n @ world[3]
+	return np.hstack([n, d[:, None]])
+
+
+def world_axes(mtx):
+	"""(4, 3) array of the X, Y, Z axes and position of a hg.Mat4"""
+	import harfang as hg
+
+	return np.array([[v.x, v.y, v.z] for v in [hg.GetX(mtx), hg.GetY(mtx), hg.GetZ(mtx), hg.GetT(mtx)]])
+
+
+def camera_frustum_planes(cam_node, res_x, res_y):
+	"""frustum_planes() of a HARFANG camera node, call after the scene was updated"""
+	cam = cam_node.GetCamera()
+	return frustum_planes(world_axes(cam_node.GetTransform().GetWorld()), cam.GetFov(), cam.GetZNear(), cam.GetZFar(), res_x / res_y)
+
+
+def ray_box_pairs(origins, dirs, box_min, box_max):
+	"""Slab test of P rays against P boxes, ray i against box i, return the (P,) entry distances, inf where the ray misses its box"""
+	origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+	dirs = np.asarray(dirs, dtype=np.float64).reshape(-1, 3)
+
+	# a tiny direction instead of zero keeps the slab distances finite for the rays parallel to a slab
+	inv_dirs = 1 / np.where(np.abs(dirs) < 1e-30, 1e-30, dirs)
+
+	t_near = np.zeros(len(dirs))
+	t_far = np.full(len(dirs), np.inf)
+
+	# one axis at a time on 1D arrays, reductions over the last axis of (P, 3) arrays are much slower
+	for axis in range(3):
+		o, inv = origins[:, axis], inv_dirs[:, axis]
+		t0 = (box_min[:, axis] - o) * inv
+		t1 = (box_max[:, axis] - o) * inv
+		np.maximum(t_near, np.minimum(t0, t1), out=t_near)
+		np.minimum(t_far, np.maximum(t0, t1), out=t_far)
+
+	t_near[t_near > t_far] = np.inf
+	return t_near
+
+
+def _spread_bits(v):
+	"""Insert two zero bits between each of the 21 low bits of v"""
+	v = v & 0x1fffff
+	v = (v | (v << 32)) & 0x1f00000000ffff
+	v = (v | (v << 16)) & 0x1f0000ff0000ff
+	v = (v | (v << 8)) & 0x100f00f00f00f00f
+	v = (v | (v << 4)) & 0x10c30c30c30c30c3
+	v = (v | (v << 2)) & 0x1249249249249249
+	return v
+
+
+def morton_code(coords):
+	"""Interleave the bits of (N, 3) integer cell coordinates"""
+	return (_spread_bits(coords[:, 0]) << 2) | (_spread_bits(coords[:, 1]) << 1) | _spread_bits(coords[:, 2])
+
+
+class LooseOctree:
+	"""Loose octree over N bounding spheres, stored as flat NumPy arrays.
+
+	Each sphere lives in a single cell, at the deepest level whose loose cell (twice the cell size) contains it. The spheres are sorted by the Morton code of their cell so that the content of any subtree is a contiguous range, queries walk the tree one level at a time over all the cells of that level. Spheres outside of the root bounds are kept apart and always tested one by one.
+	"""
+
+	def __init__(self, bounds_min, bounds_max, centers, radii, depth=8, leaf_size=64):
+		self.bounds_min = np.asarray(bounds_min, dtype=np.float64)
+		self.size = float(np.max(np.asarray(bounds_max, dtype=np.float64) - self.bounds_min))
+		self.depth = depth
+		self.leaf_size = leaf_size
+
+		self.centers = np.array(centers, dtype=np.float32).reshape(-1, 3)
+		self.radii = np.broadcast_to(np.asarray(radii, dtype=np.float32), len(self.centers)).copy()
+		self.keys = self.__compute_keys(self.centers, self.radii)
+
+		self.stats = {'rebuilds': 0, 'visited_cells': 0, 'tested_spheres': 0}
+		self.__dirty = True
+
+	def __len__(self):
+		return len(self.centers)
+
+	def __compute_keys(self, centers, radii):
+		"""Sort key of each sphere: Morton code of its cell at the deepest level, then its level. -1 for the spheres outside of the root"""
+		# deepest level whose loose half extent (one cell size) leaves room for the radius around a center anywhere in the cell
+		with np.errstate(divide='ignore'):
+			level = np.floor(np.log2(self.size / np.maximum(radii.astype(np.float64) * 2, 1e-12)))
+		level = np.clip(level, 0, self.depth).astype(np.int64)
+
+		cell_count = np.left_shift(1, level)
+		coords = np.floor((centers - self.bounds_min) / (self.size / cell_count)[:, None]).astype(np.int64)
+
+		outside = np.any((coords < 0) | (coords >= cell_count[:, None]), axis=1) | (radii * 2 > self.size)
+		coords = np.clip(coords, 0, cell_count[:, None] - 1)
+
+		keys = (morton_code(coords) << (3 * (self.depth - level))) * (self.depth + 1) + level
+		keys[outside] = -1
+		return keys
+
+	def update(self, indices, centers, radii=None):
+		"""Move spheres, only the spheres leaving their cell cause the index to be sorted again on the next query"""
+		indices = np.asarray(indices)
+		self.centers[indices] = centers
+		if radii is not None:
+			self.radii[indices] = radii
+
+		keys = self.__compute_keys(self.centers[indices], self.radii[indices])
+		changed = keys != self.keys[indices]
+		if changed.any():
+			self.keys[indices[changed]] = keys[changed]
+			self.__dirty = True
+
+	def __build(self):
+		self.order = np.argsort(self.keys)
+		self.sorted_keys = self.keys[self.order]
+		self.outside_count = int(np.searchsorted(self.sorted_keys, 0))
+
+		self.stats['rebuilds'] += 1
+		self.__dirty = False
+
+	def __cell_bounds(self, level, codes):
+		"""Center and loose half extent of cells given by their Morton code"""
+		coords = np.zeros((len(codes), 3), dtype=np.int64)
+		for bit in range(level):
+			for axis in range(3):
+				coords[:, axis] |= ((codes >> (3 * bit + 2 - axis)) & 1) << bit
+
+		cell_size = self.size / (1 << level)
+		return self.bounds_min + (coords + 0.5) * cell_size, cell_size  # loose cells are twice as large as the cells
+
+	def __cell_ranges(self, level, codes, first_level):
+		"""Sorted index range of the spheres stored at first_level or below in the subtrees of cells"""
+		shift = 3 * (self.depth - level)
+		lo = np.searchsorted(self.sorted_keys, (codes << shift) * (self.depth + 1) + first_level)
+		hi = np.searchsorted(self.sorted_keys, ((codes + 1) << shift) * (self.depth + 1))
+		return lo, hi
+
+	def query_frustum(self, planes):
+		"""Visibility mask of the spheres for a frustum given as a (6, 4) plane array"""
+		if self.__dirty:
+			self.__build()
+
+		planes = np.asarray(planes, dtype=np.float64)
+		n, d = planes[:, :3], planes[:, 3]
+		n_extent = np.abs(n).sum(axis=1)
+
+		visible_ranges = []  # (lo, hi) arrays of sorted ranges whose spheres are all visible
+		candidates = [np.arange(self.outside_count)]  # sorted indices of the spheres to test one by one
+		visited = 0
+
+		codes = np.zeros(1, dtype=np.int64)
+		for level in range(self.depth + 1):
+			lo, hi = self.__cell_ranges(level, codes, level)
+			codes, lo, hi = codes[hi > lo], lo[hi > lo], hi[hi > lo]  # drop the empty subtrees
+			if len(codes) == 0:
+				break
+			visited += len(codes)
+
+			center, half = self.__cell_bounds(level, codes)
+			dist = center @ n.T + d
+			extent = half * n_extent
+			inside = np.all(dist >= extent, axis=1)
+			partial = ~inside & ~np.any(dist < -extent, axis=1)
+
+			visible_ranges.append((lo[inside], hi[inside]))
+
+			# small subtrees are not worth walking, all their spheres are tested
+			leaf = partial & (hi - lo <= self.leaf_size) if level < self.depth else partial
+			split = partial & ~leaf
+
+			# the spheres stored at this level come first in the range of their cell
+			own_lo = np.concatenate([lo[leaf], lo[split]])
+			own_hi = np.concatenate([hi[leaf], self.__cell_ranges(level, codes[split], level + 1)[0]])
+			counts = own_hi - own_lo
+			candidates.append(np.repeat(own_lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum()))
+
+			codes = ((codes[split] << 3)[:, None] + np.arange(8)).ravel()
+
+		# mark the fully visible ranges with a difference array over the sorted spheres
+		lo = np.concatenate([lo for lo, hi in visible_ranges])
+		hi = np.concatenate([hi for lo, hi in visible_ranges])
+		delta = np.bincount(lo, minlength=len(self.centers) + 1) - np.bincount(hi, minlength=len(self.centers) + 1)
+		sorted_mask = np.cumsum(delta[:-1]) > 0
+
+		candidates = np.concatenate(candidates)
+		spheres = self.order[candidates]
+		sorted_mask[candidates] = np.all(self.centers[spheres] @ n.T + d >= -self.radii[spheres, None], axis=1)
+
+		mask = np.empty(len(self.centers), dtype=bool)
+		mask[self.order] = sorted_mask
+
+		self.stats['visited_cells'] = visited
+		self.stats['tested_spheres'] = len(candidates)
+		return mask
+
+	def query_frustums(self, planes_list):
+		"""Visibility masks for several frustums (eg. one per viewport), sharing a single index rebuild"""
+		return [self.query_frustum(planes) for planes in planes_list]
+
+	def query_rays(self, origins, dirs):
+		"""Candidate (ray, sphere) pairs for R rays: the spheres of the cells each ray crosses, as two index arrays.
+
+		The pairs still have to be tested against the objects, a sphere whose cell is crossed is not necessarily hit.
+		"""
+		if self.__dirty:
+			self.__build()
+
+		origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+		dirs = np.asarray(dirs, dtype=np.float64).reshape(-1, 3)
+		origins = np.broadcast_to(origins, dirs.shape)
+
+		# the spheres outside of the root are candidates for every ray
+		pair_rays = [np.repeat(np.arange(len(dirs)), self.outside_count)]
+		pair_spheres = [np.tile(np.arange(self.outside_count), len(dirs))]
+		visited = 0
+
+		rays = np.arange(len(dirs))
+		codes = np.zeros(len(dirs), dtype=np.int64)
+		for level in range(self.depth + 1):
+			lo, hi = self.__cell_ranges(level, codes, level)
+			keep = hi > lo
+			rays, codes, lo, hi = rays[keep], codes[keep], lo[keep], hi[keep]
+
+			# rays against the loose cell boxes
+			center, half = self.__cell_bounds(level, codes)
+			hit = np.isfinite(ray_box_pairs(origins[rays], dirs[rays], center - half, center + half))
+			rays, codes, lo, hi = rays[hit], codes[hit], lo[hit], hi[hit]
+			if len(codes) == 0:
+				break
+			visited += len(codes)
+
+			# small subtrees are not worth walking, all their spheres are candidates
+			leaf = hi - lo <= self.leaf_size if level < self.depth else np.ones(len(codes), dtype=bool)
+			split = ~leaf
+
+			own_lo = np.concatenate([lo[leaf], lo[split]])
+			own_hi = np.concatenate([hi[leaf], self.__cell_ranges(level, codes[split], level + 1)[0]])
+			counts = own_hi - own_lo
+			pair_rays.append(np.repeat(np.concatenate([rays[leaf], rays[split]]), counts))
+			pair_spheres.append(np.repeat(own_lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum()))
+
+			rays = np.repeat(rays[split], 8)
+			codes = ((codes[split] << 3)[:, None] + np.arange(8)).ravel()
+
+		pair_spheres = np.concatenate(pair_spheres)
+
+		self.stats['visited_cells'] = visited
+		self.stats['tested_spheres'] = len(pair_spheres)
+		return np.concatenate(pair_rays), self.order[pair_spheres]
+
+	def query_sphere(self, center, radius):
+		"""Indices of the spheres intersecting a sphere"""
+		if self.__dirty:
+			self.__build()
+
+		center = np.asarray(center, dtype=np.float64)
+		candidates = [np.arange(self.outside_count)]
+
+		codes = np.zeros(1, dtype=np.int64)
+		for level in range(self.depth + 1):
+			lo, hi = self.__cell_ranges(level, codes, level)
+			keep = hi > lo
+
+			# sphere against the loose cell boxes
+			cell_center, half = self.__cell_bounds(level, codes[keep])
+			delta = np.maximum(np.abs(cell_center - center) - half, 0)
+			hit = (delta * delta).sum(axis=1) <= radius * radius
+			codes, lo, hi = codes[keep][hit], lo[keep][hit], hi[keep][hit]
+			if len(codes) == 0:
+				break
+
+			own_hi = hi if level == self.depth else self.__cell_ranges(level, codes, level + 1)[0]
+			counts = own_hi - lo
+			candidates.append(np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum()))
+
+			codes = ((codes << 3)[:, None] + np.arange(8)).ravel()
+
+		spheres = self.order[np.concatenate(candidates)]
+		dist = np.linalg.norm(self.centers[spheres] - center, axis=1)
+		return np.sort(spheres[dist <= self.radii[spheres] + radius])
+
+
+class NodeVisibility:
+	"""Enable or disable scene nodes from a visibility mask, only the nodes whose state changes are touched"""
+
+	def __init__(self, nodes):
+		self.nodes = list(nodes)
+		self.enabled = np.ones(len(self.nodes), dtype=bool)
+
+		for node in self.nodes:
+			node.Enable()
+
+	def apply(self, mask):
+		"""Call before SubmitSceneToPipeline, return the number of nodes whose state changed"""
+		changed = np.flatnonzero(mask != self.enabled)
+
+		for i, visible in zip(changed.tolist(), mask[changed].tolist()):
+			if visible:
+				self.nodes[i].Enable()
+			else:
+				self.nodes[i].Disable()
+
+		self.enabled[changed] = mask[changed]
+		return len(changed)
@@ -0,0 +1,248 @@
+# Texture streaming with a GPU memory budget, compression profiles are read from the assetc .meta files
+
+import json
+import os
+import struct
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import harfang as hg
+
+# storage cost of the assetc compression formats
+bits_per_pixel = {'BC1': 4, 'BC2': 8, 'BC3': 8, 'BC4': 4, 'BC5': 8, 'BC6H': 8, 'BC7': 8, 'ETC1': 4, 'ETC2': 4, 'RGBA8': 32, 'RGBA16F': 64, 'RGBA32F': 128}
+_dds_fourcc_bpp = {b'DXT1': 4, b'DXT3': 8, b'DXT5': 8, b'ATI1': 4, b'BC4U': 4, b'ATI2': 8, b'BC5U': 8}
+_dxgi_bpp = {71: 4, 72: 4, 74: 8, 75: 8, 77: 8, 78: 8, 80: 4, 81: 4, 83: 8, 84: 8, 95: 8, 96: 8, 98: 8, 99: 8}
+
+
+def load_texture_profile(path, folders=('resources_compiled', 'resources')):
+	"""Default profile of the .meta file next to a texture, empty if there is none"""
+	for folder in folders:
+		meta_path = os.path.join(folder, path + '.meta')
+		if os.path.exists(meta_path):
+			with open(meta_path, 'r') as f:
+				return json.load(f).get('profiles', {}).get('default', {})
+	return {}
+
+
+def read_image_header(data):
+	"""Return (width, height, mip_count, bits_per_pixel) from the first bytes of a DDS, PNG or JPEG file, None if unknown
+
+	mip_count and bits_per_pixel are None when the file does not store them (source pictures).
+	"""
+	if data[:4] == b'DDS ' and len(data) >= 128:
+		height, width = struct.unpack_from('<II', data, 12)
+		mip_count = max(struct.unpack_from('<I', data, 28)[0], 1)
+		pf_flags, fourcc, rgb_bits = struct.unpack_from('<I4sI', data, 80)
+		if fourcc == b'DX10' and len(data) >= 132:
+			return width, height, mip_count, _dxgi_bpp.get(struct.unpack_from('<I', data, 128)[0], 32)
+		if pf_flags & 0x4:  # DDPF_FOURCC
+			return width, height, mip_count, _dds_fourcc_bpp.get(fourcc, 32)
+		return width, height, mip_count, rgb_bits or 32
+
+	if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+		width, height = struct.unpack_from('>II', data, 16)
+		return width, height, None, None
+
+	if data[:2] == b'\xff\xd8':
+		i = 2
+		while i + 9 < len(data):
+			if data[i] != 0xff:
+				i += 1
+				continue
+			marker = data[i + 1]
+			if marker in (0xd8, 0x01) or 0xd0 <= marker <= 0xd7:
+				i += 2
+				continue
+			length = struct.unpack_from('>H', data, i + 2)[0]
+			if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):  # start of frame
+				height, width = struct.unpack_from('>HH', data, i + 5)
+				return width, height, None, None
+			i += 2 + length
+
+	return None
+
+
+def texture_memory_size(width, height, mip_count=None, bpp=32):
+	"""GPU memory used by a texture, a full mip chain is assumed when mip_count is None"""
+	size = 0
+	mip = 0
+	while True:
+		w, h = max(width >> mip, 1), max(height >> mip, 1)
+		if bpp <= 8:  # block compressed, 4x4 pixel blocks
+			size += ((w + 3) // 4) * ((h + 3) // 4) * bpp * 2
+		else:
+			size += w * h * bpp // 8
+		mip += 1
+		if (mip_count is not None and mip >= mip_count) or (mip_count is None and w == 1 and h == 1):
+			return size
+
+
+def estimate_texture_size(header, profile):
+	"""GPU memory used by a texture from its file header and compression profile"""
+	if header is None:
+		return 0
+
+	width, height, mip_count, bpp = header
+	if bpp is None:  # source picture, compressed by assetc according to its profile
+		bpp = bits_per_pixel.get(profile.get('compression'), 32)
+		max_size = profile.get('max-size')
+		while max_size and max(width, height) > max_size:
+			width, height = max(width // 2, 1), max(height // 2, 1)
+
+	return texture_memory_size(width, height, mip_count, bpp)
+
+
+class _Texture:
+	def __init__(self, path, flags, profile):
+		self.path = path
+		self.flags = flags
+		self.profile = profile
+		self.state = 'reading'  # reading -> ready -> resident, evicted textures go back to ready. missing or too_large when it cannot be loaded
+		self.size = 0
+		self.ref = None
+		self.last_use = 0
+		self.wanted = True  # requested since it was last evicted
+		self.bindings = []  # (material, uniform name, stage)
+
+
+class TextureStreamer:
+	"""Hand out placeholder textures immediately and stream the real ones in, keeping the resident textures under a GPU memory budget.
+
+	Files are read and measured in background threads, the textures are then created from the rendering thread by update(), at most loads_per_frame per frame. When the budget is exceeded the least recently used textures are destroyed and their materials get the placeholder back.
+	"""
+
+	def __init__(self, res, budget=256 * 1024 * 1024, folder='resources_compiled', meta_folders=('resources_compiled', 'resources'), thread_count=4, loads_per_frame=1):
+		self.res = res
+		self.budget = budget
+		self.folder = folder
+		self.meta_folders = meta_folders
+		self.loads_per_frame = loads_per_frame
+
+		self.executor = ThreadPoolExecutor(thread_count)
+		self.textures = OrderedDict()  # path -> _Texture, least recently used first
+		self.pending = []  # (_Texture, future) of the background reads
+		self.frame = 0
+
+		self.placeholders = {}
+		self.stats = {'resident': 0, 'resident_bytes': 0, 'loads': 0, 'evictions': 0}
+
+	def __get_placeholder(self, profile):
+		kind = 'normal' if profile.get('type') == 'NormalMap' else 'default'
+		ref = self.placeholders.get(kind)
+
+		if ref is None:
+			pic = hg.Picture(4, 4, hg.PF_RGBA32)
+			color = hg.Color(0.5, 0.5, 1, 1) if kind == 'normal' else hg.Color(0.5, 0.5, 0.5, 1)
+			for y in range(4):
+				for x in range(4):
+					pic.SetPixelRGBA(x, y, color)
+			tex = hg.CreateTextureFromPicture(pic, 'placeholder_' + kind, 0, hg.TF_RGBA8)
+			ref = self.placeholders[kind] = self.res.AddTexture('placeholder_' + kind, tex)
+
+		return ref
+
+	def __read(self, path, profile):
+		# read the whole file so the load from the rendering thread hits the OS file cache
+		with open(os.path.join(self.folder, path), 'rb') as f:
+			data = f.read()
+		return estimate_texture_size(read_image_header(data), profile)
+
+	def __request(self, path, flags):
+		texture = self.textures.get(path)
+
+		if texture is None:
+			profile = load_texture_profile(path, self.meta_folders)
+			texture = self.textures[path] = _Texture(path, flags, profile)
+			self.pending.append((texture, self.executor.submit(self.__read, path, profile)))
+		else:
+			self.textures.move_to_end(path)
+
+		texture.last_use = self.frame
+		texture.wanted = True
+		return texture
+
+	def __current_ref(self, texture):
+		return texture.ref if texture.state == 'resident' else self.__get_placeholder(texture.profile)
+
+	def get(self, path, flags=0):
+		"""Return the texture if it is resident, its placeholder otherwise, and mark it as used this frame"""
+		return self.__current_ref(self.__request(path, flags))
+
+	def touch(self, path):
+		"""Mark a bound texture as used this frame"""
+		self.__request(path, 0)
+
+	def bind(self, mat, name, path, stage, flags=0):
+		"""Bind a streamed texture to a material, the material is updated each time the texture is loaded or evicted"""
+		texture = self.__request(path, flags)
+		texture.bindings.append((mat, name, stage))
+		hg.SetMaterialTexture(mat, name, self.__current_ref(texture), stage)
+
+	def __rebind(self, texture):
+		ref = self.__current_ref(texture)
+		for mat, name, stage in texture.bindings:
+			hg.SetMaterialTexture(mat, name, ref, stage)
+
+	def __evict(self, size):
+		"""Destroy the least recently used resident textures until size bytes fit in the budget, nothing is destroyed if they cannot fit"""
+		if self.stats['resident_bytes'] + size <= self.budget:
+			return True
+
+		# textures used this frame cannot be evicted, give up before destroying anything if the others do not free enough memory
+		evictable = sum(texture.size for texture in self.textures.values() if texture.state == 'resident' and texture.last_use < self.frame)
+		if self.stats['resident_bytes'] - evictable + size > self.budget:
+			return False
+
+		for texture in list(self.textures.values()):
+			if self.stats['resident_bytes'] + size <= self.budget:
+				break
+			if texture.state != 'resident' or texture.last_use >= self.frame:
+				continue
+
+			self.res.DestroyTexture(texture.ref)
+			texture.ref = None
+			texture.state = 'ready'
+			texture.wanted = False
+			self.__rebind(texture)
+
+			self.stats['resident'] -= 1
+			self.stats['resident_bytes'] -= texture.size
+			self.stats['evictions'] += 1
+
+		return self.stats['resident_bytes'] + size <= self.budget
+
+	def update(self):
+		"""Create the textures whose file was read, call once per frame from the rendering thread"""
+		still_pending = []
+		for texture, future in self.pending:
+			if future.done():
+				try:
+					texture.size = future.result()
+					texture.state = 'ready' if texture.size <= self.budget else 'too_large'  # would never fit, keep its placeholder
+				except Exception:  # unreadable file or malformed header
+					texture.state = 'missing'
+			else:
+				still_pending.append((texture, future))
+		self.pending = still_pending
+
+		# most recently used first, textures not requested since their eviction stay unloaded
+		loads = 0
+		for texture in reversed(list(self.textures.values())):
+			if loads >= self.loads_per_frame:
+				break
+			if texture.state != 'ready' or not texture.wanted or not self.__evict(texture.size):
+				continue
+
+			texture.ref = hg.LoadTextureFromAssets(texture.path, texture.flags, self.res)
+			texture.state = 'resident'
+			self.__rebind(texture)
+
+			self.stats['resident'] += 1
+			self.stats['resident_bytes'] += texture.size
+			self.stats['loads'] += 1
+			loads += 1
+
+		self.frame += 1
+
+	def close(self):
+		self.executor.shutdown(wait=True)
@@ -0,0 +1,40 @@
+# Batched node transform updates
+
+import harfang as hg
+import numpy as np
+
+
+class TransformBatch:
+	"""Group of node transforms whose positions are stored in a single (N, 3) float32 array"""
+
+	def __init__(self, transforms):
+		self.transforms = list(transforms)
+
+		self.pos = np.empty((len(self.transforms), 3), dtype=np.float32)
+		for i, trs in enumerate(self.transforms):
+			p = trs.GetPos()
+			self.pos[i] = p.x, p.y, p.z
+
+	def __len__(self):
+		return len(self.transforms)
+
+	def push(self):
+		"""Write the position array back to the scene transforms, once per frame"""
+		# convert the whole array to Python floats in one call instead of indexing it node by node
+		for trs, (x, y, z) in zip(self.transforms, self.pos.tolist()):
+			trs.SetPos(hg.Vec3(x, y, z))
+
+
+def wave_heights(angle, row_count, col_count, out=None):
+	"""Vectorized version of the per-node wave used by scene_many_nodes.py, returns a (row_count * col_count) array"""
+	row_y = np.cos(angle + np.arange(row_count, dtype=np.float32) * 0.1)
+	col_y = np.sin(angle + np.arange(col_count, dtype=np.float32) * 0.1)
+
+	y = np.multiply.outer(row_y, col_y)
+	y *= 0.6
+	y += 0.65
+
+	if out is None:
+		return y.ravel()
+	out[:] = y.ravel()
+	return out
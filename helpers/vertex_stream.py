@@ -0,0 +1,108 @@
+# NumPy vertex streams for hg.DrawLines
+
+import harfang as hg
+import numpy as np
+
+
+def create_pos_rgb_layout():
+	"""Position and RGB color, both as floats, as used by the pos_rgb shader"""
+	vtx_layout = hg.VertexLayout()
+	vtx_layout.Begin()
+	vtx_layout.Add(hg.A_Position, 3, hg.AT_Float)
+	vtx_layout.Add(hg.A_Color0, 3, hg.AT_Float)
+	vtx_layout.End()
+	return vtx_layout
+
+
+class VertexStream:
+	"""Contiguous float32 buffer of [x, y, z, r, g, b] vertices matching the create_pos_rgb_layout() layout, [x, y, z, r, g, b, a] with color_width=4"""
+
+	def __init__(self, vtx_layout, max_vtx, color_width=3):
+		assert color_width in (3, 4)
+		self.data = np.zeros((max_vtx, 3 + color_width), dtype=np.float32)
+		self.count = max_vtx
+
+		self.vtx = hg.Vertices(vtx_layout, max_vtx)
+		self.__colors = {}
+
+	@property
+	def pos(self):
+		return self.data[:, 0:3]
+
+	@property
+	def color(self):
+		return self.data[:, 3:]
+
+	def reserve(self, vtx_count):
+		"""Grow the buffer to hold at least vtx_count vertices by doubling its size, the first count vertices are kept"""
+		if vtx_count > len(self.data):
+			data = np.zeros((max(vtx_count, 2 * len(self.data)), self.data.shape[1]), dtype=np.float32)
+			data[:self.count] = self.data[:self.count]
+			self.data = data
+
+	def __get_color(self, r, g, b, a=1):
+		# most streams only use a handful of colors, do not allocate one hg.Color per vertex
+		key = (r, g, b, a)
+		color = self.__colors.get(key)
+		if color is None:
+			if len(self.__colors) > 256:
+				self.__colors.clear()
+			color = self.__colors[key] = hg.Color(r, g, b, a)
+		return color
+
+	def upload(self, start=0, end=None):
+		"""Copy the vertices from start to end (count by default) of the buffer to the hg.Vertices object, return it"""
+		vtx = self.vtx
+		vtx.Clear()
+
+		get_color = self.__get_color
+		vertices = self.data[start:self.count if end is None else end].tolist()
+
+		# the color width is tested once, not per vertex
+		if self.data.shape[1] == 6:
+			for i, (x, y, z, r, g, b) in enumerate(vertices):
+				vtx.Begin(i).SetPos(hg.Vec3(x, y, z)).SetColor0(get_color(r, g, b)).End()
+		else:
+			for i, (x, y, z, r, g, b, a) in enumerate(vertices):
+				vtx.Begin(i).SetPos(hg.Vec3(x, y, z)).SetColor0(get_color(r, g, b, a)).End()
+
+		return vtx
+
+	def draw(self, view_id, prg, render_state=None, start=0, end=None):
+		vtx = self.upload(start, end)
+		if render_state is None:
+			hg.DrawLines(view_id, vtx, prg)
+		else:
+			hg.DrawLines(view_id, vtx, prg, render_state)
+
+
+class Starfield:
+	"""Structure-of-arrays star state, each star is drawn as a 2 vertices line"""
+
+	def __init__(self, star_count, size, seed=None):
+		self.size = size
+		self.pos = np.random.default_rng(seed).uniform(-size, size, (star_count, 3)).astype(np.float32)
+
+	def __len__(self):
+		return len(self.pos)
+
+	def update(self, dt_f, speed=2):
+		z = self.pos[:, 2]
+		z -= speed * dt_f
+		z[z < self.size] += self.size
+
+	def write_lines(self, stream):
+		"""Project the stars to the stream, inner vertex is black and outer vertex is white"""
+		lines = stream.data[:2 * len(self)].reshape(-1, 2, 6)
+
+		inv_z = 1 / self.pos[:, 2]
+		lines[:, 0, 0] = self.pos[:, 0] * inv_z
+		lines[:, 0, 1] = self.pos[:, 1] * inv_z
+		lines[:, 1, 0] = lines[:, 0, 0] * 1.04
+		lines[:, 1, 1] = lines[:, 0, 1] * 1.04
+		lines[:, :, 2] = 0
+
+		lines[:, 0, 3:6] = 0
+		lines[:, 1, 3:6] = 1
+
+		stream.count = 2 * len(self)
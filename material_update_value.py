@@ -1,6 +1,7 @@
 # Create textured material with pipeline shader
 
 import harfang as hg
+from helpers.texture_streaming import TextureStreamer
 
 hg.InputInit()
 hg.WindowSystemInit()
@@ -43,7 +44,9 @@ hg.CreateObject(scene, hg.TranslationMat4(hg.Vec3(0, 0, 0)), ground_ref, [mat_gr
 mat_has_texture = False
 mat_update_delay = 0
 
-texture_ref = hg.LoadTextureFromAssets('textures/squares.png', 0, res)
+# stream the texture in the background, a placeholder is used until it is loaded
+texture_streamer = TextureStreamer(res, budget=64 * 1024 * 1024)
+texture_streamer.touch('textures/squares.png')
 
 # main loop
 while not hg.ReadKeyboard().Key(hg.K_Escape) and hg.IsWindowOpen(win):
@@ -58,7 +61,7 @@ while not hg.ReadKeyboard().Key(hg.K_Escape) and hg.IsWindowOpen(win):
 		if mat_has_texture:
 			hg.SetMaterialTexture(mat, 'uDiffuseMap', hg.InvalidTextureRef, 0)
 		else:
-			hg.SetMaterialTexture(mat, 'uDiffuseMap', texture_ref, 0)
+			hg.SetMaterialTexture(mat, 'uDiffuseMap', texture_streamer.get('textures/squares.png'), 0)
 
 		# update the pipeline shader variant according to the material uniform values
 		hg.UpdateMaterialPipelineProgramVariant(mat, res)
@@ -67,6 +70,7 @@ while not hg.ReadKeyboard().Key(hg.K_Escape) and hg.IsWindowOpen(win):
 		mat_update_delay = mat_update_delay + hg.time_from_sec(1)
 		mat_has_texture = not mat_has_texture
 
+	texture_streamer.update()
 	scene.Update(dt)
 
 	hg.SubmitSceneToPipeline(0, scene, hg.IntRect(0, 0, res_x, res_y), True, pipeline, res)
@@ -74,5 +78,7 @@ while not hg.ReadKeyboard().Key(hg.K_Escape) and hg.IsWindowOpen(win):
 	hg.Frame()
 	hg.UpdateWindow(win)
 
+texture_streamer.close()
+
 hg.RenderShutdown()
 hg.DestroyWindow(win)
@@ -8,11 +8,18 @@ hg.IsoSurfaceSphere(iso_surface, width, depth, height, x, z, y, ...) # parameter
 '''
 
 import harfang as hg
+import numpy as np
 from math import pi, sin, cos
+from helpers.grid_mesh import make_model
+from helpers.iso_parallel import ChunkedPolygonizer
 
 # Launch or not the movements on the iso surface spheres (cf imgui window and create_iso_surface_with_spheres_list())
 anim_spheres = True
 
+# Polygonize the iso surface in chunks over all the CPU cores instead of using hg.IsoSurfaceToModel (cf imgui window and create_iso_surface_with_spheres_list())
+use_chunked_polygonizer = False
+chunked_polygonizer = ChunkedPolygonizer()
+
 # Create a simple sphere with default params
 def create_iso_surface_sphere_default():
     iso_sphere = {
@@ -50,8 +57,38 @@ def create_iso_surface_spheres_list_circle(origin):
     return sphere_list
 
 
+# Create a model from an iso surface containing some spheres, using the chunked polygonizer
+def create_iso_surface_with_chunked_polygonizer(iso_surface_bounds, iso_level, iso_scale, iso_spheres_list, clock_sec):
+    iso_surface_height = iso_surface_bounds[1]
+
+    # The chunked polygonizer uses x, y (up), z axes, so the sphere "z" (height) goes to the second coordinate
+    spheres = []
+    for i, iso_sphere in enumerate(iso_spheres_list):
+        iso_sphere_pos = iso_sphere["iso_sphere_pos"]
+        iso_sphere_radius = iso_sphere["iso_sphere_radius"]
+
+        if anim_spheres:
+            clock = cos(clock_sec + i) / 4
+            pos_z = ((iso_surface_height / 2 - iso_sphere_radius) * clock) + iso_surface_height / 4
+        else:
+            pos_z = iso_sphere_pos.z
+
+        spheres.append((iso_sphere_pos.x, pos_z, iso_sphere_pos.y, iso_sphere_radius, iso_sphere["iso_sphere_value"], iso_sphere["iso_sphere_exponent"]))
+
+    positions, normals = chunked_polygonizer.polygonize_spheres(iso_surface_bounds, spheres, iso_level)
+
+    # The chunks are stitched as a triangle soup, the model builder merges the shared vertices
+    triangles = np.arange(len(positions), dtype=np.int32).reshape(-1, 3)
+    positions = positions * np.array([iso_scale.x, iso_scale.y, iso_scale.z], dtype=np.float32)
+
+    return make_model(hg.VertexLayoutPosFloatNormUInt8(), positions, normals, triangles)
+
+
 # Create a model from an iso surface containing some spheres
 def create_iso_surface_with_spheres_list(iso_surface_bounds, iso_level, iso_scale, iso_spheres_list, clock_sec):
+    if use_chunked_polygonizer:
+        return create_iso_surface_with_chunked_polygonizer(iso_surface_bounds, iso_level, iso_scale, iso_spheres_list, clock_sec)
+
     # Create iso surface
     iso_surface_width = iso_surface_bounds[0]
     iso_surface_height = iso_surface_bounds[1]
@@ -257,6 +294,8 @@ while not keyboard.Down(hg.K_Escape) and hg.IsWindowOpen(win):
 
         # Checkbox to activate or not the animation on the iso surface spheres
         changed, anim_spheres = hg.ImGuiCheckbox("Anim spheres", anim_spheres)
+        # Checkbox to switch between hg.IsoSurfaceToModel and the multi-core chunked polygonizer
+        changed, use_chunked_polygonizer = hg.ImGuiCheckbox("Chunked polygonizer", use_chunked_polygonizer)
 
         hg.ImGuiNewLine()
 
@@ -289,5 +328,7 @@ while not keyboard.Down(hg.K_Escape) and hg.IsWindowOpen(win):
     frame = hg.Frame()
     hg.UpdateWindow(win)
 
+chunked_polygonizer.close()
+
 hg.RenderShutdown()
 hg.DestroyWindow(win)
\ No newline at end of file
@@ -0,0 +1,184 @@
+# Model builder with iso surface, using a persistent field that is only updated where spheres moved
+
+import harfang as hg
+from math import pi, sin, cos
+from helpers.iso_field import IsoField
+
+# Launch or not the movements on the iso surface spheres (cf imgui window)
+anim_spheres = True
+
+
+# Create a sphere with pos and radius params
+def create_iso_surface_sphere(pos, radius):
+    iso_sphere = {
+        "iso_sphere_pos" : pos,
+        "iso_sphere_radius" : radius,
+        "iso_sphere_value" : 1.0,
+        "iso_sphere_exponent" : 1.0
+    }
+    return iso_sphere
+
+
+# Create a list of sphere in circle / snake
+def create_iso_surface_spheres_list_circle(origin):
+    sphere_list = []
+    sphere_radius = 8.0
+    radius = 15
+    # create 10 spheres
+    for i in range(10):
+        angle = i / 10 * pi * 2
+        x = radius * cos(angle)
+        y = radius * sin(angle)
+        z = i * radius / 6
+        sphere_list.append(create_iso_surface_sphere(hg.Vec3(x, y, z) + origin, sphere_radius))
+    return sphere_list
+
+
+# Convert the spheres to the field metaballs
+# Note : as in model_builder_iso_surface.py, the sphere "z" is the height, the field uses x, y (up), z axes so "y" and "z" are swapped here
+def get_field_spheres(iso_surface_bounds, iso_spheres_list, clock_sec):
+    iso_surface_height = iso_surface_bounds[1]
+
+    spheres = []
+    for i, iso_sphere in enumerate(iso_spheres_list):
+        pos = iso_sphere["iso_sphere_pos"]
+        radius = iso_sphere["iso_sphere_radius"]
+
+        if anim_spheres:
+            clock = cos(clock_sec + i) / 4
+            pos_z = ((iso_surface_height / 2 - radius) * clock) + iso_surface_height / 4
+        else:
+            pos_z = pos.z
+
+        spheres.append((pos.x, pos_z, pos.y, radius, iso_sphere["iso_sphere_value"], iso_sphere["iso_sphere_exponent"]))
+    return spheres
+
+
+# Init render and resources
+hg.InputInit()
+hg.WindowSystemInit()
+
+res_x, res_y = 1280, 720
+win = hg.RenderInit('Harfang - Model builder iso surface (incremental)', res_x, res_y, hg.RF_VSync | hg.RF_MSAA4X)
+
+# Init pipeline
+pipeline = hg.CreateForwardPipeline(1024, True)
+res = hg.PipelineResources()
+
+# Add assets folder
+hg.AddAssetsFolder('resources_compiled')
+
+# Init ImGui
+imgui_prg = hg.LoadProgramFromAssets('core/shader/imgui')
+imgui_img_prg = hg.LoadProgramFromAssets('core/shader/imgui_image')
+
+hg.ImGuiInit(10, imgui_prg, imgui_img_prg)
+
+# Setup scene
+scene = hg.Scene()
+hg.LoadSceneFromAssets("probe_scene/scene_iso_surface.scn", scene, res, hg.GetForwardPipelineInfo())
+
+# Create camera
+camera_rot_x = 0
+camera_rot_y = 0
+camera_distance = 45
+camera_node = hg.CreateCamera(scene, hg.Mat4.Identity, 0.5, 800)
+scene.SetCurrentCamera(camera_node)
+
+# Create a spot light
+spot_light_mtx = hg.TransformationMat4(hg.Vec3(12.5, 35, 12.5), hg.Vec3(hg.DegreeToRadian(90), hg.DegreeToRadian(90), hg.DegreeToRadian(0)))
+spot_light_color = hg.Color(1, 1, 1, 1)
+spot_light = hg.CreateSpotLight(scene, spot_light_mtx, 0, hg.DegreeToRadian(0.1), hg.DegreeToRadian(35), spot_light_color, 10, spot_light_color, 10, 1, hg.LST_Map, 0.0001)
+
+# Init input
+keyboard = hg.Keyboard()
+
+# Create material for the iso surface spheres
+prg_ref = hg.LoadPipelineProgramRefFromAssets('core/shader/pbr.hps', res, hg.GetForwardPipelineInfo())
+iso_surface_material = hg.CreateMaterial(prg_ref, 'uBaseOpacityColor', hg.Vec4(1.0, 0.75, 0.15), 'uOcclusionRoughnessMetalnessColor', hg.Vec4(1, 0.2, 0.5))
+
+vtx_layout = hg.VertexLayoutPosFloatNormUInt8()
+
+# Create the persistent field
+iso_surface_bounds = [50, 50, 50] # Size of the iso surface (width, height, depth)
+iso_level = 0.8
+iso_scale = hg.Vec3(1, 1, 1)
+
+iso_field = IsoField(iso_surface_bounds, iso_level)
+
+iso_sphere_list = create_iso_surface_spheres_list_circle(hg.Vec3(iso_surface_bounds[0] / 2, iso_surface_bounds[0] / 2, iso_surface_bounds[0] / 6))
+
+iso_field.set_spheres(get_field_spheres(iso_surface_bounds, iso_sphere_list, 1))
+iso_field.update()
+
+iso_surface_mdl_ref = res.AddModel('isosurface', iso_field.make_model(vtx_layout, (iso_scale.x, iso_scale.y, iso_scale.z)))
+
+iso_surface_node_scale = hg.Vec3(0.5, 0.5, 0.5)
+iso_surface_node = hg.CreateObject(scene, hg.TransformationMat4(hg.Vec3(0, 0, 0), hg.Vec3(0, 0, 0), iso_surface_node_scale), iso_surface_mdl_ref, [iso_surface_material])
+
+# main loop
+while not keyboard.Down(hg.K_Escape) and hg.IsWindowOpen(win):
+    dt = hg.TickClock()
+    current_time = hg.time_to_sec_f(hg.GetClock())
+
+    scale_factor = iso_scale * iso_surface_node_scale
+
+    # Update camera pos input
+    if hg.ReadKeyboard().Key(hg.K_W):
+        camera_rot_x = camera_rot_x + (1 * pi / 180)
+    elif hg.ReadKeyboard().Key(hg.K_S):
+        camera_rot_x = camera_rot_x - (1 * pi / 180)
+    elif hg.ReadKeyboard().Key(hg.K_A):
+        camera_rot_y = camera_rot_y + (1 * pi / 180)
+    elif hg.ReadKeyboard().Key(hg.K_D):
+        camera_rot_y = camera_rot_y - (1 * pi / 180)
+
+    camera_new_mtx = hg.TransformationMat4(hg.Vec3(iso_surface_bounds[0] / 2 * scale_factor.x, iso_surface_bounds[1] / 3 * scale_factor.y, iso_surface_bounds[2] / 2 * scale_factor.z), hg.Vec3(camera_rot_x, camera_rot_y, 0)) * hg.TransformationMat4(hg.Vec3(0, 0, -camera_distance), hg.Vec3(0, 0, 0))
+    camera_node.GetTransform().SetWorld(camera_new_mtx)
+
+    # Recreate the field if its size changed, then only rebuild the model when the surface actually changed
+    if list(iso_field.bounds) != iso_surface_bounds:
+        iso_field = IsoField(iso_surface_bounds, iso_level)
+
+    iso_field.set_iso_level(iso_level)
+    iso_field.set_spheres(get_field_spheres(iso_surface_bounds, iso_sphere_list, current_time))
+
+    if iso_field.update():
+        res.UpdateModel(iso_surface_mdl_ref, iso_field.make_model(vtx_layout, (iso_scale.x, iso_scale.y, iso_scale.z)))
+
+    # Update and draw the scene
+    scene.Update(dt)
+    vid, passid = hg.SubmitSceneToPipeline(0, scene, hg.IntRect(0, 0, res_x, res_y), True, pipeline, res)
+
+    # Draw the imgui window
+    hg.ImGuiBeginFrame(res_x, res_y, hg.TickClock(), hg.ReadMouse(), hg.ReadKeyboard())
+
+    if hg.ImGuiBegin('IsoSurface setting', True, hg.ImGuiWindowFlags_AlwaysAutoResize):
+        changed, anim_spheres = hg.ImGuiCheckbox("Anim spheres", anim_spheres)
+        hg.ImGuiText("field bricks updated : {0}, polygonized : {1}".format(iso_field.stats['field_bricks'], iso_field.stats['polygonized_bricks']))
+
+        hg.ImGuiNewLine()
+
+        if hg.ImGuiCollapsingHeader("Iso surface"):
+            changed, iso_surface_bounds[0] = hg.ImGuiInputInt("width", iso_surface_bounds[0])
+            changed, iso_surface_bounds[1] = hg.ImGuiInputInt("height", iso_surface_bounds[1])
+            changed, iso_surface_bounds[2] = hg.ImGuiInputInt("depth", iso_surface_bounds[2])
+            changed, iso_level = hg.ImGuiInputFloat("iso_level", iso_level)
+
+        for i, iso_sphere in enumerate(iso_sphere_list):
+            str_i = str(i)
+            if hg.ImGuiCollapsingHeader("Iso sphere" + str_i):
+                changed, iso_sphere["iso_sphere_pos"] = hg.ImGuiInputVec3("iso_sphere_pos_" + str_i, iso_sphere["iso_sphere_pos"])
+                changed, iso_sphere["iso_sphere_radius"] = hg.ImGuiInputFloat("iso_sphere_radius_" + str_i, iso_sphere["iso_sphere_radius"])
+                changed, iso_sphere["iso_sphere_value"] = hg.ImGuiInputFloat("iso_sphere_value_" + str_i, iso_sphere["iso_sphere_value"])
+                changed, iso_sphere["iso_sphere_exponent"] = hg.ImGuiInputFloat("iso_sphere_exponent_" + str_i, iso_sphere["iso_sphere_exponent"])
+
+    hg.ImGuiEnd()
+
+    hg.ImGuiEndFrame(vid)
+
+    hg.Frame()
+    hg.UpdateWindow(win)
+
+hg.RenderShutdown()
+hg.DestroyWindow(win)
@@ -0,0 +1,67 @@
+# Model builder usage, grid mesh computed with NumPy
+
+import harfang as hg
+from helpers.grid_mesh import create_grid_model
+
+# Init render and resources
+hg.InputInit()
+hg.WindowSystemInit()
+
+res_x, res_y = 1280, 720
+win = hg.RenderInit('Harfang - Model builder (NumPy)', res_x, res_y, hg.RF_VSync | hg.RF_MSAA4X)
+
+hg.AddAssetsFolder('resources_compiled')
+
+pipeline = hg.CreateForwardPipeline()
+res = hg.PipelineResources()
+
+# Create materials
+prg_ref = hg.LoadPipelineProgramRefFromAssets('core/shader/pbr.hps', res, hg.GetForwardPipelineInfo())
+plane_material = hg.CreateMaterial(prg_ref, 'uBaseOpacityColor', hg.Vec4(0.5, 0.5, 0.5), 'uOcclusionRoughnessMetalnessColor', hg.Vec4(1, 1, 0.25))
+
+# Setup scene
+scene = hg.Scene()
+hg.LoadSceneFromAssets("probe_scene/pbr.scn", scene, res, hg.GetForwardPipelineInfo())
+
+cam = hg.CreateCamera(scene, hg.TransformationMat4(hg.Vec3(0, 6, -12), hg.Vec3(hg.DegreeToRadian(30), 0, 0)), 0.01, 1000)
+scene.SetCurrentCamera(cam)
+
+light_mtx = hg.TransformationMat4(hg.Vec3(8, 5, 0), hg.Vec3(hg.DegreeToRadian(50), hg.DegreeToRadian(-90), hg.DegreeToRadian(-90)))
+inner_angle = hg.DegreeToRadian(30)
+outer_angle = hg.DegreeToRadian(45)
+light_color = hg.Color(1, 1, 1, 1)
+light = hg.CreateSpotLight(scene, light_mtx, 0, inner_angle, outer_angle, light_color, 1, light_color, 1, 1, hg.LST_Map, 0.0)
+
+# Create plane model
+vtx_layout = hg.VertexLayoutPosFloatNormUInt8()
+
+grid_start_pos = hg.Vec3(0, 0, 0)
+grid_size = 160  # number of quads on each axis
+quad_size = 10 / grid_size
+
+# Create the grid model, positions, triangles and normals are computed as arrays (the triangles are computed once per grid size)
+grid_mdl = create_grid_model(vtx_layout, grid_start_pos, quad_size, grid_size, grid_size, True, 1)
+# Add the grid model to the PipelineResources and get the corresponding model ref
+grid_mdl_ref = res.AddModel('grid', grid_mdl)
+# Create a node from the model ref
+grid_node = hg.CreateObject(scene, hg.TransformationMat4(grid_start_pos, hg.Vec3(0, 0, 0)), grid_mdl_ref, [plane_material])
+
+# Init input
+keyboard = hg.Keyboard()
+
+# main loop
+while not keyboard.Down(hg.K_Escape) and hg.IsWindowOpen(win):
+    dt = hg.TickClock()
+    current_time = hg.time_to_sec_f(hg.GetClock())
+
+    new_grid_mdl = create_grid_model(vtx_layout, grid_start_pos, quad_size, grid_size, grid_size, True, current_time)
+    res.UpdateModel(grid_mdl_ref, new_grid_mdl)
+
+    scene.Update(dt)
+    hg.SubmitSceneToPipeline(0, scene, hg.IntRect(0, 0, res_x, res_y), True, pipeline, res)
+
+    hg.Frame()
+    hg.UpdateWindow(win)
+
+hg.RenderShutdown()
+hg.DestroyWindow(win)
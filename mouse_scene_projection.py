@@ -1,20 +1,8 @@
 import harfang as hg
-
-# draw_line will draw lines in the viewport
-def draw_line(pos_a, pos_b, line_color, vid, vtx_line_layout, line_shader):
-	vtx = hg.Vertices(vtx_line_layout, 2)
-	vtx.Begin(0).SetPos(pos_a).SetColor0(line_color).End()
-	vtx.Begin(1).SetPos(pos_b).SetColor0(line_color).End()
-	hg.DrawLines(vid, vtx, line_shader)
-
-
-# add_debug_cross allows to create lines to draw a cross and append them to the "lines" structure. These lines will be drawn at the end of the main loop by draw_line()
-def add_debug_cross(lines, pos, world, size):
-    lines.append([pos + hg.GetX(world) * size, pos - hg.GetX(world) * size, hg.Color.Red]) 
-    lines.append([pos + hg.GetY(world) * size, pos - hg.GetY(world) * size, hg.Color.Green])
-    lines.append([pos + hg.GetZ(world) * size, pos - hg.GetZ(world) * size, hg.Color.Blue])
-    return lines
-
+import numpy as np
+from helpers.debug_draw import DebugDraw
+from helpers.picking import Picker, node_world_aabbs, screen_rays
+from helpers.spatial_index import world_axes
 
 hg.InputInit()
 hg.WindowSystemInit()
@@ -43,10 +31,23 @@ scene.SetCurrentCamera(camera)
 # Get sphere and rectangle nodes in the scene
 rectangle_node = scene.GetNode("rectangle")
 
+# Picking structure over the object nodes of the scene, their bounding boxes are refreshed every frame
+all_nodes = scene.GetAllNodes()
+object_nodes = [all_nodes.at(i) for i in range(all_nodes.size()) if all_nodes.at(i).HasObject()]
+picker = Picker(*node_world_aabbs(object_nodes, res))
+
+# Marquee selection with the left mouse button, lasso selection when shift is held
+selection_start = None
+lasso_points = []
+selected = np.empty(0, dtype=np.int64)
+
 # Create the shader to draw some 3D lines
 vtx_line_layout = hg.VertexLayoutPosFloatColorUInt8()
 shader_for_line = hg.LoadProgramFromAssets("shaders/pos_rgb")
 
+# All the debug lines of a frame are accumulated and drawn at once at the end of the main loop
+debug_draw = DebugDraw(vtx_line_layout, shader_for_line)
+
 # Input init
 keyboard = hg.Keyboard()
 mouse = hg.Mouse()
@@ -68,9 +69,6 @@ while not keyboard.Pressed(hg.K_Escape) and hg.IsWindowOpen(win) :
         screen_pos_up_left = hg.Vec3(0, res_y, 1.0)
         screen_pos_down_right = hg.Vec3(res_x, 0, 1.0)
 
-    # List containing the lines to draw in the viewport
-    lines = []
-
     # Input updates and get mouse cursor pos
     keyboard.Update()
     mouse.Update()
@@ -115,15 +113,54 @@ while not keyboard.Pressed(hg.K_Escape) and hg.IsWindowOpen(win) :
     view_pos_down_right_normalize = view_pos_down_right_normalize + ray_o
 
     # add a debug cross at the screen cursor position
-    lines = add_debug_cross(lines, view_pos_normalize, hg.TransformationMat4(view_pos_normalize, hg.Vec3(0, 0, 0)), 0.01)
+    debug_draw.cross(view_pos_normalize, hg.TransformationMat4(view_pos_normalize, hg.Vec3(0, 0, 0)), 0.01)
     # add debug crosses at the center screen, top left screen and bottom right screen position
-    lines = add_debug_cross(lines, view_pos_middle_normalize, hg.TransformationMat4(view_pos_middle_normalize, hg.Vec3(0, 0, 0)), 0.1)
-    lines = add_debug_cross(lines, view_pos_up_left_normalize, hg.TransformationMat4(view_pos_up_left_normalize, hg.Vec3(0, 0, 0)), 0.1)
-    lines = add_debug_cross(lines, view_pos_down_right_normalize, hg.TransformationMat4(view_pos_down_right_normalize, hg.Vec3(0, 0, 0)), 0.1)
+    debug_draw.cross(view_pos_middle_normalize, hg.TransformationMat4(view_pos_middle_normalize, hg.Vec3(0, 0, 0)), 0.1)
+    debug_draw.cross(view_pos_up_left_normalize, hg.TransformationMat4(view_pos_up_left_normalize, hg.Vec3(0, 0, 0)), 0.1)
+    debug_draw.cross(view_pos_down_right_normalize, hg.TransformationMat4(view_pos_down_right_normalize, hg.Vec3(0, 0, 0)), 0.1)
 
     # add a line starting at the origin position (i.e 1 meter in front of the camera) and ending to the mouse cursor position in the 3D space
-    direction_line = [hg.Vec3(0, 1.5, -5), view_pos, hg.Color.Blue]
-    lines.append(direction_line)
+    debug_draw.line(hg.Vec3(0, 1.5, -5), view_pos, hg.Color.Blue)
+
+    # pick the object under the cursor, the ray starts at ray_o and goes through view_pos (view space) moved to world space
+    ray_dir = inv_view * view_pos - ray_o
+    picker.set_boxes(*node_world_aabbs(object_nodes, res))
+    picked, picked_dist = picker.pick(np.array([ray_o.x, ray_o.y, ray_o.z]), np.array([ray_dir.x, ray_dir.y, ray_dir.z]) / hg.Len(ray_dir))
+    if picked[0] >= 0:
+        hit_pos = ray_o + hg.Normalize(ray_dir) * float(picked_dist[0])
+        debug_draw.cross(hit_pos, hg.TranslationMat4(hit_pos), 0.2)
+
+    # marquee and lasso selection
+    cam_world = world_axes(camera.GetTransform().GetWorld())
+
+    if mouse.Pressed(hg.MB_0):
+        selection_start = (mouse_x, mouse_y)
+        lasso_points = []
+    if selection_start is not None and mouse.Down(hg.MB_0):
+        lasso_points.append((mouse_x, mouse_y))
+    if selection_start is not None and mouse.Released(hg.MB_0):
+        if keyboard.Down(hg.K_LShift):
+            selected = picker.select_lasso(cam_world, camera.GetCamera().GetFov(), (res_x, res_y), lasso_points)
+        else:
+            selected = picker.select_rect(cam_world, camera.GetCamera().GetFov(), (res_x, res_y), (*selection_start, mouse_x, mouse_y))
+        selection_start = None
+
+    # draw the marquee or lasso outline 1 meter in front of the camera
+    if selection_start is not None:
+        if keyboard.Down(hg.K_LShift):
+            outline = lasso_points
+        else:
+            outline = [selection_start, (mouse_x, selection_start[1]), (mouse_x, mouse_y), (selection_start[0], mouse_y)]
+        if len(outline) > 1:
+            _, outline_dirs = screen_rays(cam_world, camera.GetCamera().GetFov(), (res_x, res_y), outline)
+            outline_pos = [ray_o + hg.Vec3(*d) for d in outline_dirs.tolist()]
+            for i in range(len(outline_pos)):
+                debug_draw.line(outline_pos[i - 1], outline_pos[i], hg.Color.Yellow)
+
+    # mark the selected nodes
+    for i in selected.tolist():
+        node_pos = hg.GetT(object_nodes[i].GetTransform().GetWorld())
+        debug_draw.cross(node_pos, hg.TranslationMat4(node_pos), 0.5)
 
     # Get the direction mtx to apply the rotation to a 3d rectangle 
     mat_look_at = hg.Mat4LookAt(rectangle_node.GetTransform().GetPos(), view_pos)
@@ -138,8 +175,7 @@ while not keyboard.Pressed(hg.K_Escape) and hg.IsWindowOpen(win) :
 
     # Draw debug lines
     opaque_view_id = hg.GetSceneForwardPipelinePassViewId(pass_ids, hg.SFPP_Opaque)
-    for line in lines:
-        draw_line(line[0], line[1], line[2], opaque_view_id, vtx_line_layout, shader_for_line)
+    debug_draw.flush(opaque_view_id)
 
     # Update frame and window
     hg.Frame()
@@ -0,0 +1,117 @@
+# Physics Impulse on 10k bodies, the hover controller of physics_impulse.py applied to all cubes at once
+
+import harfang as hg
+import time
+from helpers.physics_bulk import RigidBodyBatch, hover_forces, hover_impulses
+
+hg.InputInit()
+hg.WindowSystemInit()
+
+res_x, res_y = 1280, 720
+win = hg.RenderInit('Harfang - Physics Force/Impulse on 10k bodies (Press space to alternate)', res_x, res_y, hg.RF_VSync | hg.RF_MSAA4X)
+
+pipeline = hg.CreateForwardPipeline()
+res = hg.PipelineResources()
+
+hg.ImGuiInit(10, hg.LoadProgramFromFile('resources_compiled/core/shader/imgui'), hg.LoadProgramFromFile('resources_compiled/core/shader/imgui_image'))
+
+# create models
+vtx_layout = hg.VertexLayoutPosFloatNormUInt8()
+
+cube_size = 0.5
+cube_mdl = hg.CreateCubeModel(vtx_layout, cube_size, cube_size, cube_size)
+cube_ref = res.AddModel('cube', cube_mdl)
+
+ground_mdl = hg.CreateCubeModel(vtx_layout, 120, 0.01, 120)
+ground_ref = res.AddModel('ground', ground_mdl)
+
+# create material
+prg_ref = hg.LoadPipelineProgramRefFromFile('resources_compiled/core/shader/default.hps', res, hg.GetForwardPipelineInfo())
+mat = hg.CreateMaterial(prg_ref, 'uDiffuseColor', hg.Vec4(1, 1, 1), 'uSpecularColor', hg.Vec4(1, 1, 1))
+
+# setup scene
+scene = hg.Scene()
+
+cam = hg.CreateCamera(scene, hg.TransformationMat4(hg.Vec3(0, 40, -70), hg.Vec3(hg.Deg(30), 0, 0)), 0.01, 1000)
+scene.SetCurrentCamera(cam)
+
+lgt = hg.CreateLinearLight(scene, hg.TransformationMat4(hg.Vec3(0, 0, 0), hg.Vec3(hg.Deg(30), hg.Deg(59), 0)), hg.Color(1, 1, 1), hg.Color(1, 1, 1), 10, hg.LST_Map, 0.002, hg.Vec4(20, 40, 80, 160))
+
+ground_node = hg.CreatePhysicCube(scene, hg.Vec3(240, 0.02, 240), hg.TranslationMat4(hg.Vec3(0, -0.005, 0)), ground_ref, [mat], 0)
+
+# 100x100 cubes dropped from different heights
+cube_nodes = []
+for z in range(100):
+	for x in range(100):
+		cube_nodes.append(hg.CreatePhysicCube(scene, hg.Vec3(cube_size, cube_size, cube_size), hg.TranslationMat4(hg.Vec3(x - 49.5, 1.5 + (x + z) % 7 * 0.5, z - 49.5)), cube_ref, [mat], 2))
+
+clocks = hg.SceneClocks()
+
+# scene physics
+physics = hg.SceneBullet3Physics()
+physics.SceneCreatePhysicsFromAssets(scene)
+physics_step = hg.time_from_sec_f(1 / 60)
+
+bodies = RigidBodyBatch(physics, cube_nodes)
+
+# main loop
+keyboard = hg.Keyboard()
+mouse = hg.Mouse()
+
+use_force = True
+timings = {'read': 0, 'control': 0, 'apply': 0, 'physics': 0}
+
+while not keyboard.Down(hg.K_Escape) and hg.IsWindowOpen(win):
+	keyboard.Update()
+	mouse.Update()
+
+	dt = hg.TickClock()
+
+	if keyboard.Pressed(hg.K_Space):
+		use_force = not use_force
+
+	t0 = time.perf_counter()
+	bodies.read(velocities=not use_force)
+
+	t1 = time.perf_counter()
+	if use_force:
+		indices, F = hover_forces(bodies.pos, 1.0, cube_size / 2, 80)  # a force inversely proportional to the distance to the ground
+	else:
+		indices, I = hover_impulses(bodies.pos, bodies.vel, 1.0, cube_size / 2, 10)  # the velocity change that brings the cubes to 1 meter above the ground
+
+	t2 = time.perf_counter()
+	if use_force:
+		bodies.add_forces(F, indices=indices)
+	else:
+		bodies.add_impulses(I, indices=indices)
+	bodies.wake(indices)
+
+	t3 = time.perf_counter()
+	hg.SceneUpdateSystems(scene, clocks, dt, physics, physics_step, 3)
+	t4 = time.perf_counter()
+
+	# smoothed timings, in milliseconds
+	for key, elapsed in zip(['read', 'control', 'apply', 'physics'], [t1 - t0, t2 - t1, t3 - t2, t4 - t3]):
+		timings[key] += (elapsed * 1000 - timings[key]) * 0.05
+
+	hg.SubmitSceneToPipeline(0, scene, hg.IntRect(0, 0, res_x, res_y), True, pipeline, res)
+
+	hg.ImGuiBeginFrame(res_x, res_y, dt, mouse.GetState(), keyboard.GetState())
+
+	if hg.ImGuiBegin('Hover controller', True, hg.ImGuiWindowFlags_AlwaysAutoResize):
+		hg.ImGuiText('%d bodies, %s controller, %d bodies pushed' % (len(bodies), 'force' if use_force else 'impulse', len(indices)))
+		hg.ImGuiSeparator()
+		for key, ms in timings.items():
+			hg.ImGuiText('%-8s %6.2f ms' % (key, ms))
+	hg.ImGuiEnd()
+
+	hg.ImGuiEndFrame(255)
+
+	hg.Frame()
+	hg.UpdateWindow(win)
+
+hg.RenderShutdown()
+hg.DestroyWindow(win)
+
+hg.WindowSystemShutdown()
+hg.InputShutdown()
@@ -1,7 +1,9 @@
 # Physics kapla towers
 
 import harfang as hg
-from math import pi, cos, sin, asin
+
+from helpers import kapla
+from helpers.physics_scheduler import PhysicsScheduler
 
 hg.InputInit()
 hg.WindowSystemInit()
@@ -44,34 +46,10 @@ hg.CreatePhysicCube(scene, hg.Vec3(200, 0.1, 200), hg.TranslationMat4(hg.Vec3(0,
 
 def add_kapla_tower(scn, resources, width, height, length, radius, material, level_count, x, y, z):
 	"""Create a Kapla tower, return a list of created nodes"""
-	level_y = y + height / 2
-
 	kapla_mdl = hg.CreateCubeModel(vtx_layout, width, height, length)
 	kapla_ref = resources.AddModel('kapla', kapla_mdl)
 
-	nodes = []
-
-	for i in range(level_count // 2):
-		def fill_ring(r, ring_y, size, r_adjust, y_off):
-			step = asin((size * 1.01) / 2 / (r - r_adjust)) * 2
-			cube_count = (2 * pi) // step
-			error = 2 * pi - step * cube_count
-			step += error / cube_count  # distribute error
-
-			a = 0
-			while a < (2 * pi - error):
-				world = hg.TransformationMat4(hg.Vec3(cos(a) * r + x, ring_y, sin(a) * r + z), hg.Vec3(0, -a + y_off, 0))
-				node = hg.CreatePhysicCube(scn, hg.Vec3(width, height, length), world, kapla_ref, [material], 0.1)
-				nodes.append(node)
-				a += step
-
-		fill_ring(radius - length / 2, level_y, width, length / 2, pi / 2)
-		level_y += height
-		fill_ring(radius - length + width / 2, level_y, length, width / 2, 0)
-		fill_ring(radius - width / 2, level_y, length, width / 2, 0)
-		level_y += height
-
-	return nodes
+	return kapla.add_kapla_tower(scn, kapla_ref, [material], width, height, length, radius, level_count, x, y, z)
 
 
 add_kapla_tower(scene, res, 0.5, 2, 2, 6, mat_cube, 12, -12, 0, 0)
@@ -89,7 +67,9 @@ cam_rot = hg.Vec3(0.6, -2.38, 0)
 # setup physics
 physics = hg.SceneBullet3Physics()
 physics.SceneCreatePhysicsFromAssets(scene)
-physics_step = hg.time_from_sec_f(1 / 60)
+
+# fixed 60Hz steps within a 8ms budget per frame, the kaplas and spheres are drawn between two physics states
+scheduler = PhysicsScheduler(scene, physics, hg.time_from_sec_f(1 / 60), 8, 8)
 
 # main loop
 while not keyboard.Down(hg.K_Escape) and hg.IsWindowOpen(win):
@@ -107,13 +87,19 @@ while not keyboard.Down(hg.K_Escape) and hg.IsWindowOpen(win):
 		node = hg.CreatePhysicSphere(scene, 0.5, hg.TranslationMat4(cam_pos), sphere_ref, [mat_spheres], 0.5)
 		physics.NodeCreatePhysicsFromAssets(node)
 		physics.NodeAddImpulse(node, hg.GetZ(cam.GetTransform().GetWorld()) * 25.0, cam_pos)
+		scheduler.add_nodes([node])
 
-	hg.SceneUpdateSystems(scene, clocks, dt, physics, physics_step, 1)
+	scheduler.update(dt)
+	hg.SceneUpdateSystems(scene, clocks, dt)
 	hg.SubmitSceneToPipeline(0, scene, hg.IntRect(0, 0, res_x, res_y), True, pipeline, res)
 
 	hg.Frame()
 	hg.UpdateWindow(win)
 
+stats = scheduler.stats
+print('%d physics steps over %d frames, %d skipped, at most %d steps per frame' % (stats['steps'], stats['frames'], stats['skipped_steps'], stats['max_frame_steps']))
+print('step: %.3f ms average, %.3f ms max' % (stats['step_ms'] / max(stats['steps'], 1), stats['max_step_ms']))
+
 hg.DestroyForwardPipeline(pipeline)
 
 hg.RenderShutdown()
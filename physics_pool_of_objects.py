@@ -1,6 +1,8 @@
 # Physics cubes & spheres in a box.
 
 import harfang as hg
+from collections import deque
+from helpers.physics_pool import PhysicsPool
 
 hg.InputInit()
 hg.WindowSystemInit()
@@ -62,7 +64,11 @@ clocks = hg.SceneClocks()
 physics = hg.SceneBullet3Physics()
 physics.SceneCreatePhysicsFromAssets(scene)
 
-physic_nodes = []  # keep track of dynamically created physic nodes
+# pools of cubes and spheres, created disabled at load time and recycled when objects are added and destructed
+cube_pool = PhysicsPool(scene, physics, lambda world: hg.CreatePhysicCube(scene, hg.Vec3.One, world, cube_ref, [mat_objects], 1), 512)
+sphere_pool = PhysicsPool(scene, physics, lambda world: hg.CreatePhysicSphere(scene, 0.5, world, sphere_ref, [mat_objects], 1), 512)
+
+physic_nodes = deque()  # (pool, node) of the spawned physic nodes, oldest first
 
 # text rendering
 font = hg.LoadFontFromAssets('font/default.ttf', 32)
@@ -77,26 +83,21 @@ while hg.IsWindowOpen(win):
 
 	if state.Key(hg.K_S):
 		for i in range(1, 8):
-			hg.SetMaterialValue(mat_objects, 'uDiffuseColor', hg.RandomVec4(0, 1))
-
-			if hg.FRand() > 0.5:
-				node = hg.CreatePhysicCube(scene, hg.Vec3.One, hg.TranslationMat4(hg.RandomVec3(hg.Vec3(-10, 18, -10), hg.Vec3(10, 18, 10))), cube_ref, [mat_objects], 1)
-			else:
-				node = hg.CreatePhysicSphere(scene, 0.5, hg.TranslationMat4(hg.RandomVec3(hg.Vec3(-10, 18, -10), hg.Vec3(10, 18, 10))), sphere_ref, [mat_objects], 1)
+			pool = cube_pool if hg.FRand() > 0.5 else sphere_pool
+			node = pool.spawn(hg.TranslationMat4(hg.RandomVec3(hg.Vec3(-10, 18, -10), hg.Vec3(10, 18, 10))))
 
-			physics.NodeCreatePhysicsFromAssets(node)  # update physics state
+			# recycled nodes keep their material, set the new color on the node object
+			hg.SetMaterialValue(node.GetObject().GetMaterial(0), 'uDiffuseColor', hg.RandomVec4(0, 1))
 
-			physic_nodes.append(node)
+			physic_nodes.append((pool, node))
 	elif state.Key(hg.K_D):
-		if len(physic_nodes):
-			for i in range(1, 8):
-				node = physic_nodes[0]
-
-				if node:
-					scene.DestroyNode(node)
-					physic_nodes.pop(0)
+		released = {cube_pool: [], sphere_pool: []}
+		for i in range(min(7, len(physic_nodes))):
+			pool, node = physic_nodes.popleft()
+			released[pool].append(node)
 
-		hg.SceneGarbageCollectSystems(scene, physics)
+		for pool, nodes in released.items():
+			pool.release(nodes)
 	elif state.Key(hg.K_Escape):
 		break
 
@@ -0,0 +1,13 @@
+$input a_position, a_normal, a_texcoord0
+$output vNormal
+
+
+#include <bgfx_shader.sh>
+
+void main() {
+	// each copy of the batch mesh stores the index of its instance matrix
+	mat4 model = u_model[int(a_texcoord0.x)];
+
+	vNormal = mul(model, vec4(a_normal * 2.0 - 1.0, 0.0)).xyz;
+	gl_Position = mul(u_viewProj, mul(model, vec4(a_position, 1.0)));
+}
@@ -2,6 +2,10 @@
 # URL : https://www.cgtrader.com/3d-models/vehicle/part/toyota-2jz-gte-engine-2932b715-2f42-4ecd-93ce-df9507c67ce8
 
 import harfang as hg
+from helpers.asset_prefetch import prefetch_scene
+
+# read the scene files ahead in background threads while the renderer initializes
+wait_for_prefetch = prefetch_scene('car_engine/engine.scn', 'resources_compiled')
 
 hg.InputInit()
 hg.WindowSystemInit()
@@ -15,9 +19,14 @@ res = hg.PipelineResources()
 
 hg.AddAssetsFolder("resources_compiled")
 
+# wait for the prefetch and load the models and programs before the scene
+wait_for_prefetch(res, hg.GetForwardPipelineInfo())
+
 # load scene
 scene = hg.Scene()
-hg.LoadSceneFromAssets("car_engine/engine.scn", scene, res, hg.GetForwardPipelineInfo())
+hg.LoadSceneFromAssets("car_engine/engine.scn", scene, res, hg.GetForwardPipelineInfo(), hg.LSSF_All | hg.LSSF_QueueTextureLoads)  # textures are streamed in by the main loop
+
+engine_master = scene.GetNode('engine_master')
 
 # AAA pipeline
 pipeline_aaa_config = hg.ForwardPipelineAAAConfig()
@@ -30,9 +39,11 @@ frame = 0
 while not hg.ReadKeyboard().Key(hg.K_Escape) and hg.IsWindowOpen(win):
 	dt = hg.TickClock()
 
-	trs = scene.GetNode('engine_master').GetTransform()
+	trs = engine_master.GetTransform()
 	trs.SetRot(trs.GetRot() + hg.Vec3(0, hg.Deg(15) * hg.time_to_sec_f(dt), 0))
 
+	hg.ProcessTextureLoadQueue(res, hg.time_from_ms(2))  # load the queued textures, at most 2 ms per frame
+
 	scene.Update(dt)
 	hg.SubmitSceneToPipeline(0, scene, hg.IntRect(0, 0, res_x, res_y), True, pipeline, res, pipeline_aaa, pipeline_aaa_config, frame)
 
@@ -0,0 +1,73 @@
+# Batch capture of turntable thumbnails of the engine scene, rendered offscreen with several readbacks in flight
+# Toyota 2JZ-GTE Engine model by Serhii Denysenko (CGTrader: serhiidenysenko8256)
+
+import argparse
+import harfang as hg
+import math
+import os
+import time
+from helpers.batch_capture import BatchCapture
+
+parser = argparse.ArgumentParser(description='Render a turntable of the engine scene to PNG files')
+parser.add_argument('--frames', type=int, default=360, help='number of thumbnails, evenly spread over a full turn')
+parser.add_argument('--size', type=int, default=512, help='thumbnail width and height')
+parser.add_argument('--output', default='captures', help='output folder')
+parser.add_argument('--slots', type=int, default=3, help='offscreen framebuffers, that is readbacks in flight')
+parser.add_argument('--workers', type=int, default=None, help='PNG writer threads')
+args = parser.parse_args()
+
+os.makedirs(args.output, exist_ok=True)
+
+hg.InputInit()
+hg.WindowSystemInit()
+
+# nothing is drawn to the window, it only hosts the renderer. No VSync, frames are not paced by the display
+win = hg.RenderInit('Scene Capture Batch', 256, 256, hg.RF_None)
+
+hg.AddAssetsFolder('resources_compiled')
+
+pipeline = hg.CreateForwardPipeline()
+res = hg.PipelineResources()
+
+scene = hg.Scene()
+hg.LoadSceneFromAssets('car_engine/engine.scn', scene, res, hg.GetForwardPipelineInfo())
+
+engine_master = scene.GetNode('engine_master')
+trs = engine_master.GetTransform()
+base_rot = trs.GetRot()
+
+capture = BatchCapture(res, args.size, args.size, args.slots, args.workers)
+
+start = time.perf_counter()
+frame, i = 0, 0
+
+while i < args.frames or capture.busy():
+	if i < args.frames:
+		slot = capture.acquire()
+
+		if slot is not None:
+			# turntable: the engine turns, the camera of the scene does not move
+			trs.SetRot(base_rot + hg.Vec3(0, 2 * math.pi * i / args.frames, 0))
+			scene.Update(0)
+
+			view_id, _ = hg.SubmitSceneToPipeline(0, scene, hg.IntRect(0, 0, args.size, args.size), True, pipeline, res, slot.frame_buffer.handle)
+			capture.capture(view_id, slot, os.path.join(args.output, 'engine_%04d.png' % i))
+			i += 1
+
+	frame = hg.Frame()
+	hg.UpdateWindow(win)
+	capture.update(frame)
+
+render_time = time.perf_counter() - start
+capture.close()
+total_time = time.perf_counter() - start
+
+stats = capture.stats
+print('%d frames rendered in %.2f s (%.1f fps), %d readbacks in flight at most, %d stalled frames' % (stats['captured'], render_time, stats['captured'] / render_time, stats['max_in_flight'], stats['stalls']))
+print('%d PNG files written to %s in %.2f s, %d failed' % (stats['saved'], args.output, total_time, stats['failed']))
+
+hg.RenderShutdown()
+hg.DestroyWindow(win)
+
+hg.WindowSystemShutdown()
+hg.InputShutdown()
@@ -3,8 +3,12 @@
 
 
 import harfang as hg
+from helpers.asset_prefetch import prefetch_scene
 import math
 
+#Read the scene files ahead in background threads while the renderer initializes
+wait_for_prefetch = prefetch_scene('car_engine/engine.scn', 'resources_compiled')
+
 hg.InputInit()
 hg.WindowSystemInit()
 
@@ -28,10 +32,15 @@ tex_color_ref = res.AddTexture("tex_rb", tex_color)
 tex_readback = hg.CreateTexture(tex_size, tex_size, "readback", hg.TF_ReadBack | hg.TF_BlitDestination, hg.TF_RGBA8)
 picture = hg.Picture(tex_size, tex_size, hg.PF_RGBA32)
 
+#Wait for the prefetch, load the models and programs before the scene
+wait_for_prefetch(res, hg.GetForwardPipelineInfo())
+
 #Load scene
 scene = hg.Scene()
 ret = hg.LoadSceneFromAssets("car_engine/engine.scn", scene, res, hg.GetForwardPipelineInfo())
 
+engine_master = scene.GetNode("engine_master")
+
 #Create the plane model
 vtx_layout = hg.VertexLayoutPosFloatTexCoord0UInt8()
 plane_mdl = hg.CreatePlaneModel(vtx_layout, 1, 1, 1, 1)
@@ -50,7 +59,7 @@ while not hg.ReadKeyboard().Key(hg.K_Escape) and hg.IsWindowOpen(win):
     #Update Scene and render to the frameBuffer
     scene.Update(dt)
 
-    trs = scene.GetNode("engine_master").GetTransform()
+    trs = engine_master.GetTransform()
     trs.SetRot(trs.GetRot() + hg.Vec3(0, hg.Deg(15) * hg.time_to_sec_f(dt), 0))
 
     view_id = 0
@@ -2,8 +2,12 @@
 # URL : https://www.cgtrader.com/3d-models/vehicle/part/toyota-2jz-gte-engine-2932b715-2f42-4ecd-93ce-df9507c67ce8
 
 import harfang as hg
+from helpers.asset_prefetch import prefetch_scene
 from random import uniform
 
+# read the scene files ahead in background threads while the renderer initializes
+wait_for_prefetch = prefetch_scene('car_engine/engine.scn', 'resources_compiled')
+
 hg.InputInit()
 hg.WindowSystemInit()
 
@@ -16,10 +20,15 @@ res = hg.PipelineResources()
 
 hg.AddAssetsFolder("resources_compiled")
 
+# wait for the prefetch and load the models and programs before the scene
+wait_for_prefetch(res, hg.GetForwardPipelineInfo())
+
 # load scene
 scene = hg.Scene()
 hg.LoadSceneFromAssets("car_engine/engine.scn", scene, res, hg.GetForwardPipelineInfo())
 
+engine_master = scene.GetNode('engine_master')
+
 # AAA pipeline
 pipeline_aaa_config = hg.ForwardPipelineAAAConfig()
 pipeline_aaa = hg.CreateForwardPipelineAAAFromAssets("core", pipeline_aaa_config, hg.BR_Equal, hg.BR_Equal)
@@ -35,7 +44,7 @@ frame = 0
 while not hg.ReadKeyboard().Key(hg.K_Escape) and hg.IsWindowOpen(win):
 	dt = hg.TickClock()
 
-	trs = scene.GetNode('engine_master').GetTransform()
+	trs = engine_master.GetTransform()
 	trs.SetRot(trs.GetRot() + hg.Vec3(0, hg.Deg(15) * hg.time_to_sec_f(dt), 0))
 
 	# change DOF randomly
@@ -1,6 +1,10 @@
 # Instantiating scenes
 
 import harfang as hg
+import numpy as np
+from helpers.anim_clips import AnimPlayheads, get_clip_set
+from helpers.anim_lod import AnimLOD
+from helpers.crowd import Crowd
 
 hg.InputInit()
 hg.WindowSystemInit()
@@ -19,60 +23,33 @@ scene = hg.Scene()
 hg.LoadSceneFromAssets('playground/playground.scn', scene, res, hg.GetForwardPipelineInfo())
 
 
-# declare the biped actor class
-class BipedActor:
-	def __init__(self, pos):
-		self.__node, _ = hg.CreateInstanceFromAssets(scene, hg.Mat4.Identity, "biped/biped.scn", res, hg.GetForwardPipelineInfo())
-		self.__node.GetTransform().SetPosRot(pos, hg.Deg3(0, hg.FRand(360), 0))
+# the biped animations are decoded once and shared by all the actors, each actor only has a playhead
+biped_clips = get_clip_set('resources/biped/biped.scn')
+player = AnimPlayheads(biped_clips)
 
-		self.__delay = 0
-		self.__state = None
-		self.__playing_anim_ref = None
+# skeletons are updated every frame close to the camera, every 2, 4 or 8 frames further away
+cam_pos, cam_target = hg.Vec3(0, 10, -14), hg.Vec3(0, 1, -4)
+anim_lod = AnimLOD((cam_pos.x, cam_pos.y, cam_pos.z), (14, 20, 26), (1, 2, 4, 8))
 
-	def __start_anim(self, name):
-		anim = self.__node.GetInstanceSceneAnim(name)  # get instance specific animation
-		if self.__playing_anim_ref is not None:
-			scene.StopAnim(self.__playing_anim_ref)
-		self.__playing_anim_ref = scene.PlayAnim(anim, hg.ALM_Loop)
+# the biped actors are advanced all at once by the crowd engine
+crowd = Crowd(scene, (-10, 0, -10), (10, 0, 10), player=player, lod=anim_lod)
 
-	def update(self, dt):
-		# check for state change
-		self.__delay = self.__delay - dt
 
-		if self.__delay <= 0:
-			states = ['idle', 'walk', 'run']
-			self.__state = states[hg.Rand(len(states))]
-			self.__delay = self.__delay + hg.time_from_sec_f(hg.FRRand(2, 6))  # 2 to 6 seconds before next state change
-			self.__start_anim(self.__state)
+def spawn_actors(count):
+	pos = np.random.uniform((-10, 0, -10), (10, 0, 10), (count, 3))
+	heading = np.random.uniform(0, 2 * np.pi, count)
 
-		# apply motion
-		dt_sec_f = hg.time_to_sec_f(dt)
-
-		transform = self.__node.GetTransform()
-		pos, rot = transform.GetPosRot()
-
-		if self.__state == 'walk':
-			pos = pos - hg.GetZ(transform.GetWorld()) * hg.Mtr(1.15) * dt_sec_f  # 1.15 m/sec
-			rot.y = rot.y + hg.Deg(50) * dt_sec_f
-		elif self.__state == 'run':
-			pos = pos - hg.GetZ(transform.GetWorld()) * hg.Mtr(4.5) * dt_sec_f  # 4.5 m/sec
-			rot.y = rot.y - hg.Deg(70) * dt_sec_f
-
-		# confine actor to playground
-		pos = hg.Clamp(pos, hg.Vec3(-10, 0, -10), hg.Vec3(10, 0, 10))
-
-		transform.SetPosRot(pos, rot)
-
-	def destroy(self):
-		scene.DestroyNode(self.__node)
+	# instances are created without their own copy of the biped animations
+	flags = hg.LSSF_All & ~hg.LSSF_Anims
+	nodes = [hg.CreateInstanceFromAssets(scene, hg.Mat4.Identity, "biped/biped.scn", res, hg.GetForwardPipelineInfo(), flags)[0] for i in range(count)]
+	crowd.add(nodes, pos, heading)
 
 
 # spawn initial actors
-actors = []
-for i in range(20):
-	actors.append(BipedActor(hg.RandomVec3(hg.Vec3(-10, 0, -10), hg.Vec3(10, 0, 10))))
+spawn_actors(20)  # the crowd engine is good for thousands of actors, see benchmark_crowd.py
 
 print('%d nodes in scene' % (scene.GetAllNodeCount()))
+print('%d shared animation clips: %d KB, playheads: %d bytes per actor' % (len(biped_clips.clips), biped_clips.nbytes // 1024, player.nbytes // max(len(player), 1)))
 
 # main loop
 keyboard = hg.Keyboard()
@@ -83,24 +60,27 @@ while not keyboard.Down(hg.K_Escape) and hg.IsWindowOpen(win):
 	keyboard.Update()
 
 	if keyboard.Pressed(hg.K_S):
-		actors.append(BipedActor(hg.RandomVec3(hg.Vec3(-10, 0, -10), hg.Vec3(10, 0, 10))))
+		spawn_actors(1)
 	if keyboard.Pressed(hg.K_D):
-		if len(actors) > 0:
-			actors.pop().destroy()
+		if len(crowd) > 0:
+			scene.DestroyNode(crowd.pop())
 			scene.GarbageCollect()
 
 	dt = hg.TickClock()
 
-	for actor in actors:
-		actor.update(dt)
+	crowd.update(hg.time_to_sec_f(dt))
 
 	scene.Update(dt)
 
-	view_state = hg.ComputePerspectiveViewState(hg.Mat4LookAt(hg.Vec3(0, 10, -14), hg.Vec3(0, 1, -4)), hg.Deg(45), 0.01, 1000, hg.ComputeAspectRatioX(res_x, res_y))
+	view_state = hg.ComputePerspectiveViewState(hg.Mat4LookAt(cam_pos, cam_target), hg.Deg(45), 0.01, 1000, hg.ComputeAspectRatioX(res_x, res_y))
 	vid, passId = hg.SubmitSceneToPipeline(0, scene, hg.IntRect(0, 0, res_x, res_y), view_state, pipeline, res)
 
 	hg.Frame()
 	hg.UpdateWindow(win)
 
+stats = anim_lod.stats
+print('actors per LOD bucket: %s, skeletons updated on the last frame: %s' % (stats['instances'].tolist(), stats['updated'].tolist()))
+print('skeleton update: %.2f ms average, %.2f ms max' % (stats['avg_ms'], stats['max_ms']))
+
 hg.RenderShutdown()
 hg.DestroyWindow(win)
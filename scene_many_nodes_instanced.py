@@ -0,0 +1,71 @@
+# Many dynamic objects, drawn as instance batches instead of scene nodes
+
+import harfang as hg
+from helpers.instance_batch import InstanceBatch, create_instance_layout, create_instanced_model, sphere_geometry
+from helpers.transform_batch import wave_heights
+
+hg.InputInit()
+hg.WindowSystemInit()
+
+res_x, res_y = 1280, 720
+win = hg.RenderInit('Many dynamic objects (instanced)', res_x, res_y, hg.RF_VSync | hg.RF_MSAA4X)
+
+pipeline = hg.CreateForwardPipeline(4096)  # increase shadow map resolution to 4096x4096
+res = hg.PipelineResources()
+
+# create models
+vtx_layout = hg.VertexLayoutPosFloatNormUInt8()
+
+ground_mdl = hg.CreateCubeModel(vtx_layout, 60, 0.001, 60)
+ground_ref = res.AddModel('ground', ground_mdl)
+
+# the sphere model holds 32 copies of the mesh, one per instance drawn by a single draw call.
+# The mdl_instanced shader has its own fixed light: unlike the ground, the spheres ignore the spot light and its shadows
+sphere_mdl = create_instanced_model(create_instance_layout(), *sphere_geometry(0.1, 8, 16))
+sphere_prg = hg.LoadProgramFromFile('resources_compiled/shaders/mdl_instanced')
+
+# create materials
+shader = hg.LoadPipelineProgramRefFromFile('resources_compiled/core/shader/default.hps', res, hg.GetForwardPipelineInfo())
+ground_mat = hg.CreateMaterial(shader, 'uDiffuseColor', hg.Vec4(1, 1, 1), 'uSpecularColor', hg.Vec4(1, 1, 1))
+
+# setup scene
+scene = hg.Scene()
+scene.canvas.color = hg.Color(0.1, 0.1, 0.1)
+scene.environment.ambient = hg.Color(0.1, 0.1, 0.1)
+
+cam = hg.CreateCamera(scene, hg.TransformationMat4(hg.Vec3(15.5, 5, -6), hg.Vec3(0.4, -1.2, 0)), 0.01, 100)
+scene.SetCurrentCamera(cam)
+
+hg.CreateSpotLight(scene, hg.TransformationMat4(hg.Vec3(-8.8, 21.7, -8.8), hg.Deg3(60, 45, 0)), 0, hg.Deg(5), hg.Deg(30), hg.Color.White, hg.Color.White, 0, hg.LST_Map, 0.000005)
+hg.CreateObject(scene, hg.TranslationMat4(hg.Vec3(0, 0, 0)), ground_ref, [ground_mat])
+
+# create the sphere instances, same 100x100 grid as scene_many_nodes.py
+row_count, col_count = 100, 100
+
+spheres = InstanceBatch(sphere_mdl, sphere_prg, row_count * col_count, hg.Color.Red)
+for z in range(row_count):
+	for x in range(col_count):
+		spheres.pos[z * col_count + x] = (x * 2 - 100) * 0.1, 0.1, (z * 2 - 100) * 0.1
+
+# main loop
+angle = 0
+
+while not hg.ReadKeyboard().Key(hg.K_Escape) and hg.IsWindowOpen(win):
+	dt = hg.TickClock()
+	angle += hg.time_to_sec_f(dt)
+
+	wave_heights(angle, row_count, col_count, spheres.pos[:, 1])
+
+	scene.Update(dt)
+
+	view_id, pass_ids = hg.SubmitSceneToPipeline(0, scene, hg.IntRect(0, 0, res_x, res_y), True, pipeline, res)
+
+	# draw the instances in the opaque pass of the scene
+	spheres.submit(hg.GetSceneForwardPipelinePassViewId(pass_ids, hg.SFPP_Opaque))
+
+	hg.Frame()
+
+	hg.UpdateWindow(win)
+
+hg.RenderShutdown()
+hg.DestroyWindow(win)